@@ -1,8 +1,19 @@
 import bpy
-from . import selection_sets
+import hashlib
+import json
+import math
+import os
+import re
+import struct
+import numpy as np
+from . import selection_sets, uvs
+from concurrent.futures import ThreadPoolExecutor
+from bpy.app.handlers import persistent
 from bpy.types import Scene
 from bpy.props import (
     BoolProperty,
+    FloatProperty,
+    IntProperty,
     StringProperty
 )
 
@@ -25,6 +36,64 @@ gltf_active_texnodes = {
 
 outputs_labels = []
 
+# node tree pointer: names of nodes feeding its active output
+active_output_cache = {}
+
+# node tree pointer: glTF roles index, see node_tree_roles()
+texture_roles_cache = {}
+
+# principled sockets fed by orm channels as separated images
+orm_sockets = {
+    "Occlusion": "R",
+    "Roughness": "G",
+    "Metallic": "B"
+}
+
+# node groups holding the glTF occlusion socket
+gltf_settings_groups = ("glTF Settings", "glTF Material Output")
+
+# image session_uid: (filepath, mtime, size) of its file when last loaded
+textures_stamps = {}
+
+# specular/glossiness conversion: dielectric reflectance, rows per tile
+specgloss_dielectric_specular = 0.04
+specgloss_tile_rows = 256
+
+# image names words hints, when specular/glossiness textures aren't linked
+specgloss_hints = {
+    "specular": "spec",
+    "glossiness": "gloss"
+}
+
+# principled sockets a specular texture can be linked to, depending on version
+specular_sockets = ("Specular", "Specular IOR Level", "Specular Tint")
+
+# (filepath, mtime, size) of an image file: hash of its content
+images_digests = {}
+
+# image session_uid: ((filepath, size, file stamp), {output name: alpha stats})
+images_alpha_stats = {}
+
+# alpha below it is transparent, above 1 - it is opaque
+alpha_tolerance = 1 / 255
+
+# texture atlas: roles packed, sRGB ones, max tiles padding & size of tiles without texture
+atlas_roles = ("albedo", "orm", "normal", "emit")
+atlas_srgb_roles = ("albedo", "emit")
+atlas_padding = 4
+atlas_empty_tile = 8
+# uv margin still considered inside [0, 1]
+atlas_uv_epsilon = 1e-3
+
+# png color type: channels count
+png_channels = {
+    0: 1,
+    2: 3,
+    3: 3,
+    4: 2,
+    6: 4
+}
+
 """
 **********************************************************************
 *                            def section                             *
@@ -32,29 +101,183 @@ outputs_labels = []
 """
 
 
+def nodes_linked_to_active_output(node_tree):
+    """ Return names of nodes feeding the active material output,
+        found once per node tree by a reverse traversal from the output
+    """
+    # var init
+    cache_key = node_tree.as_pointer()
+    if cache_key in active_output_cache:
+        return active_output_cache[cache_key]
+    # destination node name: source nodes
+    links_to = {}
+    linked_nodes = set()
+
+    # function core
+    for link in node_tree.links:
+        links_to.setdefault(link.to_node.name, []).append(link.from_node)
+
+    nodes_to_visit = [node for node in node_tree.nodes if (
+        isinstance(node, bpy.types.ShaderNodeOutputMaterial)
+        and node.is_active_output is True
+    )]
+    while len(nodes_to_visit) > 0:
+        node = nodes_to_visit.pop()
+        for from_node in links_to.get(node.name, ()):
+            if from_node.name not in linked_nodes:
+                linked_nodes.add(from_node.name)
+                nodes_to_visit.append(from_node)
+
+    active_output_cache[cache_key] = linked_nodes
+
+    return linked_nodes
+
+
+def invalidate_node_tree_cache(node_tree=None):
+    """ Forget cached infos of a node tree, or of all of them
+    """
+    if node_tree is None:
+        active_output_cache.clear()
+        texture_roles_cache.clear()
+    else:
+        active_output_cache.pop(node_tree.as_pointer(), None)
+        texture_roles_cache.pop(node_tree.as_pointer(), None)
+
+    return {'FINISHED'}
+
+
 def check_if_is_linked_to_active_output(node):
     """ Based on glTF-Blender-IO addon,
         adapted for this addon
     """
-    if len(node.outputs) > 0:
-        for out in node.outputs:
+    return node.name in nodes_linked_to_active_output(node.id_data)
+
+
+def get_active_principled(node_tree):
+    """ Return the Principled BSDF linked to active output, if any
+    """
+    linked_nodes = nodes_linked_to_active_output(node_tree)
+    for node in node_tree.nodes:
+        if node.type == 'BSDF_PRINCIPLED' and node.name in linked_nodes:
+            return node
+
+    return None
+
+
+def link_roles(node, link):
+    """ Return glTF roles given to a node by one of its output links
+    """
+    # var init
+    roles = set()
+    to_node = link.to_node
+    to_socket = link.to_socket.name
+
+    # function core
+    if to_node.type == 'BSDF_PRINCIPLED' and to_socket == 'Base Color':
+        roles.add("albedo")
+    if (
+        to_node.type == 'NORMAL_MAP'
+        or (to_node.type == 'BSDF_PRINCIPLED' and to_socket == 'Normal')
+    ):
+        roles.add("normal")
+    if (
+        to_node.type == 'EMISSION'
+        or (to_node.type == 'BSDF_PRINCIPLED' and to_socket == 'Emission')
+    ):
+        roles.add("emit")
+    if to_node.type == 'SEPRGB':
+        roles.add("orm")
+    elif node.type == 'TEX_IMAGE' and to_socket in orm_sockets:
+        # orm as separated images
+        roles.add("orm")
+        roles.add("orm_{}".format(orm_sockets[to_socket]))
+
+    return roles
+
+
+def node_tree_roles(node_tree):
+    """ Return the glTF roles index of a node tree,
+        built once by a single pass over its nodes
+    """
+    # var init
+    cache_key = node_tree.as_pointer()
+    if cache_key in texture_roles_cache:
+        return texture_roles_cache[cache_key]
+    active_principled = get_active_principled(node_tree)
+    roles_index = {
+        # image node name: roles of its color outputs, any link
+        "textures": {},
+        # (node name, output index): roles of its first link
+        "outputs": {},
+        "principled": active_principled.name if active_principled else None,
+        "gltf_settings": None,
+        "separate_rgb": None,
+        "uv_nodes": []
+    }
+
+    # function core
+    for node in node_tree.nodes:
+        if node.type == 'UVMAP' or node.type == 'NORMAL_MAP':
+            roles_index["uv_nodes"].append(node.name)
+        if (
+            node.type == 'GROUP'
+            and node.node_tree is not None
+            and node.node_tree.name in gltf_settings_groups
+            and roles_index["gltf_settings"] is None
+        ):
+            roles_index["gltf_settings"] = node.name
+        if node.type == 'SEPRGB' and roles_index["separate_rgb"] is None:
+            roles_index["separate_rgb"] = node.name
+
+        if node.type not in ('TEX_IMAGE', 'NORMAL_MAP', 'EMISSION', 'SEPRGB'):
+            continue
+
+        for out_index, out in enumerate(node.outputs):
+            roles = set()
+            if node.type == 'SEPRGB':
+                # channels can be handled even if unlinked
+                roles.add("orm_chans")
+            if len(out.links) > 0:
+                roles |= link_roles(node, out.links[0])
+                if node.type == 'NORMAL_MAP':
+                    roles.add("normal")
+                elif node.type == 'EMISSION':
+                    roles.add("emit")
+                elif node.type == 'SEPRGB':
+                    roles.add("orm")
+                if "orm" in roles:
+                    roles.add("orm_chans")
+            roles_index["outputs"][(node.name, out_index)] = roles
+
+            # image nodes, only color outputs
+            if node.type != 'TEX_IMAGE' or out.type != 'RGBA':
+                continue
             for link in out.links:
-                if (
-                    isinstance(
-                        link.to_node, bpy.types.ShaderNodeOutputMaterial)
-                    and link.to_node.is_active_output is True
-                ):
-                    return True
+                roles_index["textures"].setdefault(
+                    node.name, set()).update(link_roles(node, link))
 
-                # ignore non active output, not having output sockets
-                if len(link.to_node.outputs) > 0:
-                    # recursive until find an output material node
-                    ret = check_if_is_linked_to_active_output(
-                        link.to_node)
-                    if ret is True:
-                        return True
+    texture_roles_cache[cache_key] = roles_index
 
-    return False
+    return roles_index
+
+
+@persistent
+def node_tree_cache_depsgraph_update(scene, depsgraph):
+    """ Forget cached infos of edited materials
+    """
+    for update in depsgraph.updates:
+        updated_id = update.id.original
+        if isinstance(updated_id, bpy.types.Material) and updated_id.node_tree:
+            invalidate_node_tree_cache(updated_id.node_tree)
+        elif isinstance(updated_id, bpy.types.NodeTree):
+            invalidate_node_tree_cache(updated_id)
+
+
+@persistent
+def node_tree_cache_reset(*args):
+    """ File loaded or undo: cached infos are obsolete
+    """
+    invalidate_node_tree_cache()
 
 
 def set_backface_culling(toggle):
@@ -63,13 +286,11 @@ def set_backface_culling(toggle):
     """
     # var init
     selected_only = bpy.context.scene.retico_material_check_only_selected
-    objects_selected = selection_sets.meshes_with_materials(selected_only)
+    materials = selection_sets.materials_in_scope(selected_only)
 
     # materials
-    for obj in objects_selected:
-        for mat in obj.data.materials:
-            if mat is not None:
-                mat.use_backface_culling = toggle
+    for mat in materials:
+        mat.use_backface_culling = toggle
 
     # viewports
     for area in bpy.context.screen.areas:
@@ -85,87 +306,112 @@ def set_backface_culling(toggle):
 
 
 def set_blendmode():
-    """ Set Blend mode to Alpha Blend if alpha is linked or set
+    """ Set Blend mode from alpha: Opaque if fully opaque,
+        Alpha Clip if linked alpha is binary, Alpha Blend if not
     """
     # var init
     selected_only = bpy.context.scene.retico_material_check_only_selected
-    objects_selected = selection_sets.meshes_with_materials(selected_only)
+    clip_threshold = bpy.context.scene.retico_material_alpha_clip_threshold
+    materials = selection_sets.materials_in_scope(selected_only)
 
     # function core
-    for obj in objects_selected:
-        for mat in obj.data.materials:
-            if mat is not None and mat.use_nodes:
-                for node in mat.node_tree.nodes:
-                    if node.type == 'BSDF_TRANSPARENT':
-                        mat.blend_method = 'BLEND'
-                        continue
-                    if node.type == 'BSDF_PRINCIPLED':
-                        for inp in node.inputs:
-                            if inp.identifier != 'Alpha':
-                                continue
-                            if inp.default_value == 1.0 and not inp.is_linked:
-                                mat.blend_method = 'OPAQUE'
-                            if inp.default_value < 1 or inp.is_linked:
-                                mat.blend_method = 'BLEND'
+    for mat in materials:
+        if mat.use_nodes:
+            for node in mat.node_tree.nodes:
+                if node.type == 'BSDF_TRANSPARENT':
+                    mat.blend_method = 'BLEND'
+                    continue
+                if node.type == 'BSDF_PRINCIPLED':
+                    for inp in node.inputs:
+                        if inp.identifier != 'Alpha':
+                            continue
+                        if inp.is_linked:
+                            # linked image alpha is analysed, anything else is unknown
+                            link = inp.links[0]
+                            stats = None
+                            if link.from_node.type == 'TEX_IMAGE' and link.from_node.image is not None:
+                                stats = image_alpha_stats(
+                                    link.from_node.image, link.from_socket.name)
+                            mat.blend_method = alpha_blend_method(stats)
+                            if mat.blend_method == 'CLIP':
+                                mat.alpha_threshold = clip_threshold
+                        elif inp.default_value == 1.0:
+                            mat.blend_method = 'OPAQUE'
+                        else:
+                            mat.blend_method = 'BLEND'
 
     return {'FINISHED'}
 
 
+def image_alpha_stats(img, output_name='Alpha'):
+    """ Return alpha range of an image and if it's only made of 0 & 1,
+        None if image has no pixels, cached by image, its path, size & file stamp
+    """
+    # var init
+    # reloaded, replaced or saved images change key, not session_uid
+    filepath = bpy.path.abspath(img.filepath, library=img.library)
+    image_key = (
+        filepath,
+        tuple(img.size),
+        texture_file_stamp(filepath) if img.source == 'FILE' and img.packed_file is None else None
+    )
+    cached_key, image_stats = images_alpha_stats.get(img.session_uid, (None, {}))
+    if cached_key != image_key:
+        image_stats = {}
+        images_alpha_stats[img.session_uid] = (image_key, image_stats)
+    if output_name in image_stats and not img.is_dirty:
+        return image_stats[output_name]
+    tolerance = alpha_tolerance
+
+    # function core
+    if output_name == 'Alpha' and (img.channels < 4 or img.alpha_mode == 'NONE'):
+        # alpha output is always 1
+        stats = {"min": 1.0, "max": 1.0, "binary": True}
+    else:
+        alpha = image_channel(img, output_name)
+        if alpha.size == 0:
+            return None
+        stats = {
+            "min": float(alpha.min()),
+            "max": float(alpha.max()),
+            "binary": bool(np.all((alpha <= tolerance) | (alpha >= 1 - tolerance)))
+        }
+    image_stats[output_name] = stats
+
+    return stats
+
+
+def alpha_blend_method(stats):
+    """ Blend method matching alpha stats: OPAQUE if fully opaque,
+        CLIP if binary, BLEND for real gradients or unknown alpha
+    """
+    if stats is None:
+        return 'BLEND'
+    if stats["min"] >= 1 - alpha_tolerance:
+        return 'OPAQUE'
+    if stats["binary"]:
+        return 'CLIP'
+
+    return 'BLEND'
+
+
 def set_active_texture(textureType="albedo"):
     """ Set a specific texture node to active,
         useful when viewport is shade as Solid -> Texture
     """
     # var init
     selected_only = bpy.context.scene.retico_material_check_only_selected
-    objects_selected = selection_sets.meshes_with_materials(selected_only)
+    materials = selection_sets.materials_in_scope(selected_only)
 
     # function core
-    for obj in objects_selected:
-        mesh = obj.data
-        for mat in mesh.materials:
-            if mat.use_nodes:
-                for node in mat.node_tree.nodes:
-                    if node.type != 'TEX_IMAGE':
-                        # we only want textures
-                        continue
-                    for out in node.outputs:
-                        if out.type != 'RGBA':
-                            # just need color output
-                            continue
-                        for link in out.links:
-                            if (
-                                (textureType == "albedo"
-                                 and link.to_node.type == 'BSDF_PRINCIPLED'
-                                 and link.to_socket.name == 'Base Color'
-                                 )
-                                or (
-                                    textureType == "orm"
-                                    and link.to_node.type == 'SEPRGB'
-                                    and link.to_socket.name == 'Image'
-                                )
-                                or (
-                                    textureType == "normal"
-                                    and link.to_node.type == 'NORMAL_MAP'
-                                    and link.to_socket.name == 'Color'
-                                )
-                                or (
-                                    textureType == "emit"
-                                    and (
-                                        (
-                                            # linked to Emission node
-                                            link.to_node.type == 'EMISSION'
-                                            and link.to_socket.name == 'Color'
-                                        )
-                                        or(
-                                            # linked to Principled
-                                            link.to_node.type == 'BSDF_PRINCIPLED'
-                                            and link.to_socket.name == 'Emission'
-                                        )
-                                    )
-                                )
-                            ):
-                                node.select = True
-                                mat.node_tree.nodes.active = node
+    for mat in materials:
+        if mat.use_nodes:
+            textures = node_tree_roles(mat.node_tree)["textures"]
+            for node_name, roles in textures.items():
+                if textureType in roles:
+                    node = mat.node_tree.nodes[node_name]
+                    node.select = True
+                    mat.node_tree.nodes.active = node
 
     # update viewport
     bpy.ops.wm.redraw_timer(type='DRAW', iterations=1)
@@ -184,16 +430,18 @@ def set_active_texture(textureType="albedo"):
     return {'FINISHED'}
 
 
-def transfer_names():
-    """ Name materials using "meshName.matID.000" pattern
+def transfer_names(dry_run=False):
+    """ Name materials using "meshName.matID.000" pattern,
+        return planned renames and conflicts as report lines
     """
     # var init
     user_active = bpy.context.view_layer.objects.active
     is_user_in_edit_mode = False
     selected_only = bpy.context.scene.retico_material_check_only_selected
+    targets = []
 
     # handling active object
-    if bpy.context.view_layer.objects.active.mode == 'EDIT':
+    if user_active and user_active.mode == 'EDIT':
         is_user_in_edit_mode = True
         bpy.ops.object.mode_set(mode='OBJECT')
 
@@ -202,29 +450,229 @@ def transfer_names():
     ) if selected_only else selection_sets.meshes_selectable()
     for obj in objects_selected:
         object_materials = obj.data.materials
-        if len(object_materials) > 0:
-            bpy.context.view_layer.objects.active = obj
-            for index in range(len(object_materials)):
-                if object_materials[index] is not None:
-                    object_materials[index].name = "{}.{:02}.000".format(
-                        obj.name, (index + 1))
+        for index in range(len(object_materials)):
+            if object_materials[index] is not None:
+                targets.append((object_materials[index], "{}.{:02}.000".format(
+                    obj.name, (index + 1))))
+
+    # shared materials: last object wins, as first target wins in planner
+    targets.reverse()
+    steps, conflicts = selection_sets.plan_renames(bpy.data.materials, targets)
+    if not dry_run:
+        selection_sets.apply_renames(steps)
 
     # handling active object
-    bpy.context.view_layer.objects.active = user_active
     if is_user_in_edit_mode:
         bpy.ops.object.mode_set(mode='EDIT')
 
-    return {'FINISHED'}
+    return selection_sets.renames_report(steps, conflicts)
+
+
+def texture_file_stamp(filepath):
+    """ Return (filepath, mtime, size) of a texture file, None if missing
+    """
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
 
+    return filepath, stat.st_mtime_ns, stat.st_size
 
-def reload_textures():
-    """ Refresh all textures files
+
+def textures_on_disk():
+    """ Return images using an external file, with their absolute path,
+        packed, generated and tiled images are skipped
     """
+    # var init
+    images = []
+    skipped = 0
 
+    # function core
     for img in bpy.data.images:
-        img.reload()
+        if (
+            img.source != 'FILE'
+            or img.packed_file is not None
+            or img.filepath == ""
+        ):
+            skipped += 1
+            continue
+        images.append(
+            (img, bpy.path.abspath(img.filepath, library=img.library)))
 
-    return {'FINISHED'}
+    return images, skipped
+
+
+def reload_textures(prime_only=False):
+    """ Refresh textures files changed since last check,
+        files are stat from a thread pool and compared to cached stamps
+    """
+    # var init
+    images, skipped = textures_on_disk()
+    reloaded = []
+
+    # function core
+    with ThreadPoolExecutor() as executor:
+        stamps = list(executor.map(
+            texture_file_stamp, [filepath for img, filepath in images]))
+
+    for (img, filepath), stamp in zip(images, stamps):
+        if stamp is None:
+            # missing file, reloading would only lose pixels
+            skipped += 1
+            continue
+        if textures_stamps.get(img.session_uid) == stamp:
+            skipped += 1
+            continue
+        if img.session_uid in textures_stamps or not prime_only:
+            img.reload()
+            images_alpha_stats.pop(img.session_uid, None)
+            reloaded.append(img)
+        textures_stamps[img.session_uid] = stamp
+
+    return reloaded, skipped
+
+
+def textures_watch_timer():
+    """ Reload changed textures while watch mode is on
+    """
+    scene = bpy.context.scene
+    if scene is None or not scene.retico_material_textures_watch:
+        return None
+
+    reloaded, skipped = reload_textures()
+    if len(reloaded) > 0:
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                area.tag_redraw()
+
+    return scene.retico_material_textures_watch_interval
+
+
+def textures_watch_toggle(self, context):
+    """ Start or stop polling textures files
+    """
+    if bpy.app.timers.is_registered(textures_watch_timer):
+        bpy.app.timers.unregister(textures_watch_timer)
+    if context.scene.retico_material_textures_watch:
+        # current files are the reference, no reload on first poll
+        reload_textures(prime_only=True)
+        bpy.app.timers.register(
+            textures_watch_timer,
+            first_interval=context.scene.retico_material_textures_watch_interval)
+
+
+@persistent
+def textures_watch_reset(*args):
+    """ File loaded: stamps of its textures are the new reference,
+        restart watching if file asks for it
+    """
+    textures_stamps.clear()
+    images_alpha_stats.clear()
+    reload_textures(prime_only=True)
+    textures_watch_toggle(None, bpy.context)
+
+
+def file_digest(filepath):
+    """ Return content hash of a file, None if unreadable
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(filepath, "rb") as image_file:
+            for chunk in iter(lambda: image_file.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+
+    return digest.hexdigest()
+
+
+def bytes_digest(data):
+    """ Return content hash of bytes
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def image_file_digest(stamp):
+    """ Return content hash of an image file, reusing the cached one
+        while its (filepath, mtime, size) stamp is unchanged
+    """
+    if stamp not in images_digests:
+        images_digests[stamp] = file_digest(stamp[0])
+
+    return images_digests[stamp]
+
+
+def find_duplicate_images():
+    """ Group images with same content, size, colorspace & alpha mode,
+        files are hashed from a thread pool, packed images from their pixels
+    """
+    # var init
+    images = []
+    groups = {}
+
+    # function core
+    for img in bpy.data.images:
+        if img.type != 'IMAGE' or img.source != 'FILE':
+            # generated, tiled, render results...
+            continue
+        if img.packed_file is not None:
+            pixels = np.empty(len(img.pixels), dtype=np.float32)
+            img.pixels.foreach_get(pixels)
+            images.append((img, pixels.tobytes()))
+        elif img.filepath != "":
+            images.append(
+                (img, bpy.path.abspath(img.filepath, library=img.library)))
+
+    with ThreadPoolExecutor() as executor:
+        stamps = list(executor.map(
+            texture_file_stamp, [source for img, source in images
+                                 if isinstance(source, str)]))
+        stamps = iter(stamps)
+        futures = []
+        for img, source in images:
+            if isinstance(source, str):
+                stamp = next(stamps)
+                futures.append(None if stamp is None else executor.submit(
+                    image_file_digest, stamp))
+            else:
+                futures.append(executor.submit(bytes_digest, source))
+        digests = [None if future is None else future.result()
+                   for future in futures]
+
+    for (img, source), digest in zip(images, digests):
+        if digest is None:
+            # missing file
+            continue
+        # packed pixels bytes alone don't tell the image dimensions
+        key = (digest, tuple(img.size), img.colorspace_settings.name, img.alpha_mode)
+        groups.setdefault(key, []).append(img)
+
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def dedupe_images():
+    """ Remap duplicated images to a single one and remove the others,
+        return (kept image name, [removed images names]) for each group
+    """
+    # var init
+    report = []
+
+    # function core
+    for group in find_duplicate_images():
+        # most used image is kept, then first by name
+        group.sort(key=lambda img: (-img.users, img.name))
+        canonical = group[0]
+        duplicates_names = []
+        for img in group[1:]:
+            duplicates_names.append(img.name)
+            img.user_remap(canonical)
+            bpy.data.images.remove(img)
+        report.append((canonical.name, duplicates_names))
+
+    if len(report) > 0:
+        invalidate_node_tree_cache()
+
+    return report
 
 
 def gltf_fix_colorspace():
@@ -232,41 +680,21 @@ def gltf_fix_colorspace():
     """
     # var init
     selected_only = bpy.context.scene.retico_material_check_only_selected
-    objects_selected = selection_sets.meshes_with_materials(selected_only)
+    materials = selection_sets.materials_in_scope(selected_only)
 
     # function core
-    for obj in objects_selected:
-        mesh = obj.data
-        for mat in mesh.materials:
-            if mat.use_nodes:
-                for node in mat.node_tree.nodes:
-                    if node.type != 'TEX_IMAGE' or not node.image:
-                        # node have to pass first tests
-                        continue
-                    for out in node.outputs:
-                        if out.type != 'RGBA':
-                            # output have to pass test
-                            continue
-                        for link in out.links:
-                            # only albedo and emit are sRGB
-                            if (
-                                (
-                                    # albedo
-                                    link.to_node.type == 'BSDF_PRINCIPLED'
-                                    and link.to_socket.name == 'Base Color'
-                                )
-                                or (
-                                    # emit
-                                    link.to_node.type == 'EMISSION'
-                                    or (
-                                        link.to_node.type == 'BSDF_PRINCIPLED'
-                                        and link.to_socket.name == 'Emission'
-                                    )
-                                )
-                            ):
-                                node.image.colorspace_settings.name = 'sRGB'
-                            else:
-                                node.image.colorspace_settings.name = 'Non-Color'
+    for mat in materials:
+        if mat.use_nodes:
+            textures = node_tree_roles(mat.node_tree)["textures"]
+            for node_name, roles in textures.items():
+                node = mat.node_tree.nodes[node_name]
+                if not node.image:
+                    continue
+                # only albedo and emit are sRGB
+                if "albedo" in roles or "emit" in roles:
+                    node.image.colorspace_settings.name = 'sRGB'
+                else:
+                    node.image.colorspace_settings.name = 'Non-Color'
 
     return {'FINISHED'}
 
@@ -286,50 +714,51 @@ def gltf_fix_uvnode_naming(operator):
         for mat in mesh.materials:
             if mat.use_nodes:
                 naming_issue = False
-                for node in mat.node_tree.nodes:
-                    # node have to be an UVMAP or NORMAL_MAP type
-                    if node.type == 'UVMAP' or node.type == 'NORMAL_MAP':
-                        is_uv_chan_exists = False
-                        uv_layers_number = len(mesh.uv_layers)
-
-                        # no uv on mesh, skipping
-                        if uv_layers_number == 0:
-                            naming_issue = True
-                            continue
+                uv_nodes = node_tree_roles(mat.node_tree)["uv_nodes"]
+                for node_name in uv_nodes:
+                    node = mat.node_tree.nodes[node_name]
+                    # node is an UVMAP or NORMAL_MAP type
+                    is_uv_chan_exists = False
+                    uv_layers_number = len(mesh.uv_layers)
+
+                    # no uv on mesh, skipping
+                    if uv_layers_number == 0:
+                        naming_issue = True
+                        continue
 
-                        # if no uvmap is set, assigning uv1
-                        if not node.uv_map and uv_layers_number > 0:
-                            node.uv_map = mesh.uv_layers[0].name
-                            continue
+                    # if no uvmap is set, assigning uv1
+                    if not node.uv_map and uv_layers_number > 0:
+                        node.uv_map = mesh.uv_layers[0].name
+                        continue
 
-                        # if node is using existing mesh chan, no pb, skipping
-                        for uvchan in mesh.uv_layers:
-                            if node.uv_map in uvchan.name:
-                                is_uv_chan_exists = True
-                        if is_uv_chan_exists:
-                            continue
+                    # if node is using existing mesh chan, no pb, skipping
+                    for uvchan in mesh.uv_layers:
+                        if node.uv_map in uvchan.name:
+                            is_uv_chan_exists = True
+                    if is_uv_chan_exists:
+                        continue
 
-                        # blender default naming
-                        if "UVMap." in node.uv_map:
-                            # "UVMap.001" give us "1" as int
-                            try:
-                                channel_number = int(
-                                    str(node.uv_map).split("UVMap.")[1])
-                                node.uv_map = mesh.uv_layers[channel_number].name
-                            except:
-                                naming_issue = True
-                        # gltf naming
-                        elif "TEXCOORD_" in node.uv_map:
-                            # "TEXCOORD_0" give us "0" as int
-                            try:
-                                channel_number = int(
-                                    str(node.uv_map).split("TEXCOORD_")[1])
-                                node.uv_map = mesh.uv_layers[channel_number].name
-                            except:
-                                naming_issue = True
-                        # random naming, can't guess
-                        else:
+                    # blender default naming
+                    if "UVMap." in node.uv_map:
+                        # "UVMap.001" give us "1" as int
+                        try:
+                            channel_number = int(
+                                str(node.uv_map).split("UVMap.")[1])
+                            node.uv_map = mesh.uv_layers[channel_number].name
+                        except:
+                            naming_issue = True
+                    # gltf naming
+                    elif "TEXCOORD_" in node.uv_map:
+                        # "TEXCOORD_0" give us "0" as int
+                        try:
+                            channel_number = int(
+                                str(node.uv_map).split("TEXCOORD_")[1])
+                            node.uv_map = mesh.uv_layers[channel_number].name
+                        except:
                             naming_issue = True
+                    # random naming, can't guess
+                    else:
+                        naming_issue = True
 
                 if naming_issue:
                     materials_error += "{} ({}), ".format(mat.name, obj.name)
@@ -349,279 +778,162 @@ def gltf_mute_textures(exclude="albedo"):
     # var ini
     selected_only = bpy.context.scene.retico_material_check_only_selected
     is_texnode_detected = False
-    objects_selected = selection_sets.meshes_with_materials(selected_only)
+    materials = selection_sets.materials_in_scope(selected_only)
     # function core
-    for obj in objects_selected:
-        mesh = obj.data
-        for mat in mesh.materials:
-            if mat.use_nodes:
-                for node in mat.node_tree.nodes:
-
-                    if node.type == 'OUTPUT_MATERIAL' or node.type == 'ADD_SHADER':
-                        # skip if not concern
-                        continue
+    for mat in materials:
+        if mat.use_nodes:
+            nodes = mat.node_tree.nodes
+            for node in nodes:
 
-                    if exclude == "unmute":
-                        # in case we just want to unmute, no need to go further
-                        node.mute = False
-                        # as SEPRGB can be unliked, we have to relink if so
-                        if node.type == 'SEPRGB':
-                            for out in node.outputs:
-                                if not out.is_linked:
-                                    active_principled = [node for node in mat.node_tree.nodes if (
-                                        node.type == 'BSDF_PRINCIPLED' and check_if_is_linked_to_active_output(node))][0]
-                                    # roughness (G) by default
-                                    input = active_principled.inputs['Roughness']
-                                    # occlusion specific
-                                    if out.name == "R":
-                                        gltfSettings = [node for node in mat.node_tree.nodes if (
-                                            node.type == 'GROUP'
-                                            and node.node_tree.original == bpy.data.node_groups['glTF Settings']
-                                        )]
-                                        if len(gltfSettings) > 0:
-                                            gltfSettings = gltfSettings[0]
-                                            input = gltfSettings.inputs['Occlusion']
-                                    # metallic
-                                    elif out.name == "B":
-                                        input = active_principled.inputs['Metallic']
-
-                                    mat.node_tree.links.new(
-                                        input, out, verify_limits=True)
-                        # save the status
-                        for textype in gltf_active_texnodes:
-                            if textype != "orm_chans":
-                                gltf_active_texnodes[textype] = True
-                            else:
-                                gltf_active_texnodes[textype] = False
-                        continue
+                if node.type == 'OUTPUT_MATERIAL' or node.type == 'ADD_SHADER':
+                    # skip if not concern
+                    continue
 
-                    if exclude == "mute" and node.type.find("BSDF") == -1:
-                        # even when muting, we still want our basic nodes (BSDF) to be active
-                        node.mute = True
-                        for textype in gltf_active_texnodes:
+                if exclude == "unmute":
+                    # in case we just want to unmute, no need to go further
+                    node.mute = False
+                    # as SEPRGB can be unliked, we have to relink if so
+                    if node.type == 'SEPRGB':
+                        for out in node.outputs:
+                            if not out.is_linked:
+                                roles_index = node_tree_roles(
+                                    mat.node_tree)
+                                active_principled = nodes[roles_index["principled"]]
+                                # roughness (G) by default
+                                input = active_principled.inputs['Roughness']
+                                # occlusion specific
+                                if (
+                                    out.name == "R"
+                                    and roles_index["gltf_settings"]
+                                ):
+                                    gltfSettings = nodes[roles_index["gltf_settings"]]
+                                    input = gltfSettings.inputs['Occlusion']
+                                # metallic
+                                elif out.name == "B":
+                                    input = active_principled.inputs['Metallic']
+
+                                mat.node_tree.links.new(
+                                    input, out, verify_limits=True)
+                                invalidate_node_tree_cache(mat.node_tree)
+                    # save the status
+                    for textype in gltf_active_texnodes:
+                        if textype != "orm_chans":
+                            gltf_active_texnodes[textype] = True
+                        else:
                             gltf_active_texnodes[textype] = False
+                    continue
+
+                if exclude == "mute" and node.type.find("BSDF") == -1:
+                    # even when muting, we still want our basic nodes (BSDF) to be active
+                    node.mute = True
+                    for textype in gltf_active_texnodes:
+                        gltf_active_texnodes[textype] = False
+                    continue
+
+                for out_index, out in enumerate(node.outputs):
+                    # index is rebuilt if previous outputs changed links
+                    roles_index = node_tree_roles(mat.node_tree)
+                    roles = roles_index["outputs"].get(
+                        (node.name, out_index))
+                    if roles is None:
+                        # not an image, normal map, emission or sepRGB node
                         continue
 
-                    for out in node.outputs:
-                        if (
+                    if exclude in ("albedo", "normal", "emit", "orm") and exclude in roles:
+                        # for ORM, we need to reset some settings
+                        if exclude == "orm":
+                            chan_target = ["R", "G", "B"]
+                            active_principled = nodes[roles_index["principled"]]
+                            for chan in chan_target:
+                                # roughness (G) by default
+                                input = active_principled.inputs['Roughness']
+                                # occlusion specific
+                                if chan == "R" and roles_index["gltf_settings"]:
+                                    gltfSettings = nodes[roles_index["gltf_settings"]]
+                                    input = gltfSettings.inputs['Occlusion']
+                                # metallic
+                                elif chan == "B":
+                                    input = active_principled.inputs['Metallic']
+
+                                # checking if sepRGB exists
+                                if roles_index["separate_rgb"]:
+                                    sepRGB = nodes[roles_index["separate_rgb"]]
+
+                                    output = sepRGB.outputs[chan]
+
+                                    if not sepRGB.outputs[chan].is_linked:
+                                        mat.node_tree.links.new(
+                                            input, output, verify_limits=True)
+                                        invalidate_node_tree_cache(mat.node_tree)
+
+                            gltf_active_texnodes["orm_chans"] = False
+                            gltf_active_texnodes["orm_chans_R"] = True
+                            gltf_active_texnodes["orm_chans_G"] = True
+                            gltf_active_texnodes["orm_chans_B"] = True
+
+                        node.mute = gltf_active_texnodes[exclude]
+                        is_texnode_detected = True
+
+                    elif exclude.find("orm_chans_") != -1 and "orm_chans" in roles:
+                        gltf_active_texnodes["orm"] = False
+                        active_principled = nodes[roles_index["principled"]]
+
+                        # occlusion (R) roughness (G) metallic (B)
+                        chan_name = exclude.split("orm_chans_")[1]
+                        # occlusion is handled in a different way
+                        chan_target = (
+                            "Roughness" if chan_name == "G" else "Metallic")
+                        # orm as separated images, feeding this channel
+                        is_chan_image = (
                             node.type == 'TEX_IMAGE'
-                            or node.type == 'NORMAL_MAP'
-                            or node.type == 'EMISSION'
-                            or node.type == 'SEPRGB'
-                        ):
-
-                            if (
-                                len(out.links) > 0
-                                and (
-                                    # albedo nodes
-                                    (
-                                        exclude == "albedo"
-                                        and out.links[0].to_node.type == 'BSDF_PRINCIPLED'
-                                        and out.links[0].to_socket.name == 'Base Color'
-                                    )
-                                    # normal nodes
-                                    or (
-                                        exclude == "normal"
-                                        and (
-                                            (
-                                                # texnode linked to normal map node
-                                                out.links[0].to_node.type == 'NORMAL_MAP'
-                                                # texnode linked to principled
-                                                or (
-                                                    out.links[0].to_node.type == 'BSDF_PRINCIPLED'
-                                                    and out.links[0].to_socket.name == 'Normal'
-                                                )
-                                            )
-                                            # normal map node
-                                            or node.type == 'NORMAL_MAP'
-                                        )
-                                    )
-                                    # emissive nodes
-                                    or (
-                                        exclude == "emit"
-                                        and (
-                                            node.type == 'EMISSION'
-                                            or out.links[0].to_node.type == 'EMISSION'
-                                            or (
-                                                # linked to Principled
-                                                out.links[0].to_node.type == 'BSDF_PRINCIPLED'
-                                                and out.links[0].to_socket.name == 'Emission'
-                                            )
-                                        )
-                                    )
-                                    # orm nodes
-                                    or (
-                                        exclude == "orm"
-                                        and (
-                                            (
-                                                # using SEPRGB node
-                                                node.type == 'SEPRGB'
-                                                or out.links[0].to_node.type == 'SEPRGB'
-                                            )
-                                            or (
-                                                # orm as separated images
-                                                node.type == 'TEX_IMAGE'
-                                                and (
-                                                    out.links[0].to_socket.name == "Occlusion"
-                                                    or out.links[0].to_socket.name == "Roughness"
-                                                    or out.links[0].to_socket.name == "Metallic"
-                                                )
-                                            )
-                                        )
-                                    )
-                                )
-                            ):
-                                # for ORM, we need to reset some settings
-                                if exclude == "orm":
-                                    chan_target = ["R", "G", "B"]
-                                    active_principled = [node for node in mat.node_tree.nodes if (
-                                        node.type == 'BSDF_PRINCIPLED' and check_if_is_linked_to_active_output(node))][0]
-                                    for chan in chan_target:
-                                        # roughness (G) by default
-                                        input = active_principled.inputs['Roughness']
-                                        # occlusion specific
-                                        if chan == "R":
-                                            gltfSettings = [node for node in mat.node_tree.nodes if (
-                                                node.type == 'GROUP'
-                                                and node.node_tree.original == bpy.data.node_groups['glTF Settings']
-                                            )]
-                                            if len(gltfSettings) > 0:
-                                                gltfSettings = gltfSettings[0]
-                                                input = gltfSettings.inputs['Occlusion']
-                                        # metallic
-                                        elif chan == "B":
-                                            input = active_principled.inputs['Metallic']
-
-                                        # checking if sepRGB exists
-                                        sepRGB = [
-                                            node for node in mat.node_tree.nodes if node.type == 'SEPRGB']
-                                        if len(sepRGB) > 0:
-                                            sepRGB = sepRGB[0]
-
-                                            output = sepRGB.outputs[chan]
-
-                                            if not sepRGB.outputs[chan].is_linked:
-                                                mat.node_tree.links.new(
-                                                    input, output, verify_limits=True)
-
-                                    gltf_active_texnodes["orm_chans"] = False
-                                    gltf_active_texnodes["orm_chans_R"] = True
-                                    gltf_active_texnodes["orm_chans_G"] = True
-                                    gltf_active_texnodes["orm_chans_B"] = True
-
-                                node.mute = gltf_active_texnodes[exclude]
-                                is_texnode_detected = True
-
-                            elif (
-                                exclude.find("orm_chans_") != -1
-                                and (
-                                    (
-                                        # using SEPRGB node
-                                        node.type == 'SEPRGB'
-                                        or (
-                                            len(out.links) > 0
-                                            and out.links[0].to_node.type == 'SEPRGB'
-                                        )
-                                    )
-                                    or (
-                                        # orm as separated images
-                                        node.type == 'TEX_IMAGE'
-                                        and (
-                                            len(out.links) > 0
-                                            and (
-                                                out.links[0].to_socket.name == "Occlusion"
-                                                or out.links[0].to_socket.name == "Roughness"
-                                                or out.links[0].to_socket.name == "Metallic"
-                                            )
-                                        )
-                                    )
-                                )
-                            ):
-                                gltf_active_texnodes["orm"] = False
-                                active_principled = [node for node in mat.node_tree.nodes if (
-                                    node.type == 'BSDF_PRINCIPLED' and check_if_is_linked_to_active_output(node))][0]
-
-                                # occlusion (R) roughness (G) metallic (B)
-                                chan_name = exclude.split("orm_chans_")[1]
-                                # occlusion is handled in a different way
-                                chan_target = (
-                                    "Roughness" if chan_name == "G" else "Metallic")
-
-                                # unlink
-
-                                if gltf_active_texnodes["orm_chans_{}".format(
-                                        chan_name)]:
-                                    if(
-                                       node.type == 'SEPRGB'
-                                       and len(node.outputs[chan_name].links) > 0
-                                       ):
-                                        link = node.outputs[chan_name].links[0]
-                                        mat.node_tree.links.remove(link)
-                                    elif (
-                                        # orm as separated images
-                                        node.type == 'TEX_IMAGE'
-                                        and len(out.links) > 0
-                                    ):
-                                        if (
-                                            (chan_name == "R"
-                                             and out.links[0].to_socket.name == "Occlusion")
-                                            or (chan_name == "G"
-                                                and out.links[0].to_socket.name == "Roughness")
-                                            or (chan_name == "B"
-                                                and out.links[0].to_socket.name == "Metallic")
-                                        ):
-                                            # as image are separated, no need to unlink
-                                            print("mute {}, {}".format(
-                                                node.label, chan_name))
-                                            node.mute = True
-
-                                # link
-
-                                else:
-                                    input = active_principled.inputs[chan_target]
-                                    # occlusion specific
-                                    if chan_name == "R":
-                                        # glTFSettings node detection
-                                        gltfSettings = [node for node in mat.node_tree.nodes if (
-                                            node.type == 'GROUP'
-                                            and node.node_tree.original == bpy.data.node_groups['glTF Settings']
-                                        )]
-                                        if len(gltfSettings) > 0:
-                                            gltfSettings = gltfSettings[0]
-                                            input = gltfSettings.inputs['Occlusion']
-                                            output = ""
-                                            if node.type == 'SEPRGB':
-                                                output = node.outputs[chan_name]
-                                                mat.node_tree.links.new(
-                                                    input, output, verify_limits=True)
-                                            elif (
-                                                # orm as separated images
-                                                node.type == 'TEX_IMAGE'
-                                                and len(out.links) > 0
-                                                and out.links[0].to_socket.name == "Occlusion"
-                                            ):
-                                                node.mute = False
-                                    elif node.type == 'SEPRGB':
+                            and "orm_{}".format(chan_name) in roles
+                        )
+
+                        # unlink
+
+                        if gltf_active_texnodes["orm_chans_{}".format(
+                                chan_name)]:
+                            if(
+                               node.type == 'SEPRGB'
+                               and len(node.outputs[chan_name].links) > 0
+                               ):
+                                link = node.outputs[chan_name].links[0]
+                                mat.node_tree.links.remove(link)
+                                invalidate_node_tree_cache(mat.node_tree)
+                            elif is_chan_image:
+                                # as image are separated, no need to unlink
+                                print("mute {}, {}".format(
+                                    node.label, chan_name))
+                                node.mute = True
+
+                        # link
+
+                        else:
+                            input = active_principled.inputs[chan_target]
+                            # occlusion specific
+                            if chan_name == "R":
+                                # glTFSettings node detection
+                                if roles_index["gltf_settings"]:
+                                    gltfSettings = nodes[roles_index["gltf_settings"]]
+                                    input = gltfSettings.inputs['Occlusion']
+                                    output = ""
+                                    if node.type == 'SEPRGB':
                                         output = node.outputs[chan_name]
                                         mat.node_tree.links.new(
                                             input, output, verify_limits=True)
-                                    elif (
-                                        # orm as separated images
-                                        node.type == 'TEX_IMAGE'
-                                        and len(out.links) > 0
-                                    ):
-                                        if (
-                                            (chan_name == "R"
-                                             and out.links[0].to_socket.name == "Occlusion")
-                                            or (chan_name == "G"
-                                                and out.links[0].to_socket.name == "Roughness")
-                                            or (chan_name == "B"
-                                                and out.links[0].to_socket.name == "Metallic")
-                                        ):
-                                            # as image are separated, no need to relink
-                                            node.mute = False
-
-                                is_texnode_detected = True
+                                        invalidate_node_tree_cache(mat.node_tree)
+                                    elif is_chan_image:
+                                        node.mute = False
+                            elif node.type == 'SEPRGB':
+                                output = node.outputs[chan_name]
+                                mat.node_tree.links.new(
+                                    input, output, verify_limits=True)
+                                invalidate_node_tree_cache(mat.node_tree)
+                            elif is_chan_image:
+                                # as image are separated, no need to relink
+                                node.mute = False
+
+                        is_texnode_detected = True
 
     if is_texnode_detected:
         gltf_active_texnodes[exclude] = not gltf_active_texnodes[exclude]
@@ -630,6 +942,975 @@ def gltf_mute_textures(exclude="albedo"):
     return {'FINISHED'}
 
 
+def image_pixels(img):
+    """ Return an image pixels as a (height, width, 4) RGBA array
+    """
+    # var init
+    width, height = img.size
+    channels = img.channels
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+
+    # function core
+    img.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(height, width, channels)
+    if channels == 4:
+        return pixels
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    if channels < 3:
+        # grayscale, with or without alpha
+        rgba[:, :, :3] = pixels[:, :, :1]
+        if channels == 2:
+            rgba[:, :, 3] = pixels[:, :, 1]
+    else:
+        rgba[:, :, :3] = pixels[:, :, :3]
+
+    return rgba
+
+
+def image_channel(img, output_name='Color'):
+    """ Return one channel of an image pixels as a (height, width) array,
+        red for a color output, alpha for an alpha output
+    """
+    return image_pixels(img)[:, :, 3 if output_name == 'Alpha' else 0]
+
+
+def resize_pixels(pixels, width, height):
+    """ Bilinear resize of a (height, width) or (height, width, channels) array
+    """
+    # var init
+    source_height, source_width = pixels.shape[:2]
+    if source_width == width and source_height == height:
+        return pixels
+    # extra axes so weights broadcast over channels
+    extra_axes = (1,) * (pixels.ndim - 2)
+
+    # function core
+    x = np.clip((np.arange(width) + 0.5) * source_width / width - 0.5,
+                0, source_width - 1)
+    y = np.clip((np.arange(height) + 0.5) * source_height / height - 0.5,
+                0, source_height - 1)
+    x0 = np.floor(x).astype(np.int64)
+    y0 = np.floor(y).astype(np.int64)
+    x1 = np.minimum(x0 + 1, source_width - 1)
+    y1 = np.minimum(y0 + 1, source_height - 1)
+    fx = (x - x0).astype(np.float32).reshape((width,) + extra_axes)
+    fy = (y - y0).astype(np.float32).reshape((height, 1) + extra_axes)
+
+    top = pixels[y0][:, x0] * (1 - fx) + pixels[y0][:, x1] * fx
+    bottom = pixels[y1][:, x0] * (1 - fx) + pixels[y1][:, x1] * fx
+
+    return top * (1 - fy) + bottom * fy
+
+
+def new_packed_image(name, pixels, colorspace='Non-Color'):
+    """ Create an image from (height, width, 4) pixels, packed in blend file
+    """
+    height, width = pixels.shape[:2]
+    img = bpy.data.images.new(name, width, height,
+                              alpha=bool((pixels[:, :, 3] < 1).any()))
+    img.colorspace_settings.name = colorspace
+    img.pixels.foreach_set(pixels.ravel())
+    img.file_format = 'PNG'
+    img.pack()
+
+    return img
+
+
+def image_hash_key(img):
+    """ Return what identifies an image content: its file stamp,
+        or its pixels for packed and generated images
+    """
+    if img.source == 'FILE' and img.packed_file is None and img.filepath != "":
+        stamp = texture_file_stamp(
+            bpy.path.abspath(img.filepath, library=img.library))
+        if stamp is not None:
+            return repr(stamp).encode()
+
+    pixels = np.empty(len(img.pixels), dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+
+    return pixels.tobytes()
+
+
+def orm_sources(node_tree):
+    """ Return separated occlusion, roughness & metallic images of a node tree,
+        as channel: (image node, output name, [linked sockets])
+    """
+    # var init
+    roles_index = node_tree_roles(node_tree)
+    sources = {}
+
+    # function core
+    for (node_name, out_index), roles in roles_index["outputs"].items():
+        node = node_tree.nodes[node_name]
+        if node.type != 'TEX_IMAGE' or node.image is None:
+            continue
+        out = node.outputs[out_index]
+        for link in out.links:
+            chan = orm_sockets.get(link.to_socket.name)
+            if chan is None or "orm_{}".format(chan) not in roles:
+                continue
+            if chan not in sources:
+                sources[chan] = (node, out.name, [])
+            if sources[chan][0] == node:
+                sources[chan][2].append(link.to_socket)
+
+    return sources
+
+
+def texture_sampling(node):
+    """ Return how an image node is sampled: linked vector socket,
+        interpolation, projection & extension
+    """
+    vector_links = node.inputs['Vector'].links
+    vector_from = (vector_links[0].from_node.name, vector_links[0].from_socket.identifier) \
+        if len(vector_links) > 0 else None
+
+    return vector_from, node.interpolation, node.projection, node.extension
+
+
+def pack_orm_material(mat):
+    """ Pack separated occlusion, roughness & metallic images of a material
+        into a single ORM image, rewired through a Separate RGB node,
+        return "packed", "cached" or None if nothing to pack
+    """
+    # var init
+    node_tree = mat.node_tree
+    roles_index = node_tree_roles(node_tree)
+    sources = orm_sources(node_tree)
+    if len(sources) < 2 or roles_index["separate_rgb"] is not None:
+        return None
+    principled = node_tree.nodes.get(roles_index["principled"] or "")
+    # value used when a channel has no image
+    defaults = {
+        "R": 1.0,
+        "G": principled.inputs['Roughness'].default_value if principled else 0.5,
+        "B": principled.inputs['Metallic'].default_value if principled else 0.0
+    }
+    width = max(source[0].image.size[0] for source in sources.values())
+    height = max(source[0].image.size[1] for source in sources.values())
+    if width == 0 or height == 0:
+        return None
+    # images sampled differently (UV map, mapping, tiling...) can't share a texture
+    if len({texture_sampling(source[0]) for source in sources.values()}) > 1:
+        return None
+
+    # function core
+    inputs_hash = hashlib.blake2b(digest_size=16)
+    inputs_hash.update("{}x{}".format(width, height).encode())
+    for chan in ("R", "G", "B"):
+        if chan in sources:
+            node, output_name, sockets = sources[chan]
+            inputs_hash.update(output_name.encode())
+            inputs_hash.update(image_hash_key(node.image))
+        else:
+            inputs_hash.update(repr(defaults[chan]).encode())
+    inputs_hash = inputs_hash.hexdigest()
+
+    orm_image = next((img for img in bpy.data.images
+                      if img.get("retico_orm_hash") == inputs_hash), None)
+    status = "cached"
+    if orm_image is None:
+        status = "packed"
+        pixels = np.ones((height, width, 4), dtype=np.float32)
+        for chan_index, chan in enumerate(("R", "G", "B")):
+            if chan in sources:
+                node, output_name, sockets = sources[chan]
+                pixels[:, :, chan_index] = resize_pixels(
+                    image_channel(node.image, output_name), width, height)
+            else:
+                pixels[:, :, chan_index] = defaults[chan]
+        orm_image = new_packed_image("{}_ORM".format(mat.name), pixels)
+        orm_image["retico_orm_hash"] = inputs_hash
+
+    # rewire: single texture + Separate RGB
+    first_node = next(iter(sources.values()))[0]
+    tex_node = node_tree.nodes.new('ShaderNodeTexImage')
+    tex_node.image = orm_image
+    tex_node.label = "ORM"
+    tex_node.location = first_node.location
+    tex_node.interpolation = first_node.interpolation
+    tex_node.projection = first_node.projection
+    tex_node.extension = first_node.extension
+    for link in first_node.inputs['Vector'].links:
+        # same UV map or mapping node as the separated images
+        node_tree.links.new(tex_node.inputs['Vector'], link.from_socket)
+    sep_node = node_tree.nodes.new('ShaderNodeSeparateRGB')
+    sep_node.location = (first_node.location[0] + 300, first_node.location[1])
+    node_tree.links.new(sep_node.inputs['Image'], tex_node.outputs['Color'])
+    for chan, (node, output_name, sockets) in sources.items():
+        for socket in sockets:
+            # replaces the link coming from the channel image
+            node_tree.links.new(socket, sep_node.outputs[chan])
+    for node, output_name, sockets in sources.values():
+        if node.name in node_tree.nodes and not any(
+                out.is_linked for out in node.outputs):
+            node_tree.nodes.remove(node)
+    invalidate_node_tree_cache(node_tree)
+
+    return status
+
+
+def pack_orm_textures():
+    """ Pack separated ORM images of materials in scope,
+        return packed materials, materials reusing a cached image,
+        and materials left untouched
+    """
+    # var init
+    selected_only = bpy.context.scene.retico_material_check_only_selected
+    packed = []
+    cached = []
+    skipped = 0
+
+    # function core
+    for mat in selection_sets.materials_in_scope(selected_only):
+        status = pack_orm_material(mat) if mat.use_nodes else None
+        if status == "packed":
+            packed.append(mat)
+        elif status == "cached":
+            cached.append(mat)
+        else:
+            skipped += 1
+
+    return packed, cached, skipped
+
+
+def srgb_to_linear(values):
+    """ sRGB encoded values to linear
+    """
+    return np.where(values <= 0.04045, values / 12.92,
+                    ((values + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(values):
+    """ Linear values to sRGB encoded
+    """
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(values <= 0.0031308, values * 12.92,
+                    1.055 * values ** (1 / 2.4) - 0.055)
+
+
+def image_linear_pixels(img):
+    """ Return an image RGBA pixels with linear colors
+    """
+    pixels = image_pixels(img)
+    # float buffers are already linear
+    if not img.is_float and img.colorspace_settings.name == 'sRGB':
+        pixels[:, :, :3] = srgb_to_linear(pixels[:, :, :3])
+
+    return pixels
+
+
+def perceived_brightness(colors):
+    """ Perceived brightness of (n, 3) linear colors
+    """
+    return np.sqrt(colors[:, 0] ** 2 * 0.299
+                   + colors[:, 1] ** 2 * 0.587
+                   + colors[:, 2] ** 2 * 0.114)
+
+
+def specgloss_to_metalrough(diffuse, specular, glossiness):
+    """ Khronos specular/glossiness to metallic/roughness conversion,
+        diffuse & specular as (n, 3) linear colors, glossiness as (n,)
+    """
+    # var init
+    dielectric = specgloss_dielectric_specular
+    epsilon = 1e-6
+    one_minus_specular = 1 - specular.max(axis=1)
+    specular_brightness = perceived_brightness(specular)
+
+    # function core
+    # metallic is the root of a quadratic equation
+    b = (perceived_brightness(diffuse) * one_minus_specular / (1 - dielectric)
+         + specular_brightness - 2 * dielectric)
+    c = dielectric - specular_brightness
+    delta = np.maximum(b * b - 4 * dielectric * c, 0)
+    metallic = np.clip((-b + np.sqrt(delta)) / (2 * dielectric), 0, 1)
+    metallic[specular_brightness < dielectric] = 0
+
+    base_from_diffuse = diffuse * (
+        one_minus_specular / (1 - dielectric) / np.maximum(1 - metallic, epsilon))[:, None]
+    base_from_specular = (
+        specular - (dielectric * (1 - metallic))[:, None]) / np.maximum(metallic, epsilon)[:, None]
+    weight = (metallic * metallic)[:, None]
+    base_color = np.clip(
+        base_from_diffuse + (base_from_specular - base_from_diffuse) * weight, 0, 1)
+
+    return base_color, metallic, 1 - glossiness
+
+
+def specgloss_sources(node_tree):
+    """ Return diffuse, specular & glossiness image nodes of a node tree,
+        found by their links, or by words of their label or image name
+    """
+    # var init
+    textures = node_tree_roles(node_tree)["textures"]
+    sources = {
+        "diffuse": None,
+        "specular": None,
+        "glossiness": None
+    }
+
+    # function core
+    for node in node_tree.nodes:
+        if node.type != 'TEX_IMAGE' or node.image is None:
+            continue
+        words = re.split(r"[^a-z0-9]+", "{} {}".format(node.label, node.image.name).lower())
+        sockets = [link.to_socket.name for out in node.outputs for link in out.links]
+        if "albedo" in textures.get(node.name, ()):
+            role = "diffuse"
+        elif any(word.startswith(specgloss_hints["specular"]) for word in words) or any(
+                # a tint texture alone doesn't make a specular workflow
+                socket in specular_sockets and socket != 'Specular Tint' for socket in sockets):
+            role = "specular"
+        elif any(word.startswith(specgloss_hints["glossiness"]) for word in words):
+            role = "glossiness"
+        else:
+            continue
+        if sources[role] is None:
+            sources[role] = node
+
+    return sources
+
+
+def convert_specgloss_material(mat):
+    """ Convert specular/glossiness textures of a material to base color,
+        roughness & metallic textures, rewired to the active Principled BSDF,
+        return False if there's nothing to convert: both specular and
+        glossiness images are needed, metal/rough materials can have a
+        specular map too
+    """
+    # var init
+    node_tree = mat.node_tree
+    roles_index = node_tree_roles(node_tree)
+    principled = node_tree.nodes.get(roles_index["principled"] or "")
+    sources = specgloss_sources(node_tree)
+    if principled is None or sources["specular"] is None or sources["glossiness"] is None:
+        return False
+    images = [node.image for node in sources.values() if node is not None]
+    width = max(img.size[0] for img in images)
+    height = max(img.size[1] for img in images)
+    if width == 0 or height == 0:
+        return False
+
+    # inputs, as linear values
+    if sources["diffuse"] is not None:
+        diffuse = resize_pixels(image_linear_pixels(
+            sources["diffuse"].image), width, height)
+    else:
+        diffuse = np.empty((height, width, 4), dtype=np.float32)
+        diffuse[:, :] = tuple(principled.inputs['Base Color'].default_value)
+    specular = resize_pixels(image_linear_pixels(
+        sources["specular"].image), width, height)
+    glossiness = resize_pixels(image_channel(
+        sources["glossiness"].image), width, height)
+
+    # function core
+    base_color = np.ones((height, width, 4), dtype=np.float32)
+    base_color[:, :, 3] = diffuse[:, :, 3]
+    roughness = np.ones((height, width, 4), dtype=np.float32)
+    metallic = np.ones((height, width, 4), dtype=np.float32)
+    # by rows tiles, bounding memory of the conversion temporaries,
+    # inputs & outputs are full size anyway
+    for row in range(0, height, specgloss_tile_rows):
+        tile = slice(row, row + specgloss_tile_rows)
+        tile_shape = diffuse[tile].shape[:2]
+        tile_base, tile_metallic, tile_roughness = specgloss_to_metalrough(
+            diffuse[tile, :, :3].reshape(-1, 3),
+            specular[tile, :, :3].reshape(-1, 3),
+            glossiness[tile].reshape(-1))
+        base_color[tile, :, :3] = linear_to_srgb(
+            tile_base).reshape(tile_shape + (3,))
+        metallic[tile, :, :3] = tile_metallic.reshape(tile_shape + (1,))
+        roughness[tile, :, :3] = tile_roughness.reshape(tile_shape + (1,))
+
+    # rewire
+    location = sources["specular"].location
+    outputs = (
+        ("BaseColor", base_color, 'sRGB', 'Base Color'),
+        ("Roughness", roughness, 'Non-Color', 'Roughness'),
+        ("Metallic", metallic, 'Non-Color', 'Metallic'),
+    )
+    for output_index, (suffix, pixels, colorspace, socket_name) in enumerate(outputs):
+        tex_node = node_tree.nodes.new('ShaderNodeTexImage')
+        tex_node.image = new_packed_image(
+            "{}_{}".format(mat.name, suffix), pixels, colorspace)
+        tex_node.label = suffix
+        tex_node.location = (location[0], location[1] - 300 * output_index)
+        node_tree.links.new(
+            principled.inputs[socket_name], tex_node.outputs['Color'])
+        if (
+            socket_name == 'Base Color'
+            and sources["diffuse"] is not None
+            and principled.inputs['Alpha'].is_linked
+            and principled.inputs['Alpha'].links[0].from_node == sources["diffuse"]
+        ):
+            node_tree.links.new(
+                principled.inputs['Alpha'], tex_node.outputs['Alpha'])
+
+    # specular is now driven by metallic, back to its default
+    for socket_name in specular_sockets:
+        socket = principled.inputs.get(socket_name)
+        if socket is None:
+            continue
+        for link in list(socket.links):
+            node_tree.links.remove(link)
+        if socket_name != 'Specular Tint' and socket.type == 'VALUE':
+            socket.default_value = 0.5
+
+    # previous textures, and nodes in between, are removed once unused
+    intermediate_nodes = [link.to_node for node in sources.values() if node is not None
+                          for out in node.outputs for link in out.links
+                          if link.to_node != principled]
+    for node in intermediate_nodes + [node for node in sources.values() if node is not None]:
+        if node.name in node_tree.nodes and not any(out.is_linked for out in node.outputs):
+            node_tree.nodes.remove(node)
+    invalidate_node_tree_cache(node_tree)
+
+    return True
+
+
+def convert_specgloss_textures():
+    """ Convert specular/glossiness materials in scope to metallic/roughness,
+        return converted materials, and how many were skipped
+    """
+    # var init
+    selected_only = bpy.context.scene.retico_material_check_only_selected
+    converted = []
+    skipped = 0
+
+    # function core
+    for mat in selection_sets.materials_in_scope(selected_only):
+        if mat.use_nodes and convert_specgloss_material(mat):
+            converted.append(mat)
+        else:
+            skipped += 1
+
+    return converted, skipped
+
+
+def next_power_of_two(value):
+    """ Smallest power of two greater or equal to value
+    """
+    return 1 << max(0, math.ceil(value) - 1).bit_length()
+
+
+def shelf_pack(sizes):
+    """ Pack (width, height) rectangles in shelves, highest first,
+        return atlas width, height and (x, y) of each rectangle
+    """
+    # var init
+    order = sorted(range(len(sizes)),
+                   key=lambda index: (-sizes[index][1], -sizes[index][0]))
+    atlas_width = next_power_of_two(max(
+        math.sqrt(sum(width * height for width, height in sizes)),
+        max(width for width, height in sizes)))
+
+    # function core
+    while True:
+        positions = [None] * len(sizes)
+        x = y = shelf_height = 0
+        for index in order:
+            width, height = sizes[index]
+            if x + width > atlas_width:
+                # next shelf
+                y += shelf_height
+                x = shelf_height = 0
+            positions[index] = (x, y)
+            x += width
+            shelf_height = max(shelf_height, height)
+        atlas_height = next_power_of_two(y + shelf_height)
+        if atlas_height <= atlas_width:
+            return atlas_width, atlas_height, positions
+        # keep the atlas square-ish
+        atlas_width *= 2
+
+
+def atlas_source(img, channel=None, output_name='Color'):
+    """ Describe a texture copied in an atlas tile, whole or as one channel
+    """
+    return {
+        "image": img.name,
+        "filepath": bpy.path.abspath(img.filepath, library=img.library) if img.packed_file is None else "",
+        "channel": channel,
+        "output": output_name,
+        "key": hashlib.blake2b(image_hash_key(img), digest_size=16).hexdigest()
+    }
+
+
+def atlas_source_image(source):
+    """ Return image of an atlas tile source, loaded again from its file if needed
+    """
+    img = bpy.data.images.get(source["image"])
+    if img is not None:
+        return img
+    if source["filepath"] != "" and os.path.isfile(source["filepath"]):
+        return bpy.data.images.load(source["filepath"], check_existing=True)
+
+    return None
+
+
+def atlas_tile(mat):
+    """ Describe the atlas tile of a material: its size,
+        and for each role a default color plus textures to copy
+    """
+    # var init
+    principled = None
+    roles_index = None
+    if mat is not None and mat.use_nodes:
+        roles_index = node_tree_roles(mat.node_tree)
+        principled = mat.node_tree.nodes.get(roles_index["principled"] or "")
+    base_color = [0.8, 0.8, 0.8, 1.0]
+    orm = [1.0, 0.5, 0.0, 1.0]
+    emit = [0.0, 0.0, 0.0, 1.0]
+    if principled is not None:
+        base_color = list(linear_to_srgb(np.array(
+            principled.inputs['Base Color'].default_value[:3]))) + [principled.inputs['Alpha'].default_value]
+        orm = [1.0, principled.inputs['Roughness'].default_value,
+               principled.inputs['Metallic'].default_value, 1.0]
+        emission = principled.inputs.get('Emission Color') or principled.inputs.get('Emission')
+        strength = principled.inputs.get('Emission Strength')
+        if emission is not None:
+            # default 4.x material is white with strength 0, so black
+            emit = list(linear_to_srgb(np.array(emission.default_value[:3]) * (
+                strength.default_value if strength is not None else 1.0))) + [1.0]
+    tile = {
+        "material": mat.name if mat is not None else "",
+        "roles": {
+            "albedo": {"default": [float(value) for value in base_color], "sources": []},
+            "orm": {"default": [float(value) for value in orm], "sources": []},
+            "normal": {"default": [0.5, 0.5, 1.0, 1.0], "sources": []},
+            "emit": {"default": [float(value) for value in emit], "sources": []}
+        }
+    }
+    images = []
+
+    # function core
+    if roles_index is not None:
+        nodes = mat.node_tree.nodes
+        for node_name, roles in roles_index["textures"].items():
+            node = nodes[node_name]
+            if node.image is None:
+                continue
+            for role in atlas_roles:
+                if (
+                    role not in roles
+                    or len(tile["roles"][role]["sources"]) > 0
+                    # separated orm images are handled below
+                    or (role == "orm" and any("orm_{}".format(chan) in roles for chan in "RGB"))
+                ):
+                    continue
+                tile["roles"][role]["sources"].append(atlas_source(node.image))
+                images.append(node.image)
+        if len(tile["roles"]["orm"]["sources"]) == 0:
+            for chan, (node, output_name, sockets) in orm_sources(mat.node_tree).items():
+                tile["roles"]["orm"]["sources"].append(
+                    atlas_source(node.image, chan, output_name))
+                images.append(node.image)
+
+    sizes = [img.size[:] for img in images if img.size[0] > 0]
+    tile["size"] = [
+        max([size[0] for size in sizes] + [atlas_empty_tile]),
+        max([size[1] for size in sizes] + [atlas_empty_tile])
+    ]
+
+    return tile
+
+
+def atlas_tile_pixels(role, description, width, height):
+    """ Render an atlas tile of a role, from its default color and textures
+    """
+    # var init
+    pixels = np.empty((height, width, 4), dtype=np.float32)
+    pixels[:, :] = description["default"]
+
+    # function core
+    for source in description["sources"]:
+        img = atlas_source_image(source)
+        if img is None or img.size[0] == 0:
+            continue
+        if source["channel"] is None:
+            source_pixels = image_pixels(img)
+            # float buffers are linear, atlas color textures are sRGB
+            if role in atlas_srgb_roles and img.is_float:
+                source_pixels[:, :, :3] = linear_to_srgb(source_pixels[:, :, :3])
+            channels = 4 if role == "albedo" else 3
+            pixels[:, :, :channels] = resize_pixels(
+                source_pixels[:, :, :channels], width, height)
+        else:
+            pixels[:, :, "RGB".index(source["channel"])] = resize_pixels(
+                image_channel(img, source["output"]), width, height)
+
+    return pixels
+
+
+def atlas_blit(atlas, tile_pixels, x, y, padding):
+    """ Copy tile pixels into atlas, edges repeated in padding
+    """
+    height, width = tile_pixels.shape[:2]
+    atlas[y - padding:y + height + padding, x - padding:x + width + padding] = np.pad(
+        tile_pixels, ((padding, padding), (padding, padding), (0, 0)), mode='edge')
+
+
+def atlas_uv_layer(mesh):
+    """ Return the UV layer sampled by all textures of a mesh materials,
+        and a problem message if they don't share a plain UV layer
+    """
+    # var init
+    render_uv = next((layer.name for layer in mesh.uv_layers if layer.active_render),
+                     mesh.uv_layers[0].name)
+    uv_names = set()
+
+    # function core
+    for mat in mesh.materials:
+        if mat is None or not mat.use_nodes:
+            continue
+        for node in mat.node_tree.nodes:
+            if (
+                node.type != 'TEX_IMAGE'
+                or node.image is None
+                or not any(out.is_linked for out in node.outputs)
+            ):
+                continue
+            vector_links = node.inputs['Vector'].links
+            if node.projection != 'FLAT':
+                return None, "{}: {} isn't flat projected".format(mat.name, node.image.name)
+            if len(vector_links) == 0:
+                uv_names.add(render_uv)
+            elif vector_links[0].from_node.type == 'UVMAP':
+                uv_names.add(vector_links[0].from_node.uv_map or render_uv)
+            else:
+                # mapping, generated coordinates...
+                return None, "{}: {} coordinates are transformed".format(mat.name, node.image.name)
+
+    if len(uv_names) > 1:
+        return None, "textures use several UV layers ({})".format(", ".join(sorted(uv_names)))
+    uv_name = uv_names.pop() if len(uv_names) > 0 else render_uv
+    if uv_name not in mesh.uv_layers:
+        return None, "UV layer {} is missing".format(uv_name)
+
+    return uv_name, None
+
+
+def atlas_mesh_uvs(mesh, uv_name):
+    """ Return (loops, 2) UVs of a layer and material slot of each loop
+    """
+    # var init
+    polygons_count = len(mesh.polygons)
+    material_index = np.empty(polygons_count, dtype=np.int32)
+    loop_start = np.empty(polygons_count, dtype=np.int32)
+    loop_total = np.empty(polygons_count, dtype=np.int32)
+    uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+
+    # function core
+    mesh.polygons.foreach_get("material_index", material_index)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    mesh.uv_layers[uv_name].data.foreach_get("uv", uv)
+    loop_slot = np.clip(material_index, 0, max(len(mesh.materials) - 1, 0))[
+        uvs.loops_face_index(loop_start, loop_total)]
+
+    return uv.reshape(-1, 2), loop_slot
+
+
+def atlas_tiled_slots(mesh, uv_name, slots_textured):
+    """ Return textured material slots whose UVs go out of [0, 1],
+        they would sample neighbour tiles once in an atlas
+    """
+    # var init
+    uv, loop_slot = atlas_mesh_uvs(mesh, uv_name)
+    is_outside = ((uv < -atlas_uv_epsilon) | (uv > 1 + atlas_uv_epsilon)).any(axis=1)
+
+    # function core
+    slots_outside = set(np.unique(loop_slot[is_outside]).tolist())
+
+    return [slot for slot in sorted(slots_outside) if slots_textured[slot]]
+
+
+def atlas_remap_uvs(mesh, uv_name, slots_tiles, tiles, atlas_size):
+    """ Move UVs of each material faces into its atlas tile,
+        faces of tiles without texture go to their tile center
+    """
+    # var init
+    atlas_width, atlas_height = atlas_size
+    polygons_count = len(mesh.polygons)
+    uv, loop_slot = atlas_mesh_uvs(mesh, uv_name)
+    # per material slot: uv scale & offset of its tile
+    scale = np.array([(tiles[tile_index]["rect"][2] / atlas_width, tiles[tile_index]["rect"][3] / atlas_height)
+                      for tile_index in slots_tiles], dtype=np.float32)
+    offset = np.array([(tiles[tile_index]["rect"][0] / atlas_width, tiles[tile_index]["rect"][1] / atlas_height)
+                       for tile_index in slots_tiles], dtype=np.float32)
+    is_flat = np.array([all(len(description["sources"]) == 0
+                            for description in tiles[tile_index]["roles"].values())
+                        for tile_index in slots_tiles], dtype=bool)
+
+    # function core
+    uv = np.where(is_flat[loop_slot, None], 0.5, uv)
+    uv = uv * scale[loop_slot] + offset[loop_slot]
+    mesh.uv_layers[uv_name].data.foreach_set("uv", uv.ravel())
+
+    mesh.polygons.foreach_set(
+        "material_index", np.zeros(polygons_count, dtype=np.int32))
+
+    return {'FINISHED'}
+
+
+def atlas_material(name, atlas_images, flat_values, uv_name, blend_method='OPAQUE'):
+    """ Create a material using atlas textures, ready for glTF,
+        roles without atlas get the value shared by all tiles
+    """
+    # var init
+    mat = bpy.data.materials.new(name)
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    principled = next(node for node in nodes if node.type == 'BSDF_PRINCIPLED')
+    emission = principled.inputs.get('Emission Color') or principled.inputs.get('Emission')
+    uv_node = nodes.new('ShaderNodeUVMap')
+    uv_node.uv_map = uv_name
+    uv_node.location = (principled.location[0] - 900, principled.location[1])
+
+    # function core
+    for role, value in flat_values.items():
+        # colors are stored sRGB in tiles
+        if role == "albedo":
+            principled.inputs['Base Color'].default_value = list(
+                srgb_to_linear(np.array(value[:3]))) + [1.0]
+            principled.inputs['Alpha'].default_value = value[3]
+        elif role == "orm":
+            principled.inputs['Roughness'].default_value = value[1]
+            principled.inputs['Metallic'].default_value = value[2]
+        elif role == "emit" and emission is not None:
+            emission.default_value = list(srgb_to_linear(np.array(value[:3]))) + [1.0]
+            # strength is already in the color, black stays off
+            if principled.inputs.get('Emission Strength') is not None and any(value[:3]):
+                principled.inputs['Emission Strength'].default_value = 1.0
+
+    mat.blend_method = blend_method
+    if blend_method == 'CLIP':
+        mat.alpha_threshold = bpy.context.scene.retico_material_alpha_clip_threshold
+
+    for index, (role, img) in enumerate(atlas_images.items()):
+        tex_node = nodes.new('ShaderNodeTexImage')
+        tex_node.image = img
+        tex_node.label = role
+        tex_node.location = (principled.location[0] - 700,
+                             principled.location[1] - 300 * index)
+        links.new(tex_node.inputs['Vector'], uv_node.outputs['UV'])
+        if role == "albedo":
+            links.new(principled.inputs['Base Color'], tex_node.outputs['Color'])
+            if blend_method != 'OPAQUE':
+                links.new(principled.inputs['Alpha'], tex_node.outputs['Alpha'])
+        elif role == "orm":
+            sep_node = nodes.new('ShaderNodeSeparateRGB')
+            sep_node.location = (tex_node.location[0] + 300, tex_node.location[1])
+            links.new(sep_node.inputs['Image'], tex_node.outputs['Color'])
+            links.new(principled.inputs['Roughness'], sep_node.outputs['G'])
+            links.new(principled.inputs['Metallic'], sep_node.outputs['B'])
+        elif role == "normal":
+            normal_node = nodes.new('ShaderNodeNormalMap')
+            normal_node.uv_map = uv_name
+            normal_node.location = (tex_node.location[0] + 300, tex_node.location[1])
+            links.new(normal_node.inputs['Color'], tex_node.outputs['Color'])
+            links.new(principled.inputs['Normal'], normal_node.outputs['Normal'])
+        elif role == "emit":
+            links.new(emission, tex_node.outputs['Color'])
+            if principled.inputs.get('Emission Strength') is not None:
+                principled.inputs['Emission Strength'].default_value = 1.0
+
+    return mat
+
+
+def build_atlas(mesh):
+    """ Pack textures of a mesh materials into one atlas per role,
+        move UVs into tiles and leave a single material,
+        return the atlas material, or None and why it's not possible
+    """
+    # var init
+    max_size = bpy.context.scene.retico_material_atlas_max_size
+    tiles = []
+    slots_tiles = []
+    materials_tiles = {}
+    uv_name, problem = atlas_uv_layer(mesh)
+    if problem is not None:
+        return None, problem
+
+    # function core
+    for mat in mesh.materials:
+        key = mat.name if mat is not None else None
+        if key not in materials_tiles:
+            materials_tiles[key] = len(tiles)
+            tiles.append(atlas_tile(mat))
+        slots_tiles.append(materials_tiles[key])
+
+    slots_textured = [any(len(description["sources"]) > 0
+                          for description in tiles[tile_index]["roles"].values())
+                      for tile_index in slots_tiles]
+    tiled_slots = atlas_tiled_slots(mesh, uv_name, slots_textured)
+    if len(tiled_slots) > 0:
+        return None, "UVs out of [0, 1] with {}".format(", ".join(
+            mesh.materials[slot].name for slot in tiled_slots))
+
+    # a role is baked if textured, or if tiles have different flat values
+    roles_used = []
+    flat_values = {}
+    for role in atlas_roles:
+        defaults = {tuple(round(value, 4) for value in tile["roles"][role]["default"])
+                    for tile in tiles}
+        if any(len(tile["roles"][role]["sources"]) > 0 for tile in tiles) or len(defaults) > 1:
+            roles_used.append(role)
+        else:
+            flat_values[role] = tiles[0]["roles"][role]["default"]
+
+    # tiles are halved until atlas fits
+    sizes = [tile["size"] for tile in tiles]
+    while True:
+        atlas_width, atlas_height, positions = shelf_pack(sizes)
+        if max(atlas_width, atlas_height) <= max_size or all(size == [1, 1] for size in sizes):
+            break
+        sizes = [[max(1, width // 2), max(1, height // 2)] for width, height in sizes]
+    for tile, size, position in zip(tiles, sizes, positions):
+        # padding is taken inside the tile, small ones have none
+        padding = min(atlas_padding, min(size) // 16)
+        tile["padding"] = padding
+        tile["rect"] = [position[0] + padding, position[1] + padding,
+                        size[0] - 2 * padding, size[1] - 2 * padding]
+        del tile["size"]
+
+    atlas_images = {}
+    blend_method = 'OPAQUE'
+    if "albedo" in flat_values and flat_values["albedo"][3] < 1 - alpha_tolerance:
+        blend_method = 'BLEND'
+    for role in roles_used:
+        atlas = np.zeros((atlas_height, atlas_width, 4), dtype=np.float32)
+        for tile in tiles:
+            x, y, width, height = tile["rect"]
+            atlas_blit(atlas, atlas_tile_pixels(
+                role, tile["roles"][role], width, height), x, y, tile["padding"])
+        if role == "emit" and not atlas[:, :, :3].any():
+            # nothing glows, material emission stays off
+            flat_values[role] = [0.0, 0.0, 0.0, 1.0]
+            continue
+        if role == "albedo":
+            alpha = atlas[:, :, 3]
+            blend_method = alpha_blend_method({
+                "min": float(alpha.min()),
+                "max": float(alpha.max()),
+                "binary": bool(np.all((alpha <= alpha_tolerance) | (alpha >= 1 - alpha_tolerance)))
+            })
+        atlas_images[role] = new_packed_image(
+            "{}_atlas_{}".format(mesh.name, role), atlas,
+            'sRGB' if role in atlas_srgb_roles else 'Non-Color')
+
+    atlas_remap_uvs(mesh, uv_name, slots_tiles, tiles, (atlas_width, atlas_height))
+
+    mat = atlas_material("{}_atlas".format(mesh.name), atlas_images,
+                         flat_values, uv_name, blend_method)
+    mat["retico_atlas"] = json.dumps({
+        "size": [atlas_width, atlas_height],
+        "images": {role: img.name for role, img in atlas_images.items()},
+        "tiles": tiles
+    })
+    mesh.materials.clear()
+    mesh.materials.append(mat)
+
+    return mat, None
+
+
+def update_atlas(mat):
+    """ Redo atlas tiles whose textures changed since atlas was built,
+        return how many tiles were redone
+    """
+    # var init
+    layout = json.loads(mat["retico_atlas"])
+    tiles_redone = 0
+
+    # function core
+    for role, image_name in layout["images"].items():
+        atlas_image = bpy.data.images.get(image_name)
+        if atlas_image is None:
+            continue
+        atlas = None
+        for tile in layout["tiles"]:
+            description = tile["roles"][role]
+            is_changed = False
+            for source in description["sources"]:
+                img = atlas_source_image(source)
+                if img is None:
+                    continue
+                key = hashlib.blake2b(image_hash_key(img), digest_size=16).hexdigest()
+                if key == source["key"]:
+                    continue
+                if img.source == 'FILE' and img.packed_file is None:
+                    # file changed on disk, pixels have to be read again
+                    img.reload()
+                    images_alpha_stats.pop(img.session_uid, None)
+                source["key"] = key
+                is_changed = True
+            if not is_changed:
+                continue
+            if atlas is None:
+                atlas = image_pixels(atlas_image)
+            x, y, width, height = tile["rect"]
+            atlas_blit(atlas, atlas_tile_pixels(
+                role, description, width, height), x, y, tile["padding"])
+            tiles_redone += 1
+        if atlas is not None:
+            atlas_image.pixels.foreach_set(atlas.ravel())
+            atlas_image.pack()
+
+    mat["retico_atlas"] = json.dumps(layout)
+
+    return tiles_redone
+
+
+def atlas_textures():
+    """ Build an atlas for meshes with several materials,
+        update the ones already using an atlas,
+        return [(mesh, atlas material)], [(atlas material, tiles redone)]
+        and [(mesh, why it can't be atlased)]
+    """
+    # var init
+    user_active = bpy.context.view_layer.objects.active
+    is_user_in_edit_mode = False
+    selected_only = bpy.context.scene.retico_material_check_only_selected
+    meshes_owners, skipped = selection_sets.meshes_data(selected_only)
+    built = []
+    updated = []
+    skipped_meshes = []
+    atlases_seen = set()
+
+    # handling active object
+    if user_active and user_active.mode == 'EDIT':
+        is_user_in_edit_mode = True
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    # function core
+    for mesh, obj in meshes_owners:
+        materials = [mat for mat in mesh.materials if mat is not None]
+        if len(materials) == 1 and "retico_atlas" in materials[0]:
+            if materials[0] not in atlases_seen:
+                atlases_seen.add(materials[0])
+                updated.append((materials[0], update_atlas(materials[0])))
+        elif len(mesh.materials) > 1 and len(mesh.uv_layers) > 0:
+            mat, problem = build_atlas(mesh)
+            if mat is None:
+                # texturing would be broken, mesh is left untouched
+                skipped_meshes.append((mesh, problem))
+            else:
+                built.append((mesh, mat))
+
+    if len(built) > 0:
+        invalidate_node_tree_cache()
+        bpy.context.view_layer.update()
+
+    # handling active object
+    if is_user_in_edit_mode:
+        bpy.ops.object.mode_set(mode='EDIT')
+
+    return built, updated, skipped_meshes
+
+
 def report_no_materials():
     """ Report mesh objects without materials
     """
@@ -643,21 +1924,16 @@ def report_no_materials():
     is_all_good = False
     update_selection = bpy.context.scene.retico_material_reports_update_selection
     selected_only = bpy.context.scene.retico_material_check_only_selected
-    objects_selected = selection_sets.meshes_in_selection(
-    ) if selected_only else selection_sets.meshes_selectable()
 
     # function core
-    for obj in objects_selected:
-        # no materials at all
-        if not obj.data.materials:
-            objects_without_mtl.append(obj)
-        # if index but without mat
-        else:
-            object_materials = obj.data.materials
-            for index in range(len(object_materials)):
-                if object_materials[index] is None:
-                    objects_index_without_mtl.append([obj, index])
-                    objects_without_mtl.append(obj)
+    validation = selection_sets.scene_validation(selected_only)
+
+    # no materials at all
+    objects_without_mtl = list(validation["checks"]["no_materials"])
+    # if index but without mat
+    for obj, index in validation["checks"]["empty_slots"]:
+        objects_index_without_mtl.append([obj, index])
+        objects_without_mtl.append(obj)
 
     if len(objects_without_mtl) == 0 and len(objects_index_without_mtl) == 0:
         is_all_good = True
@@ -695,18 +1971,12 @@ def report_several_materials():
     is_all_good = False
     update_selection = bpy.context.scene.retico_material_reports_update_selection
     selected_only = bpy.context.scene.retico_material_check_only_selected
-    objects_selected = selection_sets.meshes_in_selection(
-    ) if selected_only else selection_sets.meshes_selectable()
 
     # function core
-    for obj in objects_selected:
-        # no materials at all, don't care
-        if not obj.data.materials:
-            continue
-        elif len(obj.data.materials) > 1:
-            objects_several_mtl_name += "{}, ".format(obj.name)
-            if update_selection:
-                objects_several_mtl.append(obj)
+    for obj in selection_sets.scene_validation(selected_only)["checks"]["several_materials"]:
+        objects_several_mtl_name += "{}, ".format(obj.name)
+        if update_selection:
+            objects_several_mtl.append(obj)
 
     if len(objects_several_mtl_name) == 0:
         is_all_good = True
@@ -733,21 +2003,12 @@ def report_several_users():
     is_all_good = False
     update_selection = bpy.context.scene.retico_material_reports_update_selection
     selected_only = bpy.context.scene.retico_material_check_only_selected
-    objects_selected = selection_sets.meshes_in_selection(
-    ) if selected_only else selection_sets.meshes_selectable()
 
     # function core
-    for obj in objects_selected:
-        # no materials at all, don't care
-        if not obj.data.materials:
-            continue
-        else:
-            for mat in obj.data.materials:
-                if mat and mat.users > 1:
-                    objects_several_users_name += "{}, ".format(obj.name)
-                    if update_selection:
-                        objects_several_users.append(obj)
-                    continue
+    for obj in selection_sets.scene_validation(selected_only)["checks"]["shared_materials"]:
+        objects_several_users_name += "{}, ".format(obj.name)
+        if update_selection:
+            objects_several_users.append(obj)
 
     if len(objects_several_users_name) == 0:
         is_all_good = True
@@ -764,6 +2025,147 @@ def report_several_users():
     return message_several_users, is_all_good
 
 
+def texture_header(filepath):
+    """ Read width, height, channels and bit depth from PNG or JPEG header,
+        without decoding any pixel
+    """
+    with open(filepath, "rb") as texture_file:
+        signature = texture_file.read(8)
+
+        # png: IHDR is always the first chunk
+        if signature == b"\x89PNG\r\n\x1a\n":
+            chunk = texture_file.read(18)
+            if len(chunk) < 18 or chunk[4:8] != b"IHDR":
+                return None
+            width, height, bit_depth, color_type = struct.unpack(
+                ">IIBB", chunk[8:18])
+            return width, height, png_channels.get(color_type, 0), bit_depth
+
+        # jpeg: walk markers up to the start of frame
+        if signature[:2] != b"\xff\xd8":
+            return None
+        texture_file.seek(2)
+        while True:
+            byte = texture_file.read(1)
+            if byte == b"":
+                return None
+            if byte != b"\xff":
+                continue
+            marker = texture_file.read(1)
+            while marker == b"\xff":
+                # fill bytes
+                marker = texture_file.read(1)
+            if marker == b"" or marker == b"\x00":
+                continue
+            marker = marker[0]
+            if marker == 0xD8 or marker == 0x01 or 0xD0 <= marker <= 0xD7:
+                # markers without payload
+                continue
+            length = texture_file.read(2)
+            if len(length) < 2:
+                return None
+            length = struct.unpack(">H", length)[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                frame = texture_file.read(6)
+                if len(frame) < 6:
+                    return None
+                bit_depth, height, width, channels = struct.unpack(
+                    ">BHHB", frame)
+                return width, height, channels, bit_depth
+            texture_file.seek(length - 2, os.SEEK_CUR)
+
+
+def texture_audit_file(filepath):
+    """ Return file size and header infos of a texture file,
+        None if missing or unsupported
+    """
+    try:
+        disk_size = os.stat(filepath).st_size
+        header = texture_header(filepath)
+    except (OSError, struct.error):
+        return None
+    if header is None:
+        return None
+
+    return (disk_size,) + header
+
+
+def gpu_memory_estimate(width, height, bit_depth):
+    """ Rough GPU memory of a texture with its mipmaps, in bytes,
+        uploaded as RGBA 8 bits or half float
+    """
+    # var init
+    bytes_per_pixel = 4 if bit_depth <= 8 else 8
+    size = 0
+
+    # function core
+    while True:
+        size += width * height * bytes_per_pixel
+        if width <= 1 and height <= 1:
+            break
+        width = max(1, width // 2)
+        height = max(1, height // 2)
+
+    return size
+
+
+def report_textures():
+    """ Report images used by materials, read from files headers,
+        one row per image: resolution, channels, bit depth, power of two,
+        disk & estimated GPU sizes
+    """
+    # var init
+    selected_only = bpy.context.scene.retico_material_check_only_selected
+    images = {}
+    report_rows = []
+    skipped = 0
+
+    # function core
+    for mat in selection_sets.materials_in_scope(selected_only):
+        if not mat.use_nodes:
+            continue
+        for node in mat.node_tree.nodes:
+            if node.type == 'TEX_IMAGE' and node.image is not None:
+                images[node.image] = True
+
+    files = []
+    for img in images:
+        if img.source != 'FILE' or img.packed_file is not None or img.filepath == "":
+            skipped += 1
+            continue
+        files.append(
+            (img, bpy.path.abspath(img.filepath, library=img.library)))
+
+    with ThreadPoolExecutor() as executor:
+        audits = list(executor.map(
+            texture_audit_file, [filepath for img, filepath in files]))
+
+    for (img, filepath), audit in zip(files, audits):
+        if audit is None:
+            skipped += 1
+            continue
+        disk_size, width, height, channels, bit_depth = audit
+        report_rows.append({
+            "image": img.name,
+            "file": filepath,
+            "width": width,
+            "height": height,
+            "channels": channels,
+            "bit_depth": bit_depth,
+            "power_of_two": (
+                width > 0 and height > 0
+                and width & (width - 1) == 0
+                and height & (height - 1) == 0
+            ),
+            "disk_kb": round(disk_size / 1024, 1),
+            "gpu_kb": round(gpu_memory_estimate(width, height, bit_depth) / 1024, 1),
+        })
+
+    report_rows.sort(key=lambda row: row["gpu_kb"], reverse=True)
+
+    return report_rows, skipped
+
+
 def detect_outputs_labels():
     """ Detect all material outputs labels name
     """
@@ -795,6 +2197,7 @@ def activate_outputs_by_labels(label):
                 node.is_active_output = False
                 if node.label == label:
                     node.is_active_output = True
+            invalidate_node_tree_cache(mat.node_tree)
 
     return {'FINISHED'}
 
@@ -853,11 +2256,15 @@ class RETICO_PT_material_misc(RETICO_PT_material_3dviewPanel):
             row = layout.row(align=True)
             row.operator("retico.material_blendmode",
                          text="Detect Blend Mode", icon='OVERLAY')
+            row.prop(context.scene, "retico_material_alpha_clip_threshold",
+                     text="Clip")
 
             # transfer name
             row = layout.row(align=True)
             row.operator("retico.material_transfer_names",
-                         text="Name from Object", icon='SORTALPHA')
+                         text="Name from Object", icon='SORTALPHA').dry_run = False
+            row.operator("retico.material_transfer_names",
+                         text="", icon='HIDE_OFF').dry_run = True
 
         else:
             row = layout.row(align=True)
@@ -871,6 +2278,14 @@ class RETICO_PT_material_misc(RETICO_PT_material_3dviewPanel):
         row = layout.row(align=True)
         row.operator("retico.material_reload_textures",
                      text="Reload Textures", icon='FILE_REFRESH')
+        row.prop(context.scene, "retico_material_textures_watch",
+                 text="", icon='VIEWZOOM')
+        row.operator("retico.material_dedupe_images",
+                     text="", icon='DUPLICATE')
+        if context.scene.retico_material_textures_watch:
+            row = layout.row(align=True)
+            row.prop(context.scene, "retico_material_textures_watch_interval",
+                     text="Watch every (s)")
 
 
 class RETICO_PT_material_misc_outputs(RETICO_PT_material_3dviewPanel):
@@ -1048,6 +2463,19 @@ class RETICO_PT_material_fix(RETICO_PT_material_3dviewPanel):
             # uv nodes
             row = grid.row(align=True)
             row.operator("retico.material_gltf_uvnode_naming", text="UV links")
+
+            # orm packing
+            row = grid.row(align=True)
+            row.operator("retico.material_pack_orm", text="Pack ORM")
+
+            # specular/glossiness conversion
+            row = grid.row(align=True)
+            row.operator("retico.material_specgloss_convert", text="Spec/Gloss")
+
+            # texture atlas
+            row = layout.row(align=True)
+            row.operator("retico.material_atlas", text="Atlas", icon='TEXTURE')
+            row.prop(context.scene, "retico_material_atlas_max_size", text="Max")
         else:
             row = layout.row(align=True)
             row.label(text="No object in selection.")
@@ -1082,6 +2510,8 @@ class RETICO_PT_material_report(RETICO_PT_material_3dviewPanel):
             row.operator("retico.material_report_several", text="1+ Mat")
             row = grid.row(align=True)
             row.operator("retico.material_report_users", text="Shared")
+            row = grid.row(align=True)
+            row.operator("retico.material_report_textures", text="Textures")
         else:
             row = layout.row(align=True)
             row.label(text="No object in selection.")
@@ -1119,27 +2549,70 @@ class RETICO_OT_material_transfer_names(bpy.types.Operator):
     bl_idname = "retico.material_transfer_names"
     bl_label = "Copy Object name to its material name"
     bl_description = "Copy Object name to its material name"
+    dry_run: BoolProperty(
+        name="Dry run",
+        description="Only report planned renames",
+        default=False
+    )
 
     @classmethod
     def poll(cls, context):
         return len(context.view_layer.objects) > 0
 
     def execute(self, context):
-        transfer_names()
+        message, conflicts = transfer_names(self.dry_run)
+        if self.dry_run:
+            self.report({'INFO'}, "---[ Planned material renames ]---")
+            for report in message:
+                self.report({'INFO'}, report)
+            if len(message) + len(conflicts) == 0:
+                self.report({'INFO'}, "Nothing to rename.")
+            if context.scene.retico_material_reports_to_clipboard:
+                context.window_manager.clipboard = "\r\n".join(message + conflicts)
+        else:
+            self.report({'INFO'}, "---[ Object name to Material ]---")
+        for report in conflicts:
+            self.report({'WARNING'}, report)
         return {'FINISHED'}
 
 
 class RETICO_OT_material_reload_textures(bpy.types.Operator):
     bl_idname = "retico.material_reload_textures"
     bl_label = "Refresh texture files"
-    bl_description = "Refresh texture files"
+    bl_description = "Refresh texture files changed on disk since last reload"
 
     @classmethod
     def poll(cls, context):
         return len(bpy.data.images) > 0
 
     def execute(self, context):
-        reload_textures()
+        reloaded, skipped = reload_textures()
+        self.report({'INFO'}, "---[ Reload textures ]---")
+        self.report({'INFO'}, "{} textures reloaded, {} unchanged, packed or generated skipped".format(
+            len(reloaded), skipped))
+        return {'FINISHED'}
+
+
+class RETICO_OT_material_dedupe_images(bpy.types.Operator):
+    bl_idname = "retico.material_dedupe_images"
+    bl_label = "Merge duplicated images"
+    bl_description = "Replace images having the same content by a single one, whatever their paths or names"
+
+    @classmethod
+    def poll(cls, context):
+        return len(bpy.data.images) > 1
+
+    def execute(self, context):
+        report = dedupe_images()
+        self.report({'INFO'}, "---[ Duplicated images ]---")
+        if len(report) == 0:
+            self.report({'INFO'}, "No duplicated image.")
+        else:
+            for kept, removed in report:
+                self.report({'INFO'}, "{} replaces: {}".format(
+                    kept, ", ".join(removed)))
+            self.report({'INFO'}, "{} duplicated images removed".format(
+                sum(len(removed) for kept, removed in report)))
         return {'FINISHED'}
 
 
@@ -1188,6 +2661,72 @@ class RETICO_OT_material_active_texture(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class RETICO_OT_material_pack_orm(bpy.types.Operator):
+    bl_idname = "retico.material_pack_orm"
+    bl_label = "Pack separated occlusion, roughness & metallic into ORM"
+    bl_description = "Pack separated occlusion, roughness & metallic textures into a single ORM texture, linked through a Separate RGB node"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        packed, cached, skipped = pack_orm_textures()
+        self.report({'INFO'}, "---[ Pack ORM ]---")
+        for mat in packed:
+            self.report({'INFO'}, "{}: ORM texture packed".format(mat.name))
+        for mat in cached:
+            self.report({'INFO'}, "{}: ORM texture reused".format(mat.name))
+        self.report({'INFO'}, "{} packed, {} reused, {} without separated ORM images skipped".format(
+            len(packed), len(cached), skipped))
+        return {'FINISHED'}
+
+
+class RETICO_OT_material_specgloss_convert(bpy.types.Operator):
+    bl_idname = "retico.material_specgloss_convert"
+    bl_label = "Convert specular/glossiness to metallic/roughness"
+    bl_description = "Convert specular/glossiness textures to base color, roughness & metallic textures, linked to Principled BSDF"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        converted, skipped = convert_specgloss_textures()
+        self.report({'INFO'}, "---[ Specular/Glossiness conversion ]---")
+        for mat in converted:
+            self.report({'INFO'}, "{}: converted to metallic/roughness".format(mat.name))
+        self.report({'INFO'}, "{} converted, {} without specular texture skipped".format(
+            len(converted), skipped))
+        return {'FINISHED'}
+
+
+class RETICO_OT_material_atlas(bpy.types.Operator):
+    bl_idname = "retico.material_atlas"
+    bl_label = "Merge materials textures into atlases"
+    bl_description = "Pack textures of meshes with several materials into atlases and leave a single material, or redo changed tiles of existing atlases"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        built, updated, skipped_meshes = atlas_textures()
+        self.report({'INFO'}, "---[ Texture atlas ]---")
+        if len(built) + len(updated) + len(skipped_meshes) == 0:
+            self.report({'INFO'}, "No mesh with several materials and UVs.")
+        for mesh, problem in skipped_meshes:
+            self.report({'WARNING'}, "{}: not atlased, {}".format(
+                mesh.name, problem))
+        for mesh, mat in built:
+            self.report({'INFO'}, "{}: materials merged into {}".format(
+                mesh.name, mat.name))
+        for mat, tiles_redone in updated:
+            self.report({'INFO'}, "{}: {} tiles redone".format(
+                mat.name, tiles_redone))
+        return {'FINISHED'}
+
+
 class RETICO_OT_material_report_none(bpy.types.Operator):
     bl_idname = "retico.material_report_none"
     bl_label = "Report object without materials"
@@ -1265,6 +2804,38 @@ class RETICO_OT_material_report_users(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class RETICO_OT_material_report_textures(bpy.types.Operator):
+    bl_idname = "retico.material_report_textures"
+    bl_label = "Report textures resolution and memory"
+    bl_description = "Report textures resolution, bit depth and memory, read from files headers"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        report_rows, skipped = report_textures()
+        self.report({'INFO'}, "---[ Textures ]---")
+        if len(report_rows) == 0:
+            self.report({'INFO'}, "No texture file found.")
+        else:
+            for row in report_rows:
+                self.report({'INFO'} if row["power_of_two"] else {'WARNING'},
+                            "{}: {}x{}, {} channels, {} bits{}, {} KB on disk, {} KB in GPU".format(
+                    row["image"], row["width"], row["height"], row["channels"], row["bit_depth"],
+                    "" if row["power_of_two"] else " (not power of two)", row["disk_kb"], row["gpu_kb"]))
+            self.report({'INFO'}, "Total: {} KB on disk, {} KB in GPU (mipmaps included)".format(
+                round(sum(row["disk_kb"] for row in report_rows), 1),
+                round(sum(row["gpu_kb"] for row in report_rows), 1)))
+            if context.scene.retico_material_reports_to_clipboard:
+                context.window_manager.clipboard = selection_sets.rows_to_text(
+                    report_rows)
+        if skipped > 0:
+            self.report({'INFO'}, "{} packed, generated or unreadable images skipped".format(
+                skipped))
+        return {'FINISHED'}
+
+
 class RETICO_OT_material_outputs_detect(bpy.types.Operator):
     bl_idname = "retico.material_outputs_detect"
     bl_label = "Detect outputs"
@@ -1312,22 +2883,39 @@ classes = (
     RETICO_OT_material_blendmode,
     RETICO_OT_material_transfer_names,
     RETICO_OT_material_reload_textures,
+    RETICO_OT_material_dedupe_images,
     RETICO_OT_material_gltf_mute,
     RETICO_OT_material_active_texture,
     RETICO_OT_material_gltf_colorspace,
     RETICO_OT_material_gltf_uvnode_naming,
+    RETICO_OT_material_pack_orm,
+    RETICO_OT_material_specgloss_convert,
+    RETICO_OT_material_atlas,
     RETICO_OT_material_report_none,
     RETICO_OT_material_report_several,
     RETICO_OT_material_report_users,
+    RETICO_OT_material_report_textures,
     RETICO_OT_material_outputs_detect,
     RETICO_OT_material_outputs_activate,
 )
 
 
+node_tree_cache_handlers = (
+    (bpy.app.handlers.depsgraph_update_post, node_tree_cache_depsgraph_update),
+    (bpy.app.handlers.load_post, node_tree_cache_reset),
+    (bpy.app.handlers.undo_post, node_tree_cache_reset),
+    (bpy.app.handlers.redo_post, node_tree_cache_reset),
+    (bpy.app.handlers.load_post, textures_watch_reset),
+)
+
+
 def register():
     from bpy.utils import register_class
     for cls in classes:
         register_class(cls)
+    for handlers, handler in node_tree_cache_handlers:
+        if handler not in handlers:
+            handlers.append(handler)
     Scene.retico_material_check_only_selected = BoolProperty(
         name="Material tab use selected only",
         description="Material operations applies on selection, or not",
@@ -1348,12 +2936,52 @@ def register():
         description="Set 3DView shading to Solid: Texture",
         default=True
     )
+    Scene.retico_material_alpha_clip_threshold = FloatProperty(
+        name="Alpha clip threshold",
+        description="Alpha threshold set on materials detected as Alpha Clip",
+        default=0.5,
+        min=0.0,
+        max=1.0
+    )
+    Scene.retico_material_atlas_max_size = IntProperty(
+        name="Atlas max size",
+        description="Maximum atlas width & height, tiles are downscaled to fit",
+        default=4096,
+        min=64,
+        max=16384
+    )
+    Scene.retico_material_textures_watch = BoolProperty(
+        name="Watch textures",
+        description="Reload textures as soon as their files change on disk",
+        default=False,
+        update=textures_watch_toggle
+    )
+    Scene.retico_material_textures_watch_interval = FloatProperty(
+        name="Watch interval",
+        description="Seconds between two checks of textures files",
+        default=1.0,
+        min=0.1,
+        max=60.0
+    )
 
 
 def unregister():
     from bpy.utils import unregister_class
     for cls in reversed(classes):
         unregister_class(cls)
+    for handlers, handler in node_tree_cache_handlers:
+        if handler in handlers:
+            handlers.remove(handler)
+    invalidate_node_tree_cache()
+    if bpy.app.timers.is_registered(textures_watch_timer):
+        bpy.app.timers.unregister(textures_watch_timer)
+    textures_stamps.clear()
+    images_digests.clear()
+    images_alpha_stats.clear()
+    del Scene.retico_material_textures_watch
+    del Scene.retico_material_alpha_clip_threshold
+    del Scene.retico_material_atlas_max_size
+    del Scene.retico_material_textures_watch_interval
     del Scene.retico_material_reports_update_selection
     del Scene.retico_material_reports_to_clipboard
     del Scene.retico_material_check_only_selected
@@ -1,12 +1,55 @@
 import bpy
+import hashlib
 import math
-from . import selection_sets
+import numpy as np
+from . import selection_sets, uvs
+from mathutils import Matrix, Vector
 from bpy.types import Scene
 from bpy.props import (
     FloatProperty,
-    BoolProperty
+    BoolProperty,
+    EnumProperty,
+    IntProperty,
+    StringProperty
 )
 
+"""
+**********************************************************************
+*                            local variables                         *
+**********************************************************************
+"""
+
+# data_type: (foreach key, values per item, dtype)
+attributes_foreach = {
+    'FLOAT': ("value", 1, np.float32),
+    'INT': ("value", 1, np.int32),
+    'INT8': ("value", 1, np.int32),
+    'BOOLEAN': ("value", 1, bool),
+    'FLOAT2': ("vector", 2, np.float32),
+    'FLOAT_VECTOR': ("vector", 3, np.float32),
+    'FLOAT_COLOR': ("color", 4, np.float32),
+    'BYTE_COLOR': ("color", 4, np.float32),
+    'INT32_2D': ("value", 2, np.int32),
+    'QUATERNION': ("value", 4, np.float32),
+}
+
+# edges marked sharp by autosmooth, told apart from the ones marked by hand
+autosmooth_attribute = "retico_angle_sharp"
+
+# attributes carried over by static batching, uv maps aside,
+# autosmooth one is only bookkeeping
+batch_attributes = ("position", "material_index", "sharp_face", "sharp_edge", "custom_normal",
+                    autosmooth_attribute)
+
+# bits per axis of static batching morton codes
+batch_morton_bits = 10
+
+# faces of each patch Tipsify runs on, all patches side by side
+tipsify_patch_faces = 4096
+
+# loops of each chunk the vertex cache simulation runs on, side by side
+cache_simulation_chunk = 4096
+
 """
 **********************************************************************
 *                            def section                             *
@@ -44,8 +87,9 @@ def meshes_names_to_clipboard():
     return {'FINISHED'}
 
 
-def transfer_names():
-    """ Copy object name to mesh name
+def transfer_names(dry_run=False):
+    """ Copy object name to mesh name,
+        return planned renames and conflicts as report lines
     """
     # var init
     user_active = bpy.context.view_layer.objects.active
@@ -63,94 +107,1308 @@ def transfer_names():
         bpy.ops.object.mode_set(mode='OBJECT')
 
     # function core
-    for obj in objects_selected:
-        obj.data.name = "tmp"  # temp name to avoid naming conflict later
 
-    for obj in objects_selected:
-        obj.data.name = obj.name
+    # shared meshes: last object wins, as first target wins in planner
+    targets = [(obj.data, obj.name) for obj in reversed(objects_selected)]
+    steps, conflicts = selection_sets.plan_renames(bpy.data.meshes, targets)
+    if not dry_run:
+        selection_sets.apply_renames(steps)
 
     # handling active object
     bpy.context.view_layer.objects.active = user_active
     if is_user_in_edit_mode:
         bpy.ops.object.mode_set(mode='EDIT')
 
-    return {'FINISHED'}
+    return selection_sets.renames_report(steps, conflicts)
 
 
 def set_autosmooth(user_angle=85):
-    """ Activate autosmooth
+    """ Activate autosmooth,
+        computed on mesh data for all meshes at once
     """
     # var init
     user_active = bpy.context.view_layer.objects.active
     is_user_in_edit_mode = False
     selected_only = bpy.context.scene.retico_mesh_check_only_selected
-    objects_selected = selection_sets.meshes_in_selection(
-    ) if selected_only else selection_sets.meshes_selectable()
+    meshes_owners, skipped = selection_sets.meshes_data(selected_only)
 
     # handling active object
-    if bpy.context.view_layer.objects.active.mode == 'EDIT':
+    if user_active and user_active.mode == 'EDIT':
         is_user_in_edit_mode = True
         bpy.ops.object.mode_set(mode='OBJECT')
 
     # function core
-    for obj in objects_selected:
-        bpy.context.view_layer.objects.active = obj
-        mesh = obj.data
+    for mesh, obj in meshes_owners:
+        mesh_set_autosmooth(mesh, math.radians(user_angle))
 
-        bpy.ops.object.shade_smooth(use_auto_smooth = True, auto_smooth_angle = math.radians(user_angle))
+    # a single update for all meshes
+    bpy.context.view_layer.update()
 
     # handling active object
-    bpy.context.view_layer.objects.active = user_active
     if is_user_in_edit_mode:
         bpy.ops.object.mode_set(mode='EDIT')
 
+    return skipped
+
+
+def sharp_edges_from_angle(normals, loop_face, loop_edge, loop_vert, edges_count, angle):
+    """ Return sharp state of each edge, like autosmooth does:
+        faces angle above limit, non-manifold edges, or flipped neighbours
+    """
+    # var init
+    is_sharp = np.zeros(edges_count, dtype=bool)
+
+    # function core
+
+    # grouping loops by edge
+    order = np.argsort(loop_edge, kind='stable')
+    faces_by_edge = loop_face[order]
+    verts_by_edge = loop_vert[order]
+    edge_users = np.bincount(loop_edge, minlength=edges_count)
+    edge_first = np.cumsum(edge_users) - edge_users
+
+    # more than 2 faces: always sharp
+    is_sharp[edge_users > 2] = True
+
+    # 2 faces: dihedral angle
+    manifold = np.flatnonzero(edge_users == 2)
+    first = edge_first[manifold]
+    face_a = faces_by_edge[first]
+    face_b = faces_by_edge[first + 1]
+    cos_angle = np.einsum("ij,ij->i", normals[face_a], normals[face_b])
+    is_sharp[manifold] = cos_angle < math.cos(angle)
+    # faces with opposite winding walk the edge in the same direction
+    is_flipped = verts_by_edge[first] == verts_by_edge[first + 1]
+    is_sharp[manifold[is_flipped]] = True
+
+    return is_sharp
+
+
+def mesh_set_autosmooth(mesh, angle):
+    """ Smooth all faces and mark sharp edges above angle (radians),
+        using foreach_get/foreach_set only, edges marked by a previous
+        run are recomputed, the ones marked by hand are kept
+    """
+    # var init
+    faces_count = len(mesh.polygons)
+
+    # function core
+    mesh.polygons.foreach_set("use_smooth", np.ones(faces_count, dtype=bool))
+    if bpy.app.version < (4, 1, 0):
+        # native autosmooth does the job, sharp edges are left to the user
+        mesh.use_auto_smooth = True
+        mesh.auto_smooth_angle = angle
+        mesh.update_tag()
+        return {'FINISHED'}
+
+    loops_count = len(mesh.loops)
+    edges_count = len(mesh.edges)
+    normals = np.empty(faces_count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("normal", normals)
+    loop_start = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    loop_total = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    loop_edge = np.empty(loops_count, dtype=np.int32)
+    mesh.loops.foreach_get("edge_index", loop_edge)
+    loop_vert = np.empty(loops_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    is_sharp = sharp_edges_from_angle(normals.reshape(-1, 3), uvs.loops_face_index(loop_start, loop_total),
+                                      loop_edge, loop_vert, edges_count, angle)
+
+    is_edge_sharp = np.empty(edges_count, dtype=bool)
+    mesh.edges.foreach_get("use_edge_sharp", is_edge_sharp)
+    is_angle_sharp = np.zeros(edges_count, dtype=bool)
+    angle_sharp = mesh.attributes.get(autosmooth_attribute)
+    if angle_sharp is not None and angle_sharp.domain == 'EDGE' and angle_sharp.data_type == 'BOOLEAN':
+        angle_sharp.data.foreach_get("value", is_angle_sharp)
+    else:
+        if angle_sharp is not None:
+            mesh.attributes.remove(angle_sharp)
+        angle_sharp = mesh.attributes.new(autosmooth_attribute, 'BOOLEAN', 'EDGE')
+    # sharp edges marked by hand are kept, as autosmooth does
+    is_hand_sharp = is_edge_sharp & ~is_angle_sharp
+    mesh.edges.foreach_set("use_edge_sharp", is_hand_sharp | is_sharp)
+    angle_sharp.data.foreach_set("value", is_sharp & ~is_hand_sharp)
+    mesh.update_tag()
+
     return {'FINISHED'}
 
 
-def set_custom_normals(apply=True):
-    """ Add or delete custom normals if asked
+def set_custom_normals(mode='ADD'):
+    """ Add, delete or compute weighted custom normals,
+        on mesh data for all meshes at once
     """
     # var init
     user_active = bpy.context.view_layer.objects.active
     is_user_in_edit_mode = False
     selected_only = bpy.context.scene.retico_mesh_check_only_selected
-    objects_selected = selection_sets.meshes_in_selection(
-    ) if selected_only else selection_sets.meshes_selectable()
+    meshes_owners, skipped = selection_sets.meshes_data(selected_only)
 
     # handling active object
-    if bpy.context.view_layer.objects.active.mode == 'EDIT':
+    if user_active and user_active.mode == 'EDIT':
         is_user_in_edit_mode = True
         bpy.ops.object.mode_set(mode='OBJECT')
 
     # function core
-    for obj in objects_selected:
-        bpy.context.view_layer.objects.active = obj
-        mesh = obj.data
+    for mesh, obj in meshes_owners:
+        if mode == 'CLEAR':
+            if not mesh.has_custom_normals:
+                continue
+            custom_normal = mesh.attributes.get("custom_normal")
+            if custom_normal is not None:
+                # a generic attribute in recent versions
+                mesh.attributes.remove(custom_normal)
+            else:
+                # no data API removes the layer before, zero vectors
+                # give back auto normals, autosmooth is left as user set it
+                mesh.normals_split_custom_set(
+                    np.zeros((len(mesh.loops), 3), dtype=np.float32))
+                if bpy.app.version < (4, 1, 0):
+                    mesh.free_normals_split()
+            mesh.update_tag()
+            continue
+        if bpy.app.version < (4, 1, 0):
+            # custom normals needed autosmooth before 4.1
+            mesh.use_auto_smooth = True
+        if mode == 'ADD':
+            mesh.normals_split_custom_set(mesh_loop_normals(mesh))
+        else:
+            mesh.normals_split_custom_set_from_vertices(
+                mesh_weighted_normals(mesh))
+        mesh.update_tag()
+
+    # a single update for all meshes
+    bpy.context.view_layer.update()
+
+    # handling active object
+    if is_user_in_edit_mode:
+        bpy.ops.object.mode_set(mode='EDIT')
+
+    return skipped
+
+
+def mesh_loop_normals(mesh):
+    """ Return current split normals as a (loops, 3) array
+    """
+    loop_normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if bpy.app.version < (4, 1, 0):
+        mesh.calc_normals_split()
+    mesh.loops.foreach_get("normal", loop_normals)
+
+    return loop_normals.reshape(-1, 3)
+
+
+def weighted_normals(co, normals, areas, loop_start, loop_total, loop_vert):
+    """ Return vertex normals weighted by face area and corner angle
+    """
+    # var init
+    loop_face = uvs.loops_face_index(loop_start, loop_total)
+    loops_index = np.arange(len(loop_vert))
+    first = loop_start[loop_face]
+    total = loop_total[loop_face]
+
+    # function core
+
+    # corner angle, between previous and next loops of the polygon
+    loop_next = first + (loops_index - first + 1) % total
+    loop_prev = first + (loops_index - first - 1) % total
+    edge_next = co[loop_vert[loop_next]] - co[loop_vert]
+    edge_prev = co[loop_vert[loop_prev]] - co[loop_vert]
+    lengths = np.linalg.norm(edge_next, axis=1) * \
+        np.linalg.norm(edge_prev, axis=1)
+    cos_corner = np.einsum("ij,ij->i", edge_next, edge_prev) / \
+        np.maximum(lengths, 1e-12)
+    corner_angle = np.arccos(np.clip(cos_corner, -1.0, 1.0))
+
+    # weighted sum of face normals on each vertex
+    weights = corner_angle * areas[loop_face]
+    weighted = normals[loop_face] * weights[:, None]
+    vertex_normals = np.column_stack([
+        np.bincount(loop_vert, weights=weighted[:, axis], minlength=len(co))
+        for axis in range(3)
+    ])
+    vertex_normals /= np.maximum(np.linalg.norm(
+        vertex_normals, axis=1), 1e-12)[:, None]
+
+    return vertex_normals
+
+
+def mesh_weighted_normals(mesh):
+    """ Return face area and corner angle weighted vertex normals,
+        reading mesh data with foreach_get
+    """
+    # var init
+    vertices_count = len(mesh.vertices)
+    loops_count = len(mesh.loops)
+    faces_count = len(mesh.polygons)
+
+    co = np.empty(vertices_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    normals = np.empty(faces_count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("normal", normals)
+    areas = np.empty(faces_count, dtype=np.float32)
+    mesh.polygons.foreach_get("area", areas)
+    loop_start = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    loop_total = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    loop_vert = np.empty(loops_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+
+    # function core
+    vertex_normals = weighted_normals(co.reshape(-1, 3).astype(np.float64), normals.reshape(-1, 3),
+                                      areas, loop_start, loop_total, loop_vert)
+
+    return vertex_normals.astype(np.float32)
+
+
+def mesh_compare_arrays(mesh):
+    """ Read arrays defining a mesh: vertices, topology, shading, UVs
+        and other attributes, custom normals apart as they follow transforms
+    """
+    # var init
+    loops_count = len(mesh.loops)
+    faces_count = len(mesh.polygons)
+    edges_count = len(mesh.edges)
+    uv_names = {uv_layer.name for uv_layer in mesh.uv_layers}
+    # already read, or only telling selection & visibility
+    skipped_attributes = set(batch_attributes) | uv_names
+
+    # function core
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    loop_vert = np.empty(loops_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    loop_total = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    material_index = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", material_index)
+    smooth = np.empty(faces_count, dtype=bool)
+    mesh.polygons.foreach_get("use_smooth", smooth)
+    edges = np.empty(edges_count * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+    edge_sharp = np.empty(edges_count, dtype=bool)
+    mesh.edges.foreach_get("use_edge_sharp", edge_sharp)
+    arrays = [loop_vert, loop_total, material_index, smooth, edges, edge_sharp]
+    for uv_layer in mesh.uv_layers:
+        uv = np.empty(loops_count * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uv)
+        arrays.append(uv)
+    for attribute in sorted(mesh.attributes, key=lambda attribute: attribute.name):
+        if attribute.name.startswith(".") or attribute.name in skipped_attributes:
+            continue
+        arrays.append(np.frombuffer("{} {} {}".format(
+            attribute.name, attribute.domain, attribute.data_type).encode(), dtype=np.uint8))
+        if attribute.data_type in attributes_foreach:
+            key, width, dtype = attributes_foreach[attribute.data_type]
+            values = np.empty(len(attribute.data) * width, dtype=dtype)
+            attribute.data.foreach_get(key, values)
+            arrays.append(values)
+    if bpy.app.version < (4, 0, 0):
+        # creases & bevel weights were attributes since 4.0
+        for prop in ("crease", "bevel_weight"):
+            values = np.empty(edges_count, dtype=np.float32)
+            mesh.edges.foreach_get(prop, values)
+            arrays.append(values)
+    if bpy.app.version < (4, 1, 0):
+        arrays.append(np.array([mesh.use_auto_smooth, mesh.auto_smooth_angle], dtype=np.float32))
+    loop_normals = None
+    if mesh.has_custom_normals:
+        loop_normals = mesh_loop_normals(mesh)
+
+    return co.reshape(-1, 3), arrays, loop_normals
+
+
+def mesh_fingerprint(co, arrays, loop_normals=None, transform_invariant=False):
+    """ Hash mesh arrays, vertices can be described
+        by their distance to center to ignore object transform,
+        custom normals are then only checked once transform is found
+    """
+    # var init
+    fingerprint = hashlib.blake2b(digest_size=16)
+
+    # function core
+    for array in arrays:
+        fingerprint.update(array.tobytes())
+    fingerprint.update(b"custom normals" if loop_normals is not None else b"")
+    if loop_normals is not None and not transform_invariant:
+        fingerprint.update(np.round(loop_normals * 1e4).astype(np.int32).tobytes())
+
+    if transform_invariant:
+        distances = np.linalg.norm(co - co.mean(axis=0), axis=1)
+        # a coarse rounding, transforms are checked later anyway
+        precision = max(float(distances.max()), 1e-6) * 1e-4
+        fingerprint.update(
+            np.sort(np.round(distances / precision)).astype(np.int64).tobytes())
+    else:
+        fingerprint.update(co.tobytes())
+
+    return fingerprint.hexdigest()
+
+
+def rigid_transform(co_from, co_to, tolerance=1e-4):
+    """ Find rotation & translation moving co_from vertices to co_to ones (Kabsch),
+        return None if vertices don't match
+    """
+    # var init
+    center_from = co_from.mean(axis=0)
+    center_to = co_to.mean(axis=0)
+    centered_from = co_from - center_from
+    centered_to = co_to - center_to
+
+    # function core
+    u, _, vt = np.linalg.svd(centered_from.T @ centered_to)
+    # no mirroring
+    d = np.sign(np.linalg.det(vt.T @ u.T))
+    rotation = vt.T @ np.diag([1.0, 1.0, d]) @ u.T
+    translation = center_to - rotation @ center_from
+
+    size = max(float(np.abs(centered_to).max()), 1e-6)
+    error = np.abs(centered_from @ rotation.T - centered_to).max()
+    if error > tolerance * size:
+        return None
+
+    return rotation, translation
+
+
+def find_duplicate_meshes(transform_invariant=False):
+    """ Group identical meshes, canonical one first,
+        with the transform from canonical to each duplicate
+    """
+    # var init
+    selected_only = bpy.context.scene.retico_mesh_check_only_selected
+    meshes_owners, skipped = selection_sets.meshes_data(selected_only)
+    candidates = {}
+    groups = []
+    transforms = {}
+
+    # function core
+
+    # cheap pre-filters: counts, materials, and local bounding box if not transformed
+    for mesh, obj in meshes_owners:
+        key = (
+            len(mesh.vertices),
+            len(mesh.edges),
+            len(mesh.loops),
+            len(mesh.polygons),
+            len(mesh.uv_layers),
+            tuple(mat.name if mat else "" for mat in mesh.materials),
+        )
+        if not transform_invariant:
+            key += tuple(round(value, 4)
+                         for corner in obj.bound_box for value in corner)
+        candidates.setdefault(key, []).append(mesh)
+
+    # full hash, only when several meshes could match
+    for meshes in candidates.values():
+        if len(meshes) < 2:
+            continue
+        hashed = {}
+        for mesh in meshes:
+            co, arrays, loop_normals = mesh_compare_arrays(mesh)
+            fingerprint = mesh_fingerprint(co, arrays, loop_normals, transform_invariant)
+            hashed.setdefault(fingerprint, []).append((mesh, co, loop_normals))
+
+        for matches in hashed.values():
+            if len(matches) < 2:
+                continue
+            # most used mesh is kept
+            matches.sort(key=lambda match: (-match[0].users, match[0].name))
+            canonical, canonical_co, canonical_normals = matches[0]
+            group = [canonical]
+            for mesh, co, loop_normals in matches[1:]:
+                if transform_invariant:
+                    transform = rigid_transform(canonical_co, co)
+                    if transform is None:
+                        continue
+                    if loop_normals is not None and np.abs(
+                            canonical_normals @ transform[0].T - loop_normals).max() > 1e-3:
+                        # custom normals don't follow the same rotation
+                        continue
+                    transforms[mesh] = transform
+                group.append(mesh)
+            if len(group) > 1:
+                groups.append(group)
+
+    return groups, transforms
+
+
+def instance_duplicate_meshes(transform_invariant=False, relink=True):
+    """ Find duplicate meshes and make their objects share the canonical one
+    """
+    # var init
+    user_active = bpy.context.view_layer.objects.active
+    is_user_in_edit_mode = False
+    relinked_meshes = 0
+
+    # handling active object
+    if user_active and user_active.mode == 'EDIT':
+        is_user_in_edit_mode = True
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    # function core
+    groups, transforms = find_duplicate_meshes(transform_invariant)
+
+    if relink and len(groups) > 0:
+        canonical_of = {
+            mesh: group[0] for group in groups for mesh in group[1:]}
+        for obj in bpy.data.objects:
+            if obj.type != 'MESH' or obj.data not in canonical_of:
+                continue
+            mesh = obj.data
+            if mesh in transforms:
+                # canonical vertices have to be moved where duplicate ones were
+                rotation, translation = transforms[mesh]
+                offset = Matrix.Identity(4)
+                for row in range(3):
+                    for col in range(3):
+                        offset[row][col] = rotation[row][col]
+                    offset[row][3] = translation[row]
+                obj.matrix_world = obj.matrix_world @ offset
+            obj.data = canonical_of[mesh]
+        for mesh in canonical_of:
+            relinked_meshes += 1
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+
+    # handling active object
+    if is_user_in_edit_mode:
+        bpy.ops.object.mode_set(mode='EDIT')
+
+    return groups, relinked_meshes
 
-        if apply:
-            bpy.ops.mesh.customdata_custom_splitnormals_add()
+
+def batch_mesh_part(obj, origin, slots_map):
+    """ Read mesh arrays of an object, in world space relative to origin,
+        winding flipped if object is mirrored
+    """
+    # var init
+    mesh = obj.data
+    vertices_count = len(mesh.vertices)
+    edges_count = len(mesh.edges)
+    loops_count = len(mesh.loops)
+    faces_count = len(mesh.polygons)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    rotation_scale = matrix[:3, :3]
+    part = {
+        "co": np.empty(vertices_count * 3, dtype=np.float32),
+        "edges": np.empty(edges_count * 2, dtype=np.int32),
+        "edge_sharp": np.empty(edges_count, dtype=bool),
+        "edge_seam": np.empty(edges_count, dtype=bool),
+        "loop_vert": np.empty(loops_count, dtype=np.int32),
+        "loop_edge": np.empty(loops_count, dtype=np.int32),
+        "loop_start": np.empty(faces_count, dtype=np.int32),
+        "loop_total": np.empty(faces_count, dtype=np.int32),
+        "material_index": np.empty(faces_count, dtype=np.int32),
+        "smooth": np.empty(faces_count, dtype=bool),
+        "uvs": [],
+        "normals": None,
+        # autosmooth angle before 4.1, None if not used
+        "auto_smooth": None
+    }
+
+    # function core
+    mesh.vertices.foreach_get("co", part["co"])
+    mesh.edges.foreach_get("vertices", part["edges"])
+    mesh.edges.foreach_get("use_edge_sharp", part["edge_sharp"])
+    mesh.edges.foreach_get("use_seam", part["edge_seam"])
+    mesh.loops.foreach_get("vertex_index", part["loop_vert"])
+    mesh.loops.foreach_get("edge_index", part["loop_edge"])
+    mesh.polygons.foreach_get("loop_start", part["loop_start"])
+    mesh.polygons.foreach_get("loop_total", part["loop_total"])
+    mesh.polygons.foreach_get("material_index", part["material_index"])
+    mesh.polygons.foreach_get("use_smooth", part["smooth"])
+    for uv_layer in mesh.uv_layers:
+        uv = np.empty(loops_count * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uv)
+        part["uvs"].append(uv.reshape(-1, 2))
+
+    part["co"] = (part["co"].reshape(-1, 3) @ rotation_scale.T
+                  + matrix[:3, 3] - origin).astype(np.float32)
+    part["edges"] = part["edges"].reshape(-1, 2)
+    # object slots to batch slots
+    part["material_index"] = slots_map[
+        np.clip(part["material_index"], 0, len(slots_map) - 1)]
+    if bpy.app.version < (4, 1, 0):
+        if mesh.use_auto_smooth:
+            # each part angle, baked as sharp edges, batch angle is then 180
+            part["auto_smooth"] = mesh.auto_smooth_angle
+            face_normals = np.empty(faces_count * 3, dtype=np.float32)
+            mesh.polygons.foreach_get("normal", face_normals)
+            part["edge_sharp"] |= sharp_edges_from_angle(
+                face_normals.reshape(-1, 3), uvs.loops_face_index(part["loop_start"], part["loop_total"]),
+                part["loop_edge"], part["loop_vert"], edges_count, mesh.auto_smooth_angle)
         else:
-            bpy.ops.mesh.customdata_custom_splitnormals_clear()
+            # sharp edges mean nothing without autosmooth
+            part["edge_sharp"][:] = False
+    if mesh.has_custom_normals:
+        # normals follow the inverse transpose
+        normals = mesh_loop_normals(mesh) @ np.linalg.inv(rotation_scale)
+        lengths = np.linalg.norm(normals, axis=1)[:, None]
+        part["normals"] = (normals / np.maximum(lengths, 1e-12)).astype(np.float32)
+
+    if np.linalg.det(rotation_scale) < 0:
+        # mirrored object: polygons have to be reversed to face outside
+        loop_face = uvs.loops_face_index(part["loop_start"], part["loop_total"])
+        first = part["loop_start"][loop_face]
+        total = part["loop_total"][loop_face]
+        offset = np.arange(loops_count) - first
+        vertex_order = first + (total - 1 - offset)
+        # loop edge goes to next vertex, once reversed it's the previous one
+        edge_order = first + (total - 2 - offset) % total
+        part["loop_vert"] = part["loop_vert"][vertex_order]
+        part["loop_edge"] = part["loop_edge"][edge_order]
+        part["uvs"] = [uv[vertex_order] for uv in part["uvs"]]
+        if part["normals"] is not None:
+            part["normals"] = part["normals"][vertex_order]
+
+    return part
+
+
+def build_batch_mesh(name, parts, materials, uv_names):
+    """ Concatenate mesh parts arrays into a new mesh
+    """
+    # var init
+    # int32 offsets keep arrays int32, foreach_set fast path
+    vertices_offsets = np.cumsum([0] + [len(part["co"]) for part in parts], dtype=np.int32)
+    edges_offsets = np.cumsum([0] + [len(part["edges"]) for part in parts], dtype=np.int32)
+    loops_offsets = np.cumsum([0] + [len(part["loop_vert"]) for part in parts], dtype=np.int32)
+    use_custom_normals = any(part["normals"] is not None for part in parts)
+    mesh = bpy.data.meshes.new(name)
+
+    # function core
+    co = np.concatenate([part["co"] for part in parts])
+    edges = np.concatenate([part["edges"] + offset
+                            for part, offset in zip(parts, vertices_offsets)])
+    loop_vert = np.concatenate([part["loop_vert"] + offset
+                                for part, offset in zip(parts, vertices_offsets)])
+    loop_edge = np.concatenate([part["loop_edge"] + offset
+                                for part, offset in zip(parts, edges_offsets)])
+    loop_start = np.concatenate([part["loop_start"] + offset
+                                 for part, offset in zip(parts, loops_offsets)])
+
+    mesh.vertices.add(len(co))
+    mesh.edges.add(len(edges))
+    mesh.loops.add(len(loop_vert))
+    mesh.polygons.add(len(loop_start))
+    mesh.vertices.foreach_set("co", co.ravel())
+    mesh.edges.foreach_set("vertices", edges.ravel())
+    mesh.edges.foreach_set("use_edge_sharp", np.concatenate(
+        [part["edge_sharp"] for part in parts]))
+    mesh.edges.foreach_set("use_seam", np.concatenate(
+        [part["edge_seam"] for part in parts]))
+    mesh.loops.foreach_set("vertex_index", loop_vert)
+    mesh.loops.foreach_set("edge_index", loop_edge)
+    mesh.polygons.foreach_set("loop_start", loop_start)
+    if bpy.app.version < (4, 0, 0):
+        # deduced from loop_start since 4.0
+        mesh.polygons.foreach_set("loop_total", np.concatenate(
+            [part["loop_total"] for part in parts]))
+    mesh.polygons.foreach_set("material_index", np.concatenate(
+        [part["material_index"] for part in parts]))
+    mesh.polygons.foreach_set("use_smooth", np.concatenate(
+        [part["smooth"] for part in parts]))
+
+    for uv_index, uv_name in enumerate(uv_names):
+        uv_layer = mesh.uv_layers.new(name=uv_name)
+        uv_layer.data.foreach_set("uv", np.concatenate([
+            part["uvs"][uv_index] if uv_index < len(part["uvs"])
+            else np.zeros((len(part["loop_vert"]), 2), dtype=np.float32)
+            for part in parts]).ravel())
+
+    for mat in materials:
+        mesh.materials.append(mat)
+
+    if any(part["auto_smooth"] is not None for part in parts):
+        # parts angles are baked in sharp edges
+        mesh.use_auto_smooth = True
+        mesh.auto_smooth_angle = math.pi
+
+    mesh.update()
+
+    if use_custom_normals:
+        if bpy.app.version < (4, 1, 0):
+            # custom normals needed autosmooth before 4.1
+            mesh.use_auto_smooth = True
+        # parts without custom normals keep their current ones
+        loop_normals = mesh_loop_normals(mesh)
+        mesh.normals_split_custom_set(np.concatenate([
+            part["normals"] if part["normals"] is not None
+            else loop_normals[loops_offsets[index]:loops_offsets[index + 1]]
+            for index, part in enumerate(parts)]))
+
+    return mesh
+
+
+def batch_data_loss(obj):
+    """ Return what joining an object would lose, None if nothing
+    """
+    # var init
+    mesh = obj.data
+    animation_data = obj.animation_data
+    uv_names = {uv_layer.name for uv_layer in mesh.uv_layers}
+
+    # function core
+    if len(obj.modifiers) > 0:
+        return "modifiers"
+    if mesh.shape_keys is not None:
+        return "shape keys"
+    if obj.parent is not None or len(obj.children) > 0:
+        return "hierarchy"
+    if len(obj.constraints) > 0:
+        return "constraints"
+    if animation_data is not None and (
+        animation_data.action is not None
+        or len(animation_data.drivers) > 0
+        or len(animation_data.nla_tracks) > 0
+    ):
+        return "animation"
+    if len(obj.vertex_groups) > 0:
+        return "vertex groups"
+    if abs(obj.matrix_world.to_3x3().determinant()) < 1e-12:
+        # flattened on an axis, normals can't follow
+        return "zero scale"
+    for attribute in mesh.attributes:
+        if (
+            not attribute.name.startswith(".")
+            and attribute.name not in batch_attributes
+            and attribute.name not in uv_names
+        ):
+            # color attributes, creases, bevel weights...
+            return "attributes"
+    if bpy.app.version < (4, 0, 0):
+        # creases & bevel weights were attributes since 4.0
+        for prop in ("crease", "bevel_weight"):
+            values = np.empty(len(mesh.edges), dtype=np.float32)
+            mesh.edges.foreach_get(prop, values)
+            if values.any():
+                return "attributes"
+
+    return None
+
+
+def morton_code(cell):
+    """ Interleave bits of (x, y, z) cell indices, or arrays of them,
+        cells close in space get close codes
+    """
+    code = 0
+    for bit in range(batch_morton_bits):
+        for axis, value in enumerate(cell):
+            code |= ((value >> bit) & 1) << (3 * bit + axis)
+
+    return code
+
+
+def object_materials(obj):
+    """ Return materials of an object slots, object linked ones included
+    """
+    return [slot.material for slot in obj.material_slots]
+
+
+def static_batches(objects, vertex_budget, grid_size=0.0):
+    """ Group objects sharing the same materials & collections, and the same
+        grid cell if any, in batches below vertex budget
+    """
+    # var init
+    groups = {}
+    batches = []
+    skipped = 0
+
+    # function core
+    for obj in objects:
+        mesh = obj.data
+        if batch_data_loss(obj) is not None or len(mesh.vertices) > vertex_budget:
+            # can't be joined without losing something, or too big
+            skipped += 1
+            continue
+        center = obj.matrix_world @ (sum((Vector(corner)
+                                          for corner in obj.bound_box), Vector()) / 8)
+        cell = tuple(math.floor(value / grid_size)
+                     for value in center) if grid_size > 0 else ()
+        materials_key = tuple(sorted({mat.name for mat in object_materials(obj) if mat is not None}))
+        # batch is linked where its objects were
+        collections_key = tuple(sorted(collection.name for collection in obj.users_collection))
+        groups.setdefault((materials_key, collections_key, cell), []).append((tuple(center), obj))
+
+    for group in groups.values():
+        # neighbours first along a Z-order curve, batches stay compact
+        centers = np.array([center for center, obj in group])
+        low = centers.min(axis=0)
+        extent = np.maximum(centers.max(axis=0) - low, 1e-6)
+        cells = ((centers - low) / extent * ((1 << batch_morton_bits) - 1)).astype(np.int64)
+        codes = [morton_code(cell) for cell in cells.tolist()]
+        group = [item for code, item in sorted(zip(codes, group), key=lambda pair: pair[0])]
+        batch = []
+        batch_vertices = 0
+        for center, obj in group:
+            vertices_count = len(obj.data.vertices)
+            if batch_vertices + vertices_count > vertex_budget and len(batch) > 0:
+                batches.append(batch)
+                batch = []
+                batch_vertices = 0
+            batch.append(obj)
+            batch_vertices += vertices_count
+        batches.append(batch)
+
+    # a single object is already a batch
+    skipped += sum(len(batch) for batch in batches if len(batch) == 1)
+
+    return [batch for batch in batches if len(batch) > 1], skipped
+
+
+def static_batching():
+    """ Merge objects sharing the same materials into as few meshes
+        as vertex budget allows, built from arrays, no join operator,
+        return new objects and how many objects were left alone
+    """
+    # var init
+    user_active = bpy.context.view_layer.objects.active
+    is_user_in_edit_mode = False
+    scene = bpy.context.scene
+    selected_only = scene.retico_mesh_check_only_selected
+    objects = selection_sets.meshes_in_selection(
+    ) if selected_only else selection_sets.meshes_selectable()
+    batched_objects = []
+
+    # handling active object
+    if user_active and user_active.mode == 'EDIT':
+        is_user_in_edit_mode = True
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    # function core
+    batches, skipped = static_batches(
+        objects, scene.retico_mesh_batch_vertex_budget, scene.retico_mesh_batch_grid_size)
+    for batch in batches:
+        first = batch[0]
+        materials = sorted({mat for obj in batch for mat in object_materials(obj) if mat is not None},
+                           key=lambda mat: mat.name)
+        uv_names = [uv_layer.name for uv_layer in max(
+            (obj.data for obj in batch), key=lambda mesh: len(mesh.uv_layers)).uv_layers]
+        corners = np.array([obj.matrix_world @ Vector(corner)
+                            for obj in batch for corner in obj.bound_box])
+        origin = (corners.min(axis=0) + corners.max(axis=0)) / 2
+
+        parts = []
+        for obj in batch:
+            slots_map = np.array([materials.index(mat) if mat is not None else 0
+                                  for mat in object_materials(obj)] or [0], dtype=np.int32)
+            parts.append(batch_mesh_part(obj, origin, slots_map))
+        mesh = build_batch_mesh("{}_batch".format(first.name), parts, materials, uv_names)
+
+        batch_object = bpy.data.objects.new(mesh.name, mesh)
+        batch_object.location = origin
+        for collection in first.users_collection:
+            collection.objects.link(batch_object)
+
+        meshes = {obj.data for obj in batch}
+        for obj in batch:
+            bpy.data.objects.remove(obj)
+        for old_mesh in meshes:
+            if old_mesh.users == 0:
+                bpy.data.meshes.remove(old_mesh)
+        batched_objects.append((batch_object, len(batch)))
+
+    # a single update for all meshes
+    bpy.context.view_layer.update()
+    for batch_object, objects_count in batched_objects:
+        batch_object.select_set(True)
+
+    # handling active object, unless it has been merged
+    if is_user_in_edit_mode and bpy.context.view_layer.objects.active is not None:
+        bpy.ops.object.mode_set(mode='EDIT')
+
+    return batched_objects, skipped
+
+
+def segments_first(groups):
+    """ Return which items start a run of equal groups
+    """
+    is_first = np.ones(len(groups), dtype=bool)
+    np.not_equal(groups[1:], groups[:-1], out=is_first[1:])
+
+    return is_first
+
+
+def segments_rank(groups):
+    """ Return rank of each item in its run of equal groups
+    """
+    index = np.arange(len(groups))
+
+    return index - np.maximum.accumulate(np.where(segments_first(groups), index, 0))
+
+
+def faces_loops(faces, loop_start, loop_total):
+    """ Return loops of faces, in faces order,
+        and where each face starts in them
+    """
+    faces_total = loop_total[faces]
+    faces_start = np.cumsum(faces_total) - faces_total
+    loops = np.repeat(loop_start[faces], faces_total) + \
+        np.arange(int(faces_total.sum())) - np.repeat(faces_start, faces_total)
+
+    return loops, faces_start
+
+
+def tipsify(faces, loop_start, loop_total, loop_vert, centers, cache_size):
+    """ Return faces reordered for the post-transform vertex cache,
+        Tipsify linear algorithm (Sander et al. 2007) run side by side
+        on patches of faces close along a Z-order curve, each patch
+        fanning around its cached vertices, adjacency kept in flat arrays
+    """
+    # var init
+    low = centers[faces].min(axis=0)
+    extent = max(float((centers[faces].max(axis=0) - low).max()), 1e-6)
+    cells = ((centers[faces] - low) / extent * ((1 << batch_morton_bits) - 1)).astype(np.int64)
+    faces = faces[np.argsort(morton_code(cells.T), kind='stable')]
+    faces_count = len(faces)
+    faces_total = loop_total[faces]
+    loops, faces_start = faces_loops(faces, loop_start, loop_total)
+    face_patch = np.arange(faces_count) // tipsify_patch_faces
+    patches_count = int(face_patch[-1]) + 1
+    patches = np.arange(patches_count)
+    loop_patch = np.repeat(face_patch, faces_total)
+    # vertices local to each patch, patches don't share a cache
+    keys = loop_patch * (int(loop_vert.max()) + 1) + loop_vert[loops]
+    by_key = np.argsort(keys, kind='stable')
+    is_first = segments_first(keys[by_key])
+    corner_vert = np.empty(len(loops), dtype=np.int64)
+    corner_vert[by_key] = np.cumsum(is_first) - 1
+    verts_count = int(is_first.sum())
+    verts_first = np.searchsorted(loop_patch[by_key][is_first], patches)
+    verts_end = np.append(verts_first[1:], verts_count)
+    live = np.bincount(corner_vert, minlength=verts_count)
+    # vertex -> faces adjacency, faces of vertex v in [adjacency_start[v], adjacency_start[v + 1]]
+    adjacency_start = np.concatenate(([0], np.cumsum(live)))
+    adjacency = np.repeat(np.arange(faces_count), faces_total)[by_key]
+    # first occurrence of faces and vertices in a step
+    faces_seen = np.full(faces_count, len(loops))
+    verts_seen = np.full(verts_count, len(loops))
+    stamps = np.full(verts_count, -cache_size - 1, dtype=np.int64)
+    times = np.zeros(patches_count, dtype=np.int64)
+    emitted = np.zeros(faces_count, dtype=bool)
+    emitted_count = patches * tipsify_patch_faces
+    order = np.empty(faces_count, dtype=np.int64)
+    # dead-end stack of each patch, in its own loops range
+    stack = np.empty(len(loops), dtype=np.int64)
+    stack_first = faces_start[patches * tipsify_patch_faces]
+    stack_top = stack_first.copy()
+    cursors = verts_first.copy()
+    fanning = verts_first.copy()
+    active = patches
+
+    # function core
+    while len(active) > 0:
+        # faces around fanning vertices, not emitted yet
+        fans = fanning[active]
+        counts = adjacency_start[fans + 1] - adjacency_start[fans]
+        fan_faces = adjacency[np.repeat(adjacency_start[fans], counts) + segments_rank(np.repeat(active, counts))]
+        fan_faces = fan_faces[~emitted[fan_faces]]
+        # a face using a vertex twice is adjacent twice
+        np.minimum.at(faces_seen, fan_faces, np.arange(len(fan_faces)))
+        fan_faces = fan_faces[faces_seen[fan_faces] == np.arange(len(fan_faces))]
+        faces_seen[fan_faces] = len(loops)
+        fan_patch = face_patch[fan_faces]
+        emitted[fan_faces] = True
+        order[emitted_count[fan_patch] + segments_rank(fan_patch)] = fan_faces
+        emitted_count += np.bincount(fan_patch, minlength=patches_count)
+
+        # their vertices, pushed on dead-end stacks
+        fan_total = faces_total[fan_faces]
+        fan_loops = np.repeat(faces_start[fan_faces], fan_total) + segments_rank(np.repeat(fan_faces, fan_total))
+        fan_verts = corner_vert[fan_loops]
+        verts_patch = np.repeat(fan_patch, fan_total)
+        stack[stack_top[verts_patch] + segments_rank(verts_patch)] = fan_verts
+        stack_top += np.bincount(verts_patch, minlength=patches_count)
+        np.subtract.at(live, fan_verts, 1)
+        np.minimum.at(verts_seen, fan_verts, np.arange(len(fan_verts)))
+        first = np.flatnonzero(verts_seen[fan_verts] == np.arange(len(fan_verts)))
+        verts_seen[fan_verts] = len(loops)
+        candidates = fan_verts[first]
+        candidates_patch = verts_patch[first]
+        # vertices out of cache enter it, in faces order
+        is_missed = times[candidates_patch] - stamps[candidates] > cache_size
+        missed_patch = candidates_patch[is_missed]
+        stamps[candidates[is_missed]] = times[missed_patch] + segments_rank(missed_patch)
+        times += np.bincount(missed_patch, minlength=patches_count)
+
+        # next fanning vertex: still in cache after its faces, oldest first
+        ages = times[candidates_patch] - stamps[candidates]
+        priority = np.where(ages + 2 * live[candidates] <= cache_size, ages, 0)
+        priority[live[candidates] == 0] = -1
+        is_first = segments_first(candidates_patch)
+        best = np.flatnonzero(priority == np.maximum.reduceat(priority, np.flatnonzero(is_first))[
+            np.cumsum(is_first) - 1])
+        best = best[segments_first(candidates_patch[best])]
+        best = best[priority[best] >= 0]
+        fanning[active] = -1
+        fanning[candidates_patch[best]] = candidates[best]
+
+        # dead end: recently used vertices, then input order
+        for patch in active[fanning[active] < 0].tolist():
+            stacked = stack[stack_first[patch]:stack_top[patch]]
+            alive = np.flatnonzero(live[stacked] > 0)
+            if len(alive) > 0:
+                fanning[patch] = stacked[alive[-1]]
+                stack_top[patch] = stack_first[patch] + alive[-1]
+                continue
+            stack_top[patch] = stack_first[patch]
+            alive = np.flatnonzero(live[cursors[patch]:verts_end[patch]] > 0)
+            if len(alive) > 0:
+                cursors[patch] += alive[0]
+                fanning[patch] = cursors[patch]
+        active = active[fanning[active] >= 0]
+
+    return faces[order]
+
+
+def cache_simulation(verts, cold_starts, cache_size):
+    """ Return which loops miss a FIFO vertex cache, cold at each start,
+        chunks simulated side by side from a cold cache, then each chunk
+        replayed from the previous chunk cache until both agree
+    """
+    # var init
+    loops_count = len(verts)
+    cold_ends = np.append(cold_starts[1:], loops_count)
+    chunks_per_run = -(-(cold_ends - cold_starts) // cache_simulation_chunk)
+    chunks_first = np.cumsum(chunks_per_run) - chunks_per_run
+    chunks_start = np.repeat(cold_starts, chunks_per_run) + cache_simulation_chunk * \
+        segments_rank(np.repeat(np.arange(len(cold_starts)), chunks_per_run))
+    chunks_end = np.minimum(chunks_start + cache_simulation_chunk, np.repeat(cold_ends, chunks_per_run))
+    is_cold = np.zeros(len(chunks_start), dtype=bool)
+    is_cold[chunks_first] = True
+    chunks = np.arange(len(chunks_start))
+    # a column per chunk, only last chunks of runs are padded, their cache isn't used
+    positions = chunks_start + np.arange((chunks_end - chunks_start).max())[:, None]
+    is_valid = positions < chunks_end
+    steps_verts = np.where(is_valid, verts[np.minimum(positions, loops_count - 1)], -1).astype(np.int32)
+    steps_missed = np.zeros(steps_verts.shape, dtype=bool)
+    cache = np.full((cache_size, len(chunks_start)), -1, dtype=np.int32)
+    heads = np.zeros(len(chunks_start), dtype=np.int64)
+    previous = []
+
+    # function core
+
+    # all chunks at once, a loop each step
+    for step_verts, step_missed in zip(steps_verts, steps_missed):
+        missed_chunks = np.flatnonzero(~(cache == step_verts).any(axis=0))
+        cache[heads[missed_chunks], missed_chunks] = step_verts[missed_chunks]
+        heads[missed_chunks] = (heads[missed_chunks] + 1) % cache_size
+        step_missed[missed_chunks] = True
+    missed = steps_missed.T[is_valid.T]
+    # oldest vertex first
+    chunks_cache = cache[(heads[:, None] + np.arange(cache_size)) % cache_size, chunks[:, None]].tolist()
+
+    # warm chunks replayed from the previous chunk cache
+    for chunk, start, end in zip(chunks.tolist(), chunks_start.tolist(), chunks_end.tolist()):
+        if not is_cold[chunk]:
+            stamps = {vert: stamp for stamp, vert in enumerate(previous)}
+            time = len(previous)
+            agreed = 0
+            position = start
+            # few loops are usually replayed, read by small windows
+            while position < end and agreed < cache_size:
+                for vert in verts[position:min(position + 4 * cache_size, end)].tolist():
+                    is_miss = time - stamps.get(vert, -cache_size - 1) > cache_size
+                    if is_miss:
+                        stamps[vert] = time
+                        time += 1
+                    if is_miss != missed[position]:
+                        missed[position] = is_miss
+                        agreed = 0
+                    elif is_miss:
+                        # same last vertices loaded, same cache until chunk end
+                        agreed += 1
+                    position += 1
+                    if agreed >= cache_size:
+                        break
+            if agreed < cache_size:
+                previous = sorted(stamps, key=stamps.get)[-cache_size:]
+                continue
+        previous = chunks_cache[chunk]
+
+    return missed
+
+
+def vertex_cache_misses(order, loop_start, loop_total, loop_vert, material_index, cache_size):
+    """ Return cache misses of each face drawn in order through
+        a FIFO vertex cache, cold for each material (a glTF primitive each)
+    """
+    # var init
+    loops, faces_start = faces_loops(order, loop_start, loop_total)
+    materials = material_index[order]
+    cold_starts = faces_start[np.flatnonzero(np.diff(materials, prepend=-1))]
+
+    # function core
+    missed = cache_simulation(loop_vert[loops], cold_starts, cache_size)
+
+    return np.add.reduceat(missed, faces_start, dtype=np.int64)
+
+
+def overdraw_clusters(order, loop_start, loop_total, loop_vert, material_index, cache_size, threshold):
+    """ Split an ordered faces list in clusters, where the cache goes cold,
+        then wherever the cluster keeps ACMR below threshold x the one
+        of its cold run, return clusters starts
+    """
+    # var init
+    loops, faces_start = faces_loops(order, loop_start, loop_total)
+    faces_start = np.append(faces_start, len(loops))
+    verts = loop_vert[loops]
+    materials = material_index[order]
+    cold_starts = faces_start[np.flatnonzero(np.diff(materials, prepend=-1))]
+    missed = cache_simulation(verts, cold_starts, cache_size)
+    misses = np.add.reduceat(missed, faces_start[:-1], dtype=np.int64)
+    triangles = loop_total[order] - 2
+    # previous loop using the same vertex, drawn by another cluster if before its start
+    by_vert = np.argsort(verts, kind='stable')
+    previous = np.full(len(loops), -1, dtype=np.int64)
+    is_same = verts[by_vert[1:]] == verts[by_vert[:-1]]
+    previous[by_vert[1:][is_same]] = by_vert[:-1][is_same]
+    is_hard = (misses == loop_total[order])
+    is_hard[0] = True
+    is_hard[1:] |= materials[1:] != materials[:-1]
+    hard_starts = np.flatnonzero(is_hard)
+    runs_end = np.append(hard_starts[1:], len(order))
+    # acmr of each cold run
+    runs_acmr = np.add.reduceat(misses, hard_starts) / \
+        np.maximum(np.add.reduceat(triangles, hard_starts), 1)
+    clusters_starts = []
+
+    # function core
+    for start, run_end, run_acmr in zip(hard_starts.tolist(), runs_end.tolist(), runs_acmr.tolist()):
+        limit = run_acmr * threshold
+        while start < run_end:
+            clusters_starts.append(start)
+            # misses of the cluster drawn with a cold cache, in growing windows
+            first_loop = faces_start[start]
+            balance = 0.0
+            end = start
+            width = 256
+            next_start = run_end
+            while end < run_end:
+                stop = min(end + width, run_end)
+                window = slice(faces_start[end], faces_start[stop])
+                cold_missed = missed[window] | (previous[window] < first_loop)
+                running = balance + np.cumsum(
+                    np.add.reduceat(cold_missed, faces_start[end:stop] - faces_start[end])
+                    - limit * triangles[end:stop])
+                below = np.flatnonzero(running <= 0)
+                if len(below) > 0:
+                    next_start = end + int(below[0]) + 1
+                    break
+                balance = running[-1]
+                end = stop
+                width *= 2
+            start = next_start
+
+    return np.array(clusters_starts, dtype=np.int64)
+
+
+def overdraw_sort(order, clusters_starts, centers, normals, areas, material_index):
+    """ Sort clusters of each material, outer facing ones first,
+        so they hide what is behind them
+    """
+    # var init
+    weights = areas[order, None]
+    clusters_area = np.maximum(np.add.reduceat(areas[order], clusters_starts), 1e-12)
+    clusters_center = np.add.reduceat(centers[order] * weights, clusters_starts) / clusters_area[:, None]
+    clusters_normal = np.add.reduceat(normals[order] * weights, clusters_starts)
+    clusters_normal /= np.maximum(np.linalg.norm(clusters_normal, axis=1), 1e-12)[:, None]
+    mesh_center = (centers * areas[:, None]).sum(axis=0) / max(areas.sum(), 1e-12)
+    clusters_size = np.diff(np.append(clusters_starts, len(order)))
+
+    # function core
+    score = np.einsum("ij,ij->i", clusters_center - mesh_center, clusters_normal)
+    clusters_order = np.lexsort((-score, material_index[order[clusters_starts]]))
+    positions = np.repeat(clusters_starts[clusters_order], clusters_size[clusters_order]) + \
+        np.arange(len(order)) - np.repeat(np.cumsum(clusters_size[clusters_order]) -
+                                          clusters_size[clusters_order], clusters_size[clusters_order])
+
+    return order[positions]
+
+
+def mesh_reorder_faces(mesh, order):
+    """ Reorder faces, and their loops, attributes included,
+        using foreach_get/foreach_set only
+    """
+    # var init
+    faces_count = len(mesh.polygons)
+    loops_count = len(mesh.loops)
+    loop_start = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    loop_total = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    loops, faces_start = faces_loops(order, loop_start, loop_total)
+    loop_normals = mesh_loop_normals(mesh) if mesh.has_custom_normals else None
+    domains = {'FACE': order, 'CORNER': loops}
+    attributes_names = {attribute.name for attribute in mesh.attributes}
+
+    # function core
+    for prop in ("vertex_index", "edge_index"):
+        values = np.empty(loops_count, dtype=np.int32)
+        mesh.loops.foreach_get(prop, values)
+        mesh.loops.foreach_set(prop, values[loops])
+    for attribute in mesh.attributes:
+        if (
+            attribute.domain not in domains
+            or attribute.data_type not in attributes_foreach
+            or attribute.name in (".corner_vert", ".corner_edge")
+        ):
+            continue
+        key, width, dtype = attributes_foreach[attribute.data_type]
+        values = np.empty(len(attribute.data) * width, dtype=dtype)
+        attribute.data.foreach_get(key, values)
+        attribute.data.foreach_set(key, values.reshape(-1, width)[
+            domains[attribute.domain]].ravel())
+    # not stored as attributes in older versions
+    for uv_layer in mesh.uv_layers:
+        if uv_layer.name not in attributes_names:
+            values = np.empty(loops_count * 2, dtype=np.float32)
+            uv_layer.data.foreach_get("uv", values)
+            uv_layer.data.foreach_set("uv", values.reshape(-1, 2)[loops].ravel())
+    for prop, attribute_name, dtype in (
+        ("material_index", "material_index", np.int32),
+        ("use_smooth", "sharp_face", bool),
+    ):
+        if attribute_name not in attributes_names:
+            values = np.empty(faces_count, dtype=dtype)
+            mesh.polygons.foreach_get(prop, values)
+            mesh.polygons.foreach_set(prop, values[order])
+
+    mesh.polygons.foreach_set("loop_start", faces_start.astype(np.int32))
+    if bpy.app.version < (4, 0, 0):
+        # deduced from loop_start since 4.0
+        mesh.polygons.foreach_set("loop_total", loop_total[order])
+    mesh.update()
+
+    if loop_normals is not None:
+        mesh.normals_split_custom_set(loop_normals[loops])
+
+
+def mesh_optimize_vertex_cache(mesh, cache_size, overdraw_threshold=0.0):
+    """ Reorder faces of each material for the vertex cache, then
+        for overdraw if a threshold is given, return ACMR & ATVR
+        before and after
+    """
+    # var init
+    faces_count = len(mesh.polygons)
+    vertices_count = len(mesh.vertices)
+    loop_start = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    loop_total = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    material_index = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", material_index)
+    loop_vert = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    centers = np.empty(faces_count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("center", centers)
+    centers = centers.reshape(-1, 3)
+    loop_face = uvs.loops_face_index(loop_start, loop_total)
+    triangles_count = int((loop_total - 2).sum())
+    # glTF export duplicates vertices shared by several materials
+    exported_count = len(np.unique(
+        material_index[loop_face].astype(np.int64) * vertices_count + loop_vert))
+    # glTF export draws faces grouped by material
+    initial_order = np.argsort(material_index, kind='stable')
+
+    # function core
+    misses_before = int(vertex_cache_misses(
+        initial_order, loop_start, loop_total, loop_vert, material_index, cache_size).sum())
+    order = np.concatenate([
+        tipsify(np.flatnonzero(material_index == material),
+                loop_start, loop_total, loop_vert, centers, cache_size)
+        for material in np.unique(material_index)])
+    if overdraw_threshold > 0:
+        normals = np.empty(faces_count * 3, dtype=np.float32)
+        mesh.polygons.foreach_get("normal", normals)
+        areas = np.empty(faces_count, dtype=np.float32)
+        mesh.polygons.foreach_get("area", areas)
+        clusters_starts = overdraw_clusters(
+            order, loop_start, loop_total, loop_vert, material_index, cache_size, overdraw_threshold)
+        order = overdraw_sort(order, clusters_starts, centers, normals.reshape(-1, 3), areas, material_index)
+    # a single simulation of the final order
+    misses = vertex_cache_misses(
+        order, loop_start, loop_total, loop_vert, material_index, cache_size)
+
+    misses_after = int(misses.sum())
+    # overdraw sort trades some cache misses on purpose
+    is_reordered = misses_after < misses_before or overdraw_threshold > 0
+    if is_reordered:
+        mesh_reorder_faces(mesh, order)
+    else:
+        misses_after = misses_before
+
+    return {
+        "mesh": mesh.name,
+        "triangles": triangles_count,
+        "acmr_before": round(misses_before / max(triangles_count, 1), 3),
+        "acmr_after": round(misses_after / max(triangles_count, 1), 3),
+        "atvr_before": round(misses_before / max(exported_count, 1), 3),
+        "atvr_after": round(misses_after / max(exported_count, 1), 3),
+        "reordered": is_reordered
+    }
+
+
+def optimize_vertex_cache():
+    """ Reorder faces of all meshes for the GPU vertex cache,
+        and optionally for overdraw, return a row per mesh
+        and how many objects were skipped because sharing a mesh
+    """
+    # var init
+    user_active = bpy.context.view_layer.objects.active
+    is_user_in_edit_mode = False
+    scene = bpy.context.scene
+    selected_only = scene.retico_mesh_check_only_selected
+    meshes_owners, skipped = selection_sets.meshes_data(selected_only)
+    overdraw_threshold = scene.retico_mesh_overdraw_threshold if scene.retico_mesh_overdraw_sort else 0.0
+    report_rows = []
+
+    # handling active object
+    if user_active and user_active.mode == 'EDIT':
+        is_user_in_edit_mode = True
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    # function core
+    for mesh, obj in meshes_owners:
+        if len(mesh.polygons) == 0:
+            continue
+        report_rows.append(mesh_optimize_vertex_cache(
+            mesh, scene.retico_mesh_vertex_cache_size, overdraw_threshold))
+
+    # a single update for all meshes
+    bpy.context.view_layer.update()
 
     # handling active object
-    bpy.context.view_layer.objects.active = user_active
     if is_user_in_edit_mode:
         bpy.ops.object.mode_set(mode='EDIT')
 
-    return {'FINISHED'}
+    return report_rows, skipped
+
+
+def mesh_memory_estimate(mesh):
+    """ Rough memory size of a mesh data, in bytes
+    """
+    # co + edges + loops (vertex & edge index) + polygons (start, total, material)
+    size = len(mesh.vertices) * 12 + len(mesh.edges) * 8 + \
+        len(mesh.loops) * 8 + len(mesh.polygons) * 12
+    # uv layers
+    size += len(mesh.uv_layers) * len(mesh.loops) * 8
+
+    return size
 
 
 def report_instances():
-    """ Report meshes using instances
+    """ Report meshes using instances,
+        one row per mesh: name, users, vertices, memory saved, objects
     """
     # var init
-    obj_using_instance = []
-    meshes_instanced = []
     update_selection = bpy.context.scene.retico_mesh_reports_update_selection
     selected_only = bpy.context.scene.retico_mesh_check_only_selected
-    objects_selected = selection_sets.meshes_in_selection(
-    ) if selected_only else selection_sets.meshes_selectable()
-    report_message = []
+    # mesh: [objects], from the scene index
+    meshes_instanced = selection_sets.scene_validation(selected_only)[
+        "instances"]
+    report_rows = []
 
     # function core
 
@@ -158,53 +1416,264 @@ def report_instances():
         for obj in bpy.context.selected_objects:
             obj.select_set(False)
 
-    for obj in objects_selected:
-        mesh = obj.data
-        already_exists = False
-        mesh_used_id = 0
-
-        # skipping non-instanced
-        if mesh.users <= 1:
-            continue
-
+    for mesh, obj_using_instance_list in meshes_instanced.items():
         if update_selection:
             # select those using instances
-            obj.select_set(True)
+            for obj in obj_using_instance_list:
+                obj.select_set(True)
 
-        # checking if instanced mesh already in list
-        for mesh_inst_id in range(len(meshes_instanced)):
-            if mesh == meshes_instanced[mesh_inst_id]:
-                already_exists = True
-                mesh_used_id = mesh_inst_id
-                continue
-        # if not, adding it and save instance id
-        if not already_exists:
-            meshes_instanced.append(mesh)
-            mesh_inst_id = len(meshes_instanced) - 1
-
-        # saving [object, instance_used_id]
-        obj_using_instance.append([obj, mesh_inst_id])
-
-    # for each instances, listing objects using it
-    for mesh_inst_id in range(len(meshes_instanced)):
-        obj_using_instance_list = []
-        obj_using_instance_list_name = ""
-        for obj_info in obj_using_instance:
-            if obj_info[1] == mesh_inst_id:
-                obj_using_instance_list.append(obj_info[0])
-        for obj in obj_using_instance_list:
-            obj_using_instance_list_name += "{}, ".format(obj.name)
-
-        report_message.append("{} used by: {}".format(
-            meshes_instanced[mesh_inst_id].name, obj_using_instance_list_name)[:-2])
+        report_rows.append({
+            "mesh": mesh.name,
+            "users": mesh.users,
+            "vertices": len(mesh.vertices),
+            "memory_saved_kb": round((mesh.users - 1) * mesh_memory_estimate(mesh) / 1024, 1),
+            "objects": [obj.name for obj in obj_using_instance_list],
+        })
 
     if update_selection and len(meshes_instanced) > 0:
-        bpy.context.view_layer.objects.active = obj_using_instance[0][0]
+        bpy.context.view_layer.objects.active = next(
+            iter(meshes_instanced.values()))[0]
 
-    if len(meshes_instanced) == 0:
+    if len(report_rows) == 0:
         return False
     else:
-        return report_message
+        report_rows.sort(
+            key=lambda row: row["memory_saved_kb"], reverse=True)
+        return report_rows
+
+
+def mesh_exported_vertices(mesh):
+    """ Count vertices a glTF exporter emits: unique (material, vertex, normal, UV0, UV1)
+        per loop, from packed rows, as each material is its own primitive
+    """
+    # var init
+    loops_count = len(mesh.loops)
+    faces_count = len(mesh.polygons)
+    if loops_count == 0:
+        return 0
+    loop_vert = np.empty(loops_count, dtype=np.int32)
+    loop_start = np.empty(faces_count, dtype=np.int32)
+    loop_total = np.empty(faces_count, dtype=np.int32)
+    material_index = np.empty(faces_count, dtype=np.int32)
+    # material index, vertex index, normal, uv0, uv1
+    rows = np.zeros((loops_count, 9), dtype=np.float32)
+
+    # function core
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    mesh.polygons.foreach_get("material_index", material_index)
+    # indices stored bitwise, no float rounding
+    rows[:, 0] = material_index[uvs.loops_face_index(
+        loop_start, loop_total)].astype(np.int32).view(np.float32)
+    rows[:, 1] = loop_vert.view(np.float32)
+    rows[:, 2:5] = mesh_loop_normals(mesh)
+    for uv_index, uv_layer in enumerate(mesh.uv_layers[:2]):
+        uv = np.empty(loops_count * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uv)
+        rows[:, 5 + uv_index * 2:7 + uv_index * 2] = uv.reshape(-1, 2)
+
+    # -0.0 and 0.0 are the same value, not the same bytes
+    rows[:, 2:] += 0.0
+    packed_rows = np.ascontiguousarray(rows).view(
+        np.dtype((np.void, rows.dtype.itemsize * rows.shape[1])))
+
+    # loose geometry isn't exported by default
+    return len(np.unique(packed_rows))
+
+
+def report_vertex_split():
+    """ Report meshes vertices once split by glTF export,
+        one row per mesh: name, vertices, exported vertices, split ratio, objects,
+        worst meshes first
+    """
+    # var init
+    user_active = bpy.context.view_layer.objects.active
+    is_user_in_edit_mode = False
+    scene = bpy.context.scene
+    update_selection = scene.retico_mesh_reports_update_selection
+    selected_only = scene.retico_mesh_check_only_selected
+    threshold = scene.retico_mesh_split_ratio_threshold
+    objects = selection_sets.meshes_in_selection(
+    ) if selected_only else selection_sets.meshes_selectable()
+    meshes_objects = {}
+    meshes_ratio = {}
+    report_rows = []
+
+    # handling active object
+    if user_active and user_active.mode == 'EDIT':
+        is_user_in_edit_mode = True
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    # function core
+    for obj in objects:
+        meshes_objects.setdefault(obj.data, []).append(obj)
+
+    for mesh, mesh_objects in meshes_objects.items():
+        vertices_count = len(mesh.vertices)
+        exported_vertices = mesh_exported_vertices(mesh)
+        meshes_ratio[mesh] = exported_vertices / vertices_count if vertices_count > 0 else 1.0
+        report_rows.append({
+            "mesh": mesh.name,
+            "vertices": vertices_count,
+            "exported_vertices": exported_vertices,
+            "split_ratio": round(meshes_ratio[mesh], 2),
+            "objects": [obj.name for obj in mesh_objects],
+        })
+
+    report_rows.sort(key=lambda row: row["split_ratio"], reverse=True)
+
+    # handling active object
+    if is_user_in_edit_mode:
+        bpy.ops.object.mode_set(mode='EDIT')
+
+    if update_selection:
+        # worst first, so the worst one becomes active
+        worst_meshes = sorted((mesh for mesh in meshes_objects if meshes_ratio[mesh] >= threshold),
+                              key=lambda mesh: meshes_ratio[mesh], reverse=True)
+        worst_objects = [obj for mesh in worst_meshes for obj in meshes_objects[mesh]]
+        if len(worst_objects) > 0:
+            for obj in bpy.context.selected_objects:
+                obj.select_set(False)
+            for obj in worst_objects:
+                obj.select_set(True)
+            bpy.context.view_layer.objects.active = worst_objects[0]
+
+    return report_rows
+
+
+def mesh_budget_counts(mesh):
+    """ Return triangles & vertices of a mesh, read in bulk:
+        a n-gon gives n - 2 triangles, so loops - 2 * polygons in total
+    """
+    return len(mesh.loops) - 2 * len(mesh.polygons), len(mesh.vertices)
+
+
+def report_budget():
+    """ Report triangles, vertices & material slots per object,
+        rolled up per collection, children collections included,
+        and for the whole scope, flagged when over budget
+    """
+    # var init
+    user_active = bpy.context.view_layer.objects.active
+    is_user_in_edit_mode = False
+    scene = bpy.context.scene
+    update_selection = scene.retico_mesh_reports_update_selection
+    selected_only = scene.retico_mesh_check_only_selected
+    use_evaluated = scene.retico_mesh_budget_evaluated
+    max_triangles = scene.retico_mesh_budget_triangles
+    max_vertices = scene.retico_mesh_budget_vertices
+    max_materials = scene.retico_mesh_budget_materials
+    max_total_triangles = scene.retico_mesh_budget_scene_triangles
+    objects = selection_sets.meshes_in_selection(
+    ) if selected_only else selection_sets.meshes_selectable()
+    # mesh: counts, instances are only read once
+    meshes_counts = {}
+    objects_rows = []
+    collections_rows = {}
+    total = {"name": scene.name, "type": 'SCENE', "triangles": 0,
+             "vertices": 0, "materials": 0, "over_budget": False}
+    # collection name: names of collections holding it, scene one aside
+    collections_parents = {}
+    for collection in [scene.collection] + list(scene.collection.children_recursive):
+        for child in collection.children:
+            if collection != scene.collection:
+                collections_parents.setdefault(child.name, set()).add(collection.name)
+
+    # handling active object
+    if user_active and user_active.mode == 'EDIT':
+        is_user_in_edit_mode = True
+        bpy.ops.object.mode_set(mode='OBJECT')
+    depsgraph = bpy.context.evaluated_depsgraph_get() if use_evaluated else None
+
+    # function core
+    for obj in objects:
+        mesh = obj.data
+        if depsgraph is not None and len(obj.modifiers) > 0:
+            # modifiers make evaluated mesh specific to this object
+            triangles, vertices = mesh_budget_counts(
+                obj.evaluated_get(depsgraph).data)
+        else:
+            if mesh not in meshes_counts:
+                meshes_counts[mesh] = mesh_budget_counts(mesh)
+            triangles, vertices = meshes_counts[mesh]
+        materials = len(obj.material_slots)
+        objects_rows.append({
+            "name": obj.name,
+            "type": 'OBJECT',
+            "triangles": triangles,
+            "vertices": vertices,
+            "materials": materials,
+            "over_budget": (
+                triangles > max_triangles
+                or vertices > max_vertices
+                or materials > max_materials
+            )
+        })
+        # each object counts once in a collection, even if in several children
+        collections_names = {collection.name for collection in obj.users_collection
+                             if collection != scene.collection}
+        to_walk = list(collections_names)
+        while len(to_walk) > 0:
+            for parent_name in collections_parents.get(to_walk.pop(), ()):
+                if parent_name not in collections_names:
+                    collections_names.add(parent_name)
+                    to_walk.append(parent_name)
+        for counts in [total] + [
+                collections_rows.setdefault(collection_name, {
+                    "name": collection_name, "type": 'COLLECTION', "triangles": 0,
+                    "vertices": 0, "materials": 0, "over_budget": False})
+                for collection_name in sorted(collections_names)]:
+            counts["triangles"] += triangles
+            counts["vertices"] += vertices
+            counts["materials"] += materials
+
+    collections_rows = list(collections_rows.values())
+    for counts in collections_rows + [total]:
+        counts["over_budget"] = counts["triangles"] > max_total_triangles
+
+    objects_rows.sort(key=lambda row: row["triangles"], reverse=True)
+    collections_rows.sort(key=lambda row: row["triangles"], reverse=True)
+
+    # handling active object
+    if is_user_in_edit_mode:
+        bpy.ops.object.mode_set(mode='EDIT')
+
+    if update_selection:
+        objects_over_budget = [bpy.data.objects[row["name"]]
+                               for row in objects_rows if row["over_budget"]]
+        if len(objects_over_budget) > 0:
+            for obj in bpy.context.selected_objects:
+                obj.select_set(False)
+            for obj in objects_over_budget:
+                obj.select_set(True)
+            bpy.context.view_layer.objects.active = objects_over_budget[0]
+
+    return objects_rows, collections_rows, total
+
+
+def report_validation(validation):
+    """ Format a scene validation as report lines
+    """
+    # var init
+    report_message = []
+
+    # function core
+    for check, label in selection_sets.scene_validation_checks.items():
+        if validation["counts"][check] == 0:
+            continue
+        if check == "empty_slots":
+            names = ["{} (id {})".format(obj.name, index + 1)
+                     for obj, index in validation["checks"][check]]
+        else:
+            names = [obj.name for obj in validation["checks"][check]]
+        report_message.append("{} ({}): {}".format(
+            label, validation["counts"][check], ", ".join(names)))
+
+    report_message.append("{} objects checked in {:.1f} ms".format(
+        validation["objects_count"], validation["duration"] * 1000))
+
+    return report_message
 
 
 """
@@ -248,15 +1717,54 @@ class RETICO_PT_mesh_misc(RETICO_PT_mesh_3dviewPanel):
             )
         ):
             # transfer object name to mesh name
-            row = layout.row()
+            row = layout.row(align=True)
+            row.operator("retico.mesh_transfer_names",
+                         text="Transfer names", icon='SORTALPHA').dry_run = False
             row.operator("retico.mesh_transfer_names",
-                         text="Transfer names", icon='SORTALPHA')
+                         text="", icon='HIDE_OFF').dry_run = True
 
             # copy names to clipboard
             row = layout.row()
             row.operator("retico.mesh_name_to_clipboard",
                          text="Copy names to clipboard", icon='COPYDOWN')
 
+            # duplicates
+            row = layout.row(align=True)
+            row.label(text="Duplicates:")
+            row.operator("retico.mesh_duplicates",
+                         text="Find", icon='VIEWZOOM').relink = False
+            row.operator("retico.mesh_duplicates",
+                         text="Instance", icon='LINKED').relink = True
+            row = layout.row()
+            row.prop(context.scene, "retico_mesh_duplicates_transform_invariant",
+                     text="ignore transforms")
+
+            # static batching
+            row = layout.row(align=True)
+            row.label(text="Batching:")
+            row.operator("retico.mesh_static_batching",
+                         text="Join by materials", icon='OBJECT_DATA')
+            row = layout.row(align=True)
+            row.prop(context.scene, "retico_mesh_batch_vertex_budget",
+                     text="Max verts")
+            row.prop(context.scene, "retico_mesh_batch_grid_size",
+                     text="Grid")
+
+            # vertex cache
+            row = layout.row(align=True)
+            row.label(text="Faces order:")
+            row.operator("retico.mesh_optimize_vertex_cache",
+                         text="Vertex cache", icon='SORTSIZE')
+            row = layout.row(align=True)
+            row.prop(context.scene, "retico_mesh_vertex_cache_size",
+                     text="Cache")
+            row.prop(context.scene, "retico_mesh_overdraw_sort",
+                     text="", icon='XRAY')
+            sub = row.row(align=True)
+            sub.active = context.scene.retico_mesh_overdraw_sort
+            sub.prop(context.scene, "retico_mesh_overdraw_threshold",
+                     text="Overdraw")
+
         else:
             row = layout.row(align=True)
             row.label(text="No object in selection.")
@@ -284,9 +1792,11 @@ class RETICO_PT_mesh_normals(RETICO_PT_mesh_3dviewPanel):
             row = layout.row(align=True)
             row.label(text="Custom Normals:")
             row.operator("retico.mesh_set_custom_normals",
-                         text="Add").apply = True
+                         text="Add").mode = 'ADD'
+            row.operator("retico.mesh_set_custom_normals",
+                         text="Weighted").mode = 'WEIGHTED'
             row.operator("retico.mesh_set_custom_normals",
-                         text="Del").apply = False
+                         text="Del").mode = 'CLEAR'
         else:
             row = layout.row(align=True)
             row.label(text="No object in selection.")
@@ -315,10 +1825,47 @@ class RETICO_PT_mesh_report(RETICO_PT_mesh_3dviewPanel):
                      text="update selection")
             row.prop(context.scene, "retico_mesh_reports_to_clipboard",
                      text="to clipboard")
+            row = box.row()
+            row.prop(context.scene, "retico_mesh_reports_format", expand=True)
             grid = layout.grid_flow(
                 row_major=True, columns=2, even_columns=True, even_rows=True, align=True)
             row = grid.row(align=True)
             row.operator("retico.mesh_report_instances", text="Instances")
+            row.operator("retico.mesh_report_instances_export",
+                         text="", icon='EXPORT')
+            row = grid.row(align=True)
+            row.operator("retico.mesh_validate_scene",
+                         text="Validate scene", icon='CHECKMARK')
+            row = grid.row(align=True)
+            row.operator("retico.mesh_report_vertex_split", text="glTF verts")
+            row.prop(context.scene, "retico_mesh_split_ratio_threshold",
+                     text="")
+            row = grid.row(align=True)
+            row.operator("retico.mesh_report_budget", text="Budget")
+            row.prop(context.scene, "retico_mesh_budget_evaluated",
+                     text="", icon='MODIFIER')
+
+            # budget thresholds
+            box = layout.box()
+            grid = box.grid_flow(
+                row_major=True, columns=2, even_columns=True, align=True)
+            grid.prop(context.scene, "retico_mesh_budget_triangles", text="Tris")
+            grid.prop(context.scene, "retico_mesh_budget_vertices", text="Verts")
+            grid.prop(context.scene, "retico_mesh_budget_materials", text="Mats")
+            grid.prop(context.scene, "retico_mesh_budget_scene_triangles", text="Total")
+
+            # last validation
+            validation = selection_sets.scene_validation_cache["result"]
+            if validation is not None:
+                box = layout.box()
+                grid = box.grid_flow(
+                    row_major=True, columns=2, even_columns=True, align=True)
+                for check, label in selection_sets.scene_validation_checks.items():
+                    grid.label(text="{}: {}".format(
+                        label, validation["counts"][check]))
+                row = box.row()
+                row.label(text="{} objects, {:.1f} ms".format(
+                    validation["objects_count"], validation["duration"] * 1000), icon='TIME')
         else:
             row = layout.row(align=True)
             row.label(text="No object in selection.")
@@ -351,15 +1898,111 @@ class RETICO_OT_mesh_transfer_names(bpy.types.Operator):
     bl_idname = "retico.mesh_transfer_names"
     bl_label = "Copy Object name to its Data name"
     bl_description = "Copy Object name to its Data name"
+    dry_run: BoolProperty(
+        name="Dry run",
+        description="Only report planned renames",
+        default=False
+    )
 
     @classmethod
     def poll(cls, context):
         return len(context.view_layer.objects) > 0
 
     def execute(self, context):
-        transfer_names()
-        self.report({'INFO'}, "---[ Object name to Mesh ]---")
+        message, conflicts = transfer_names(self.dry_run)
+        if self.dry_run:
+            self.report({'INFO'}, "---[ Planned mesh renames ]---")
+            for report in message:
+                self.report({'INFO'}, report)
+            if len(message) + len(conflicts) == 0:
+                self.report({'INFO'}, "Nothing to rename.")
+            if context.scene.retico_mesh_reports_to_clipboard:
+                context.window_manager.clipboard = "\r\n".join(message + conflicts)
+        else:
+            self.report({'INFO'}, "---[ Object name to Mesh ]---")
+        for report in conflicts:
+            self.report({'WARNING'}, report)
+
+        return {'FINISHED'}
+
 
+class RETICO_OT_mesh_duplicates(bpy.types.Operator):
+    bl_idname = "retico.mesh_duplicates"
+    bl_label = "Find or instance duplicate meshes"
+    bl_description = "Find identical meshes, and make their objects share a single mesh if asked"
+    relink: BoolProperty()
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        groups, relinked_meshes = instance_duplicate_meshes(
+            context.scene.retico_mesh_duplicates_transform_invariant, self.relink)
+        self.report({'INFO'}, "---[ Duplicate meshes ]---")
+        if len(groups) == 0:
+            self.report({'INFO'}, "No duplicate meshes found.")
+            return {'FINISHED'}
+        message = []
+        for group in groups:
+            message.append("{} duplicated by: {}".format(
+                group[0].name, ", ".join(mesh.name for mesh in group[1:])) if not self.relink
+                else "{} now used instead of {} duplicates".format(group[0].name, len(group) - 1))
+        for report in message:
+            self.report({'INFO'}, report)
+        if self.relink:
+            self.report({'INFO'}, "{} meshes replaced by instances".format(
+                relinked_meshes))
+        if context.scene.retico_mesh_reports_to_clipboard:
+            context.window_manager.clipboard = "\r\n".join(message)
+        return {'FINISHED'}
+
+
+class RETICO_OT_mesh_static_batching(bpy.types.Operator):
+    bl_idname = "retico.mesh_static_batching"
+    bl_label = "Join objects sharing the same materials"
+    bl_description = "Join objects sharing the same materials into as few meshes as vertex budget allows, per grid cell if set"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        batched_objects, skipped = static_batching()
+        self.report({'INFO'}, "---[ Static batching ]---")
+        if len(batched_objects) == 0:
+            self.report({'INFO'}, "No objects to join.")
+        for batch_object, objects_count in batched_objects:
+            self.report({'INFO'}, "{}: {} objects joined".format(
+                batch_object.name, objects_count))
+        if skipped > 0:
+            self.report({'INFO'}, "{} objects left alone (alone in their batch, too big, or with data joining would lose: modifiers, shape keys, hierarchy, constraints, animation, vertex groups, attributes, zero scale)".format(
+                skipped))
+        return {'FINISHED'}
+
+
+class RETICO_OT_mesh_optimize_vertex_cache(bpy.types.Operator):
+    bl_idname = "retico.mesh_optimize_vertex_cache"
+    bl_label = "Reorder faces for the vertex cache"
+    bl_description = "Reorder faces so GPU vertex cache is used at best, then outer facing clusters first if overdraw is enabled"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        report_rows, skipped = optimize_vertex_cache()
+        self.report({'INFO'}, "---[ Vertex cache ]---")
+        if len(report_rows) == 0:
+            self.report({'INFO'}, "No mesh to reorder.")
+        for row in report_rows:
+            self.report({'INFO'}, "{}: ACMR {} -> {}, ATVR {} -> {}{}".format(
+                row["mesh"], row["acmr_before"], row["acmr_after"],
+                row["atvr_before"], row["atvr_after"],
+                "" if row["reordered"] else " (already optimized)"))
+        if skipped > 0:
+            self.report(
+                {'INFO'}, "{} redundant passes skipped (shared meshes)".format(skipped))
         return {'FINISHED'}
 
 
@@ -373,8 +2016,11 @@ class RETICO_OT_mesh_set_autosmooth(bpy.types.Operator):
         return len(context.view_layer.objects) > 0
 
     def execute(self, context):
-        set_autosmooth(context.scene.retico_mesh_autosmooth_angle)
+        skipped = set_autosmooth(context.scene.retico_mesh_autosmooth_angle)
         self.report({'INFO'}, "---[ Autosmooth ]---")
+        if skipped > 0:
+            self.report(
+                {'INFO'}, "{} redundant passes skipped (shared meshes)".format(skipped))
         return {'FINISHED'}
 
 
@@ -382,15 +2028,26 @@ class RETICO_OT_mesh_set_custom_normals(bpy.types.Operator):
     bl_idname = "retico.mesh_set_custom_normals"
     bl_label = "Add or delete custom split normals"
     bl_description = "Add or delete custom split normals"
-    apply: BoolProperty()
+    mode: EnumProperty(
+        items=[
+            ('ADD', "Add", "Store current normals as custom normals"),
+            ('WEIGHTED', "Weighted",
+             "Custom normals weighted by face area and corner angle"),
+            ('CLEAR', "Delete", "Give back auto normals"),
+        ],
+        default='ADD'
+    )
 
     @classmethod
     def poll(cls, context):
         return len(context.view_layer.objects) > 0
 
     def execute(self, context):
-        set_custom_normals(self.apply)
+        skipped = set_custom_normals(self.mode)
         self.report({'INFO'}, "---[ Custom Normals ]---")
+        if skipped > 0:
+            self.report(
+                {'INFO'}, "{} redundant passes skipped (shared meshes)".format(skipped))
         return {'FINISHED'}
 
 
@@ -404,18 +2061,131 @@ class RETICO_OT_mesh_report_instances(bpy.types.Operator):
         return len(context.view_layer.objects) > 0
 
     def execute(self, context):
-        message = report_instances()
+        report_rows = report_instances()
         self.report({'INFO'}, "---[ Objects using instances ]---")
-        if not message:
+        if not report_rows:
             self.report({'INFO'}, "No instances detected.")
         else:
-            to_clipboard = context.scene.retico_mesh_reports_to_clipboard
-            message_to_clipboard = ""
-            for report in message:
-                message_to_clipboard += ("\r\n" + report)
-                self.report({'INFO'}, report)
-            if to_clipboard:
-                context.window_manager.clipboard = message_to_clipboard
+            for row in report_rows:
+                self.report({'INFO'}, "{} ({} users, {} verts, {} KB saved) used by: {}".format(
+                    row["mesh"], row["users"], row["vertices"], row["memory_saved_kb"], ", ".join(row["objects"])))
+            if context.scene.retico_mesh_reports_to_clipboard:
+                context.window_manager.clipboard = selection_sets.rows_to_text(
+                    report_rows, context.scene.retico_mesh_reports_format)
+        return {'FINISHED'}
+
+
+class RETICO_OT_mesh_report_instances_export(bpy.types.Operator):
+    bl_idname = "retico.mesh_report_instances_export"
+    bl_label = "Export instances report"
+    bl_description = "Export instances report to a .csv or .json file"
+    filepath: StringProperty(subtype='FILE_PATH')
+    filter_glob: StringProperty(default="*.csv;*.json", options={'HIDDEN'})
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "instances.json" if context.scene.retico_mesh_reports_format == 'JSON' else "instances.csv"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        report_rows = report_instances()
+        if not report_rows:
+            self.report({'INFO'}, "No instances detected.")
+            return {'CANCELLED'}
+        report_format = 'JSON' if self.filepath.lower().endswith(".json") else 'CSV'
+        with open(bpy.path.abspath(self.filepath), "w", encoding="utf-8", newline="") as report_file:
+            report_file.write(selection_sets.rows_to_text(
+                report_rows, report_format))
+        self.report({'INFO'}, "Instances report saved: {}".format(
+            self.filepath))
+        return {'FINISHED'}
+
+
+class RETICO_OT_mesh_report_vertex_split(bpy.types.Operator):
+    bl_idname = "retico.mesh_report_vertex_split"
+    bl_label = "Report vertices split by glTF export"
+    bl_description = "Count vertices emitted by glTF export, split where normals or UVs differ, worst meshes first"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        report_rows = report_vertex_split()
+        threshold = context.scene.retico_mesh_split_ratio_threshold
+        self.report({'INFO'}, "---[ glTF vertices split ]---")
+        if len(report_rows) == 0:
+            self.report({'INFO'}, "No mesh to check.")
+            return {'FINISHED'}
+        for row in report_rows:
+            self.report({'WARNING'} if row["split_ratio"] >= threshold else {'INFO'},
+                        "{}: {} verts, {} exported (x{}) used by: {}".format(
+                row["mesh"], row["vertices"], row["exported_vertices"], row["split_ratio"],
+                ", ".join(row["objects"])))
+        self.report({'INFO'}, "Total: {} verts, {} exported".format(
+            sum(row["vertices"] for row in report_rows),
+            sum(row["exported_vertices"] for row in report_rows)))
+        if context.scene.retico_mesh_reports_to_clipboard:
+            context.window_manager.clipboard = selection_sets.rows_to_text(
+                report_rows, context.scene.retico_mesh_reports_format)
+        return {'FINISHED'}
+
+
+class RETICO_OT_mesh_report_budget(bpy.types.Operator):
+    bl_idname = "retico.mesh_report_budget"
+    bl_label = "Report triangles, vertices & materials budget"
+    bl_description = "Count triangles, vertices & material slots per object, per collection and in total, flag what is over budget"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        objects_rows, collections_rows, total = report_budget()
+        self.report({'INFO'}, "---[ Budget ]---")
+        if len(objects_rows) == 0:
+            self.report({'INFO'}, "No mesh to check.")
+            return {'FINISHED'}
+        for row in objects_rows:
+            if row["over_budget"]:
+                self.report({'WARNING'}, "{}: {} tris, {} verts, {} materials".format(
+                    row["name"], row["triangles"], row["vertices"], row["materials"]))
+        for row in collections_rows + [total]:
+            self.report({'WARNING'} if row["over_budget"] else {'INFO'},
+                        "{} ({}): {} tris, {} verts, {} materials".format(
+                row["name"], row["type"].lower(), row["triangles"], row["vertices"], row["materials"]))
+        self.report({'INFO'}, "{} objects over budget".format(
+            sum(1 for row in objects_rows if row["over_budget"])))
+        if context.scene.retico_mesh_reports_to_clipboard:
+            context.window_manager.clipboard = selection_sets.rows_to_text(
+                objects_rows + collections_rows + [total], context.scene.retico_mesh_reports_format)
+        return {'FINISHED'}
+
+
+class RETICO_OT_mesh_validate_scene(bpy.types.Operator):
+    bl_idname = "retico.mesh_validate_scene"
+    bl_label = "Validate scene"
+    bl_description = "Run UVs, materials and instances checks in a single pass"
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.view_layer.objects) > 0
+
+    def execute(self, context):
+        validation = selection_sets.validate_scene(
+            context.scene.retico_mesh_check_only_selected)
+        message = report_validation(validation)
+        self.report({'INFO'}, "---[ Scene validation ]---")
+        for report in message[:-1]:
+            self.report({'WARNING'}, report)
+        self.report({'INFO'}, message[-1])
+        if context.scene.retico_mesh_reports_to_clipboard:
+            context.window_manager.clipboard = "\r\n".join(message)
         return {'FINISHED'}
 
 
@@ -432,10 +2202,17 @@ classes = (
     RETICO_PT_mesh_normals,
     RETICO_PT_mesh_report,
     RETICO_OT_mesh_transfer_names,
+    RETICO_OT_mesh_duplicates,
+    RETICO_OT_mesh_static_batching,
+    RETICO_OT_mesh_optimize_vertex_cache,
     RETICO_OT_mesh_set_autosmooth,
     RETICO_OT_mesh_set_custom_normals,
     RETICO_OT_mesh_name_to_clipboard,
     RETICO_OT_mesh_report_instances,
+    RETICO_OT_mesh_report_instances_export,
+    RETICO_OT_mesh_validate_scene,
+    RETICO_OT_mesh_report_vertex_split,
+    RETICO_OT_mesh_report_budget,
 )
 
 
@@ -458,6 +2235,88 @@ def register():
         description="Reports sent to clipboard",
         default=False
     )
+    Scene.retico_mesh_reports_format = EnumProperty(
+        name="Reports format",
+        description="Format of reports sent to clipboard",
+        items=[
+            ('TEXT', "Text", "Plain text"),
+            ('CSV', "CSV", "Comma separated values"),
+            ('JSON', "JSON", "JSON list of rows"),
+        ],
+        default='TEXT'
+    )
+    Scene.retico_mesh_duplicates_transform_invariant = BoolProperty(
+        name="Duplicates ignore transforms",
+        description="Also detect duplicate meshes moved or rotated in their own space",
+        default=False
+    )
+    Scene.retico_mesh_batch_vertex_budget = IntProperty(
+        name="Batch vertex budget",
+        description="Maximum vertices of a joined mesh, 65535 fits 16 bits indices",
+        default=65535,
+        min=3
+    )
+    Scene.retico_mesh_batch_grid_size = FloatProperty(
+        name="Batch grid size",
+        description="Only join objects in the same grid cell, keeping culling efficient, 0 for no grid",
+        default=0.0,
+        min=0.0,
+        subtype='DISTANCE'
+    )
+    Scene.retico_mesh_vertex_cache_size = IntProperty(
+        name="Vertex cache size",
+        description="Post-transform vertex cache entries faces order is optimized for",
+        default=16,
+        min=3,
+        max=64
+    )
+    Scene.retico_mesh_overdraw_sort = BoolProperty(
+        name="Overdraw sort",
+        description="Also draw outer facing clusters of faces first, trading a few cache misses",
+        default=False
+    )
+    Scene.retico_mesh_overdraw_threshold = FloatProperty(
+        name="Overdraw threshold",
+        description="ACMR increase allowed by splitting faces into clusters",
+        default=1.05,
+        min=1.0,
+        max=3.0
+    )
+    Scene.retico_mesh_split_ratio_threshold = FloatProperty(
+        name="Split ratio threshold",
+        description="Exported vertices / vertices ratio above which a mesh is flagged, and selected if reports update selection",
+        default=1.5,
+        min=1.0
+    )
+    Scene.retico_mesh_budget_triangles = IntProperty(
+        name="Triangles budget",
+        description="Maximum triangles per object",
+        default=50000,
+        min=0
+    )
+    Scene.retico_mesh_budget_vertices = IntProperty(
+        name="Vertices budget",
+        description="Maximum vertices per object",
+        default=65535,
+        min=0
+    )
+    Scene.retico_mesh_budget_materials = IntProperty(
+        name="Materials budget",
+        description="Maximum material slots per object",
+        default=4,
+        min=0
+    )
+    Scene.retico_mesh_budget_scene_triangles = IntProperty(
+        name="Total triangles budget",
+        description="Maximum triangles per collection and in total",
+        default=1000000,
+        min=0
+    )
+    Scene.retico_mesh_budget_evaluated = BoolProperty(
+        name="Budget with modifiers",
+        description="Count evaluated meshes, modifiers included",
+        default=False
+    )
     Scene.retico_mesh_autosmooth_angle = FloatProperty(
         name="autosmooth angle",
         description="autosmooth angle",
@@ -473,8 +2332,21 @@ def unregister():
         unregister_class(cls)
 
     del Scene.retico_mesh_autosmooth_angle
+    del Scene.retico_mesh_batch_vertex_budget
+    del Scene.retico_mesh_batch_grid_size
+    del Scene.retico_mesh_vertex_cache_size
+    del Scene.retico_mesh_overdraw_sort
+    del Scene.retico_mesh_overdraw_threshold
+    del Scene.retico_mesh_split_ratio_threshold
+    del Scene.retico_mesh_budget_triangles
+    del Scene.retico_mesh_budget_vertices
+    del Scene.retico_mesh_budget_materials
+    del Scene.retico_mesh_budget_scene_triangles
+    del Scene.retico_mesh_budget_evaluated
+    del Scene.retico_mesh_duplicates_transform_invariant
     del Scene.retico_mesh_reports_update_selection
     del Scene.retico_mesh_reports_to_clipboard
+    del Scene.retico_mesh_reports_format
     del Scene.retico_mesh_check_only_selected
 
 
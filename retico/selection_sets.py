@@ -1,4 +1,61 @@
 import bpy
+import csv
+import io
+import json
+import time
+from bpy.app.handlers import persistent
+
+"""
+**********************************************************************
+*                            local variables                         *
+**********************************************************************
+"""
+
+# object session_uid: classification record of mesh objects
+scene_index = {}
+
+# bucket name: session_uid of objects in it
+scene_index_buckets = {
+    "no_uv": set(),
+    "no_uv2": set(),
+    "with_materials": set(),
+    "without_materials": set(),
+    "empty_slots": set(),
+    "several_materials": set(),
+}
+
+# mesh session_uid: session_uid of objects using it
+scene_index_meshes = {}
+
+scene_index_state = {
+    "is_built": False,
+    # incremented on each depsgraph update
+    "generation": 0,
+}
+
+# check name: label used in reports
+scene_validation_checks = {
+    "no_uv": "no UV1",
+    "no_uv2": "no UV2",
+    "no_materials": "no Mat",
+    "empty_slots": "empty Mat slots",
+    "several_materials": "1+ Mat",
+    "shared_materials": "Shared",
+    "instances": "Instances",
+}
+
+# last validation run, reused while nothing changed
+scene_validation_cache = {
+    "generation": -1,
+    "selected_only": None,
+    "result": None,
+}
+
+"""
+**********************************************************************
+*                            def section                             *
+**********************************************************************
+"""
 
 
 def meshes_in_selection():
@@ -13,59 +70,465 @@ def meshes_selectable():
     return [o for o in bpy.context.selectable_objects if o.type == 'MESH']
 
 
-def meshes_without_uv(selected_only=True):
-    """ Return meshs without UV1 or UV2
+def meshes_data(selected_only=True):
+    """ Return unique meshes data with an owner object for each,
+        and how many objects were skipped because sharing a mesh
     """
     # var init
     objects_selected = meshes_in_selection() if selected_only else meshes_selectable()
-    objects_without_uv = []
-    objects_without_uv2 = []
+    meshes_owners = {}
 
     # function core
     for obj in objects_selected:
-        mesh = obj.data
-        if len(mesh.uv_layers) > 2:
-            # have more than 2 uv
+        if obj.data not in meshes_owners:
+            meshes_owners[obj.data] = obj
+
+    skipped = len(objects_selected) - len(meshes_owners)
+
+    return list(meshes_owners.items()), skipped
+
+
+def scene_index_remove(obj_uid):
+    """ Remove an object from the scene index
+    """
+    record = scene_index.pop(obj_uid, None)
+    if record is None:
+        return {'FINISHED'}
+
+    for bucket in scene_index_buckets.values():
+        bucket.discard(obj_uid)
+
+    mesh_users = scene_index_meshes.get(record["mesh_uid"])
+    if mesh_users is not None:
+        mesh_users.discard(obj_uid)
+        if len(mesh_users) == 0:
+            del scene_index_meshes[record["mesh_uid"]]
+
+    return {'FINISHED'}
+
+
+def scene_index_add(obj):
+    """ Classify a mesh object into the scene index buckets
+    """
+    # var init
+    obj_uid = obj.session_uid
+    mesh = obj.data
+    materials = mesh.materials
+    uv_count = len(mesh.uv_layers)
+    record = {
+        "object": obj,
+        "mesh": mesh,
+        "mesh_uid": mesh.session_uid,
+        "uv_layers": uv_count,
+        "materials": tuple(materials),
+        "empty_slots": tuple(index for index in range(len(materials)) if materials[index] is None),
+    }
+
+    # function core
+    scene_index_remove(obj_uid)
+    scene_index[obj_uid] = record
+    scene_index_meshes.setdefault(record["mesh_uid"], set()).add(obj_uid)
+
+    if uv_count == 0:
+        scene_index_buckets["no_uv"].add(obj_uid)
+    if uv_count < 2:
+        scene_index_buckets["no_uv2"].add(obj_uid)
+    if len(materials) == 0:
+        scene_index_buckets["without_materials"].add(obj_uid)
+    else:
+        scene_index_buckets["with_materials"].add(obj_uid)
+    if len(materials) > 1:
+        scene_index_buckets["several_materials"].add(obj_uid)
+    if len(record["empty_slots"]) > 0:
+        scene_index_buckets["empty_slots"].add(obj_uid)
+
+    return record
+
+
+def scene_index_rebuild():
+    """ Full scene index build, only needed once per file or undo
+    """
+    scene_index.clear()
+    scene_index_meshes.clear()
+    for bucket in scene_index_buckets.values():
+        bucket.clear()
+
+    for obj in bpy.data.objects:
+        if obj.type == 'MESH':
+            scene_index_add(obj)
+
+    scene_index_state["is_built"] = True
+
+    return {'FINISHED'}
+
+
+def scene_index_invalidate():
+    """ Ask for a full rebuild on next query
+    """
+    scene_index_state["is_built"] = False
+    scene_index_state["generation"] += 1
+
+    return {'FINISHED'}
+
+
+def scene_index_object(obj_uid):
+    """ Return indexed object if still valid, unindex it if not
+    """
+    try:
+        obj = scene_index[obj_uid]["object"]
+        if obj.type == 'MESH':
+            return obj
+    except ReferenceError:
+        # object has been deleted since indexation
+        pass
+    scene_index_remove(obj_uid)
+
+    return None
+
+
+def is_in_scope(obj, selected_only=True):
+    """ Tell if an object belongs to selection, or to selectable objects
+    """
+    try:
+        if selected_only:
+            return obj.select_get()
+        return obj.visible_get() and not obj.hide_select
+    except RuntimeError:
+        # object not in current view layer
+        return False
+
+
+def scene_index_query(bucket, selected_only=True):
+    """ Return mesh objects of an index bucket, in selection or not
+    """
+    # var init
+    objects_in_bucket = []
+
+    if not scene_index_state["is_built"]:
+        scene_index_rebuild()
+
+    # function core
+    for obj_uid in list(scene_index_buckets[bucket]):
+        obj = scene_index_object(obj_uid)
+        if obj is not None and is_in_scope(obj, selected_only):
+            objects_in_bucket.append(obj)
+
+    return sorted(objects_in_bucket, key=lambda obj: obj.name.lower())
+
+
+def scene_index_record(obj):
+    """ Return index record of an object, indexing it if needed
+    """
+    if not scene_index_state["is_built"]:
+        scene_index_rebuild()
+
+    record = scene_index.get(obj.session_uid)
+    if record is None:
+        record = scene_index_add(obj)
+
+    return record
+
+
+@persistent
+def scene_index_depsgraph_update(scene, depsgraph):
+    """ Keep scene index up to date using only updated IDs
+    """
+    scene_index_state["generation"] += 1
+
+    if not scene_index_state["is_built"]:
+        # will be fully built on next query anyway
+        return
+
+    for update in depsgraph.updates:
+        if (
+            update.is_updated_transform
+            and not update.is_updated_geometry
+            and not update.is_updated_shading
+        ):
+            # moving objects doesn't change classification
             continue
-        if len(mesh.uv_layers) == 0:
-            # no uv at all
-            objects_without_uv.append(obj)
-            objects_without_uv2.append(obj)
+        updated_id = update.id.original
+        if isinstance(updated_id, bpy.types.Object):
+            if updated_id.type == 'MESH':
+                scene_index_add(updated_id)
+        elif isinstance(updated_id, bpy.types.Mesh):
+            for obj_uid in list(scene_index_meshes.get(updated_id.session_uid, ())):
+                obj = scene_index_object(obj_uid)
+                if obj is not None:
+                    scene_index_add(obj)
+
+
+@persistent
+def scene_index_reset(*args):
+    """ File loaded or undo: index will be rebuilt on next query
+    """
+    scene_index_invalidate()
+
+
+def validate_scene(selected_only=True):
+    """ Run all checks in a single pass over indexed mesh objects in scope,
+        return per-check objects lists, counts and run duration
+    """
+    # var init
+    time_start = time.perf_counter()
+    checks = {check: [] for check in scene_validation_checks}
+    instances = {}
+    objects_in_scope = []
+
+    if not scene_index_state["is_built"]:
+        scene_index_rebuild()
+
+    # function core
+    for obj_uid in list(scene_index):
+        obj = scene_index_object(obj_uid)
+        if obj is not None and is_in_scope(obj, selected_only):
+            objects_in_scope.append((obj.name.lower(), obj_uid, obj))
+    objects_in_scope.sort(key=lambda item: item[0])
+
+    for name, obj_uid, obj in objects_in_scope:
+        record = scene_index[obj_uid]
+        if obj_uid in scene_index_buckets["no_uv"]:
+            checks["no_uv"].append(obj)
+        if obj_uid in scene_index_buckets["no_uv2"]:
+            checks["no_uv2"].append(obj)
+        if obj_uid in scene_index_buckets["without_materials"]:
+            checks["no_materials"].append(obj)
+        for index in record["empty_slots"]:
+            # [object, slot index]
+            checks["empty_slots"].append([obj, index])
+        if obj_uid in scene_index_buckets["several_materials"]:
+            checks["several_materials"].append(obj)
+        # users of other materials change without this object being updated
+        if any(mat is not None and mat.users > 1 for mat in record["materials"]):
+            checks["shared_materials"].append(obj)
+        if len(scene_index_meshes.get(record["mesh_uid"], ())) > 1:
+            checks["instances"].append(obj)
+            instances.setdefault(obj.data, []).append(obj)
+
+    validation = {
+        "checks": checks,
+        "counts": {check: len(checks[check]) for check in checks},
+        "instances": instances,
+        "objects_count": len(objects_in_scope),
+        "selected_only": selected_only,
+        "duration": time.perf_counter() - time_start,
+    }
+
+    scene_validation_cache["generation"] = scene_index_state["generation"]
+    scene_validation_cache["selected_only"] = selected_only
+    scene_validation_cache["result"] = validation
+
+    return validation
+
+
+def scene_validation(selected_only=True):
+    """ Return last validation if nothing changed since, run a new one if not
+    """
+    if (
+        scene_validation_cache["result"] is None
+        or scene_validation_cache["generation"] != scene_index_state["generation"]
+        or scene_validation_cache["selected_only"] != selected_only
+    ):
+        return validate_scene(selected_only)
+
+    return scene_validation_cache["result"]
+
+
+def plan_renames(collection, targets):
+    """ Plan renames of collection items (datas, uv layers...) avoiding naming collisions:
+        items already well named are skipped, only naming cycles use temporary names.
+        targets: [(item, new name)], first target of an item wins.
+        Return steps [(item, original name, new name, is temporary)] and conflicts [(item, new name)]
+    """
+    # var init
+    names = {item.name for item in collection}
+    # current name: (item, target)
+    pending = {}
+    # target: current name of the item wanting it
+    wanted_by = {}
+    conflicts = []
+    steps = []
+    # items whose first target has been seen, well named ones included
+    handled = set()
+
+    # function core
+    for item, target in targets:
+        if item in handled:
             continue
-        if len(mesh.uv_layers) == 1:
-            # only one chan
-            objects_without_uv2.append(obj)
+        handled.add(item)
+        if item.name == target:
             continue
+        if target in wanted_by:
+            # two items want the same name
+            conflicts.append((item, target))
+            continue
+        pending[item.name] = (item, target)
+        wanted_by[target] = item.name
 
-    return objects_without_uv, objects_without_uv2
+    # names held by items not renamed can't be freed, neither the ones waiting for them
+    blocked = [name for name, (item, target) in pending.items()
+               if target in names and target not in pending]
+    while len(blocked) > 0:
+        name = blocked.pop()
+        if name not in pending:
+            continue
+        item, target = pending.pop(name)
+        del wanted_by[target]
+        conflicts.append((item, target))
+        if name in wanted_by:
+            blocked.append(wanted_by[name])
 
+    # renaming items whose target is free, which frees their own name
+    ready = [name for name, (item, target) in pending.items()
+             if target not in pending]
+    temporary_index = 0
+    while len(pending) > 0:
+        if len(ready) == 0:
+            # naming cycle: one item goes through a temporary name to break it
+            name, (item, target) = next(iter(pending.items()))
+            temporary_name = "retico_tmp_{}".format(temporary_index)
+            while temporary_name in names:
+                temporary_index += 1
+                temporary_name = "retico_tmp_{}".format(temporary_index)
+            names.add(temporary_name)
+            steps.append((item, name, temporary_name, True))
+            del pending[name]
+            pending[temporary_name] = (item, target)
+            wanted_by[target] = temporary_name
+            ready.append(wanted_by[name])
+            continue
+        name = ready.pop()
+        item, target = pending.pop(name)
+        # nothing is renamed while planning, item.name is still the original one
+        steps.append((item, item.name, target, False))
+        if name in wanted_by and wanted_by[name] in pending:
+            ready.append(wanted_by[name])
 
-def meshes_with_materials(selected_only=True):
-    """ Return mesh objects with material, in selection or not
+    return steps, conflicts
+
+
+def apply_renames(steps):
+    """ Run steps planned by plan_renames
+    """
+    for item, original_name, new_name, is_temporary in steps:
+        item.name = new_name
+
+    return {'FINISHED'}
+
+
+def renames_report(steps, conflicts):
+    """ Return planned renames and conflicts as two lists of report lines,
+        conflicts have to be reported even once renames are applied
     """
     # var init
-    objects_selected = meshes_in_selection() if selected_only else meshes_selectable()
-    objects_with_mtl = []
+    renames_message = []
+    conflicts_message = []
 
     # function core
-    for obj in objects_selected:
-        if len(obj.data.materials) == 0:
-            continue
-        objects_with_mtl.append(obj)
+    for item, original_name, new_name, is_temporary in steps:
+        if not is_temporary:
+            renames_message.append("{} -> {}".format(original_name, new_name))
+    for item, target in conflicts:
+        conflicts_message.append(
+            "{} can't be renamed {}, name already used".format(item.name, target))
 
-    return objects_with_mtl
+    return renames_message, conflicts_message
+
+
+def rows_to_text(rows, report_format='TEXT'):
+    """ Convert report rows (list of dicts) to CSV, JSON, or plain text
+    """
+    # var init
+    if len(rows) == 0:
+        return ""
+
+    # function core
+    if report_format == 'JSON':
+        return json.dumps(rows, indent=2)
+
+    if report_format == 'CSV':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: ", ".join(value) if isinstance(value, (list, tuple)) else value
+                             for key, value in row.items()})
+        return buffer.getvalue()
+
+    return "\r\n".join(
+        "; ".join("{}: {}".format(key, ", ".join(value) if isinstance(value, (list, tuple)) else value)
+                  for key, value in row.items())
+        for row in rows)
+
+
+def meshes_without_uv(selected_only=True):
+    """ Return meshs without UV1 or UV2
+    """
+    objects_without_uv = scene_index_query("no_uv", selected_only)
+    objects_without_uv2 = scene_index_query("no_uv2", selected_only)
+
+    return objects_without_uv, objects_without_uv2
+
+
+def meshes_with_materials(selected_only=True):
+    """ Return mesh objects with material, in selection or not
+    """
+    return scene_index_query("with_materials", selected_only)
 
 
 def meshes_without_materials(selected_only=True):
     """ Return mesh objects without material, in selection or not
     """
+    return scene_index_query("without_materials", selected_only)
+
+
+def materials_in_scope(selected_only=True):
+    """ Return unique materials used by mesh objects, in selection or not,
+        so a shared material is only processed once
+    """
     # var init
-    objects_selected = meshes_in_selection() if selected_only else meshes_selectable()
-    objects_without_mtl = []
+    meshes_seen = set()
+    materials = {}
 
     # function core
-    for obj in objects_selected:
-        if not obj.data.materials:
-            objects_without_mtl.append(obj)
+    for obj in meshes_with_materials(selected_only):
+        if obj.data in meshes_seen:
+            continue
+        meshes_seen.add(obj.data)
+        for mat in obj.data.materials:
+            if mat is not None and mat not in materials:
+                materials[mat] = True
+
+    return list(materials)
+
+
+"""
+**********************************************************************
+* Registration                                                       *
+**********************************************************************
+"""
+
+scene_index_handlers = (
+    (bpy.app.handlers.depsgraph_update_post, scene_index_depsgraph_update),
+    (bpy.app.handlers.load_post, scene_index_reset),
+    (bpy.app.handlers.undo_post, scene_index_reset),
+    (bpy.app.handlers.redo_post, scene_index_reset),
+)
+
+
+def register():
+    for handlers, handler in scene_index_handlers:
+        if handler not in handlers:
+            handlers.append(handler)
+    scene_index_invalidate()
+
+
+def unregister():
+    for handlers, handler in scene_index_handlers:
+        if handler in handlers:
+            handlers.remove(handler)
+    scene_index_invalidate()
+
 
-    return objects_without_mtl
+if __name__ == "__main__":
+    register()
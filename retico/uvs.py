@@ -1,8 +1,9 @@
 import bpy
-import bmesh
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from . import selection_sets
 from math import sin, cos, pi
-from mathutils import Vector
 from bpy.types import Scene
 from bpy.props import (
     FloatProperty,
@@ -17,35 +18,39 @@ from bpy.props import (
 """
 
 
-def rename_uv_channels():
-    """ Rename UV chans using "UVMap", "UV2", "UV3", "UVx" pattern
+def rename_uv_channels(dry_run=False):
+    """ Rename UV chans using "UVMap", "UV2", "UV3", "UVx" pattern,
+        return planned renames and conflicts as report lines,
+        and skipped shared meshes
     """
     # var init
     selected_only = bpy.context.scene.retico_uvs_check_only_selected
-    objects_selected = selection_sets.meshes_in_selection(
-    ) if selected_only else selection_sets.meshes_selectable()
+    meshes_owners, skipped = selection_sets.meshes_data(selected_only)
+    report_message = []
+    conflicts_report = []
 
     # function core
-    for obj in objects_selected:
-        mesh = obj.data
-        # no uv
-        if len(mesh.uv_layers) < 0:
-            continue
-        # only one uv chan
-        if len(mesh.uv_layers) == 1:
-            mesh.uv_layers[0].name = "UVMap"
-            continue
-        # if many chans, to avoid naming issue we have to use a tmp name first
-        for uv_chan in range(len(mesh.uv_layers)):
-            mesh.uv_layers[uv_chan].name = "tempName"
-        # now we can use a clean naming
+    for mesh, obj in meshes_owners:
+        targets = []
         for uv_chan in range(len(mesh.uv_layers)):
             if uv_chan == 0:
-                mesh.uv_layers[0].name = "UVMap"
+                targets.append((mesh.uv_layers[0], "UVMap"))
             else:
-                mesh.uv_layers[uv_chan].name = "UV{}".format((uv_chan + 1))
-
-    return {'FINISHED'}
+                targets.append((mesh.uv_layers[uv_chan],
+                                "UV{}".format((uv_chan + 1))))
+        # only colliding channels go through a temp name
+        steps, conflicts = selection_sets.plan_renames(
+            mesh.uv_layers, targets)
+        if not dry_run:
+            selection_sets.apply_renames(steps)
+        renames_message, conflicts_message = selection_sets.renames_report(
+            steps, conflicts)
+        for report in renames_message:
+            report_message.append("{}: {}".format(mesh.name, report))
+        for report in conflicts_message:
+            conflicts_report.append("{}: {}".format(mesh.name, report))
+
+    return report_message, conflicts_report, skipped
 
 
 def activate_uv_channels(uv_chan=0):
@@ -53,12 +58,10 @@ def activate_uv_channels(uv_chan=0):
     """
     # var init
     selected_only = bpy.context.scene.retico_uvs_check_only_selected
-    objects_selected = selection_sets.meshes_in_selection(
-    ) if selected_only else selection_sets.meshes_selectable()
+    meshes_owners, skipped = selection_sets.meshes_data(selected_only)
 
     # function core
-    for obj in objects_selected:
-        mesh = obj.data
+    for mesh, obj in meshes_owners:
         if (
             len(mesh.uv_layers) == 0 or
             len(mesh.uv_layers) <= uv_chan
@@ -75,9 +78,9 @@ def activate_uv_channels(uv_chan=0):
                     mesh.uv_layers.new(name="UV{}".format(uv_chan + 1))
             """
 
-        obj.data.uv_layers[uv_chan].active = True
+        mesh.uv_layers[uv_chan].active = True
 
-    return {'FINISHED'}
+    return skipped
 
 
 def report_no_uv(channel=0):
@@ -92,13 +95,14 @@ def report_no_uv(channel=0):
     selected_only = bpy.context.scene.retico_uvs_check_only_selected
 
     # function core
+    validation = selection_sets.scene_validation(selected_only)
     if channel == 1:
         # UV2 check
-        objects_no_uv = selection_sets.meshes_without_uv(selected_only)[1]
+        objects_no_uv = validation["checks"]["no_uv2"]
         message_suffix = "no UV2 on:"
     else:
         # ask to report no UV at all
-        objects_no_uv = selection_sets.meshes_without_uv(selected_only)[0]
+        objects_no_uv = validation["checks"]["no_uv"]
 
     if len(objects_no_uv) == 0:
         if channel == 1:
@@ -136,51 +140,69 @@ def box_mapping(size=1.0):
     selected_only = bpy.context.scene.retico_uvs_check_only_selected
     objects_selected = selection_sets.meshes_in_selection(
     ) if selected_only else selection_sets.meshes_selectable()
+    meshes_owners, skipped = selection_sets.meshes_data(selected_only)
+    threads = bpy.context.scene.retico_uvs_box_mapping_threads or os.cpu_count()
     user_active = bpy.context.view_layer.objects.active
     is_user_in_edit_mode = False
+    meshes_in_edit_mode = set()
 
     # handling active object
-    if bpy.context.view_layer.objects.active.mode == 'EDIT':
+    if user_active and user_active.mode == 'EDIT':
         is_user_in_edit_mode = True
+        # multi-objects edit mode, faces selection is synced back to mesh data when leaving it
+        meshes_in_edit_mode = {
+            obj.data for obj in objects_selected if obj.mode == 'EDIT'}
+        bpy.ops.object.mode_set(mode='OBJECT')
 
     # function core
-    for obj in objects_selected:
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.context.view_layer.objects.active = obj
-        mesh = obj.data
-        if len(mesh.uv_layers) == 0:
-            mesh.uv_layers.new()
-        mesh.uv_layers[0].active = True
-        bpy.ops.object.mode_set(mode='EDIT')
-        mesh_box_mapping(mesh, size, is_user_in_edit_mode)
 
-    bpy.ops.object.mode_set(mode='OBJECT')
+    # only NumPy computation goes to workers, reading and writing stay here
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = {}
+        for mesh, obj in meshes_owners:
+            mesh_arrays = box_mapping_read(mesh, mesh in meshes_in_edit_mode)
+            mesh.uv_layers[0].active = True
+            futures[executor.submit(
+                box_mapping_compute, mesh_arrays, size)] = mesh
+        for future in as_completed(futures):
+            box_mapping_write(futures[future], future.result())
+
+    # a single update for all meshes
+    bpy.context.view_layer.update()
 
     # handling active object
-    bpy.context.view_layer.objects.active = user_active
     if is_user_in_edit_mode:
         bpy.ops.object.mode_set(mode='EDIT')
 
-    return {'FINISHED'}
+    return skipped
+
+
+def loops_face_index(loop_start, loop_total):
+    """ Return the polygon index of every loop,
+        from polygons loop_start and loop_total arrays
+    """
+    loops_count = int(loop_total.sum())
+    faces_index = np.repeat(np.arange(len(loop_total)), loop_total)
+    # position of each loop inside its polygon
+    loop_offset = np.arange(loops_count) - \
+        np.repeat(np.cumsum(loop_total) - loop_total, loop_total)
+    loop_face = np.empty(loops_count, dtype=np.int64)
+    loop_face[np.repeat(loop_start, loop_total) + loop_offset] = faces_index
+
+    return loop_face
 
 
-def mesh_box_mapping(mesh, size=1.0, only_selected=False):
-    """ Shamefully copy-pasted from MagicUV addon (UVW function)
-        and rudely adapt for my needs.
+def box_mapping_uvs(co, normals, loop_vert, loop_face, size=1.0):
+    """ Vectorized box mapping, UVW formula from MagicUV addon,
+        return a (loops, 2) array of UVs
     """
     # var init
     offset = [0.0, 0.0, 0.0]
     rotation = [0.0, 0.0, 0.0]
     tex_aspect = 1.0
-    bm = bmesh.new()
-    bm = bmesh.from_edit_mesh(mesh)
-    uv_layer = bm.loops.layers.uv.active
 
     scale = 1.0 / size
 
-    sx = 1.0 * scale
-    sy = 1.0 * scale
-    sz = 1.0 * scale
     ofx = offset[0]
     ofy = offset[1]
     ofz = offset[2]
@@ -189,54 +211,120 @@ def mesh_box_mapping(mesh, size=1.0, only_selected=False):
     rz = rotation[2] * pi / 180.0
     aspect = tex_aspect
 
-    faces_to_map = bm.faces
+    # function core
+
+    # dominant axis of each face, X then Y then Z on ties
+    n = np.abs(normals)
+    is_x = (n[:, 0] >= n[:, 1]) & (n[:, 0] >= n[:, 2])
+    is_y = ~is_x & (n[:, 1] >= n[:, 0]) & (n[:, 1] >= n[:, 2])
+    is_z = ~is_x & ~is_y
+    is_positive = np.choose(
+        np.where(is_x, 0, np.where(is_y, 1, 2)), normals.T) >= 0.0
+
+    # from faces to loops
+    is_x = is_x[loop_face]
+    is_y = is_y[loop_face]
+    is_z = is_z[loop_face]
+    is_positive = is_positive[loop_face]
+    is_negative = ~is_positive
+
+    loop_co = co[loop_vert].astype(np.float64) * scale
+    x = loop_co[:, 0]
+    y = loop_co[:, 1]
+    z = loop_co[:, 2]
+
+    uvs = np.empty((len(loop_vert), 2), dtype=np.float64)
+
+    # X-plane
+    m = is_x & is_positive
+    uvs[m, 0] = (y[m] - ofy) * cos(rx) + (z[m] - ofz) * sin(rx)
+    uvs[m, 1] = -(y[m] * aspect - ofy) * sin(rx) + \
+        (z[m] * aspect - ofz) * cos(rx)
+    m = is_x & is_negative
+    uvs[m, 0] = -(y[m] - ofy) * cos(rx) + (z[m] - ofz) * sin(rx)
+    uvs[m, 1] = (y[m] * aspect - ofy) * sin(rx) + \
+        (z[m] * aspect - ofz) * cos(rx)
+    # Y-plane
+    m = is_y & is_positive
+    uvs[m, 0] = -(x[m] - ofx) * cos(ry) + (z[m] - ofz) * sin(ry)
+    uvs[m, 1] = (x[m] * aspect - ofx) * sin(ry) + \
+        (z[m] * aspect - ofz) * cos(ry)
+    m = is_y & is_negative
+    uvs[m, 0] = (x[m] - ofx) * cos(ry) + (z[m] - ofz) * sin(ry)
+    uvs[m, 1] = -(x[m] * aspect - ofx) * sin(ry) + \
+        (z[m] * aspect - ofz) * cos(ry)
+    # Z-plane
+    m = is_z & is_positive
+    uvs[m, 0] = (x[m] - ofx) * cos(rz) + (y[m] - ofy) * sin(rz)
+    uvs[m, 1] = -(x[m] * aspect - ofx) * sin(rz) + \
+        (y[m] * aspect - ofy) * cos(rz)
+    m = is_z & is_negative
+    uvs[m, 0] = -(x[m] - ofx) * cos(rz) - (y[m] + ofy) * sin(rz)
+    uvs[m, 1] = -(x[m] * aspect + ofx) * sin(rz) + \
+        (y[m] * aspect - ofy) * cos(rz)
+
+    return uvs
+
+
+def box_mapping_read(mesh, only_selected=False):
+    """ Read mesh arrays needed by box mapping,
+        Blender data access: main thread only
+    """
+    # var init
+    vertices_count = len(mesh.vertices)
+    loops_count = len(mesh.loops)
+    faces_count = len(mesh.polygons)
+    mesh_arrays = {}
+
+    if len(mesh.uv_layers) == 0:
+        mesh.uv_layers.new()
+
+    # function core
+    mesh_arrays["co"] = np.empty(vertices_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", mesh_arrays["co"])
+    mesh_arrays["normals"] = np.empty(faces_count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("normal", mesh_arrays["normals"])
+    mesh_arrays["loop_start"] = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", mesh_arrays["loop_start"])
+    mesh_arrays["loop_total"] = np.empty(faces_count, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", mesh_arrays["loop_total"])
+    mesh_arrays["loop_vert"] = np.empty(loops_count, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", mesh_arrays["loop_vert"])
+
     if only_selected:
-        faces_to_map = [f for f in bm.faces if f.select == True]
-
-    # update UV coordinate
-    for f in faces_to_map:
-        n = f.normal
-        for l in f.loops:
-            co = l.vert.co
-            x = co.x * sx
-            y = co.y * sy
-            z = co.z * sz
-
-            # X-plane
-            if abs(n[0]) >= abs(n[1]) and abs(n[0]) >= abs(n[2]):
-                if n[0] >= 0.0:
-                    u = (y - ofy) * cos(rx) + (z - ofz) * sin(rx)
-                    v = -(y * aspect - ofy) * sin(rx) + \
-                        (z * aspect - ofz) * cos(rx)
-                else:
-                    u = -(y - ofy) * cos(rx) + (z - ofz) * sin(rx)
-                    v = (y * aspect - ofy) * sin(rx) + \
-                        (z * aspect - ofz) * cos(rx)
-            # Y-plane
-            elif abs(n[1]) >= abs(n[0]) and abs(n[1]) >= abs(n[2]):
-                if n[1] >= 0.0:
-                    u = -(x - ofx) * cos(ry) + (z - ofz) * sin(ry)
-                    v = (x * aspect - ofx) * sin(ry) + \
-                        (z * aspect - ofz) * cos(ry)
-                else:
-                    u = (x - ofx) * cos(ry) + (z - ofz) * sin(ry)
-                    v = -(x * aspect - ofx) * sin(ry) + \
-                        (z * aspect - ofz) * cos(ry)
-            # Z-plane
-            else:
-                if n[2] >= 0.0:
-                    u = (x - ofx) * cos(rz) + (y - ofy) * sin(rz)
-                    v = -(x * aspect - ofx) * sin(rz) + \
-                        (y * aspect - ofy) * cos(rz)
-                else:
-                    u = -(x - ofx) * cos(rz) - (y + ofy) * sin(rz)
-                    v = -(x * aspect + ofx) * sin(rz) + \
-                        (y * aspect - ofy) * cos(rz)
+        mesh_arrays["faces_selected"] = np.empty(faces_count, dtype=bool)
+        mesh.polygons.foreach_get("select", mesh_arrays["faces_selected"])
+        mesh_arrays["uvs"] = np.empty(loops_count * 2, dtype=np.float32)
+        mesh.uv_layers[0].data.foreach_get("uv", mesh_arrays["uvs"])
+
+    return mesh_arrays
+
+
+def box_mapping_compute(mesh_arrays, size=1.0):
+    """ Compute box mapping UVs from box_mapping_read arrays,
+        pure NumPy: safe to run in a worker thread
+    """
+    # function core
+    loop_face = loops_face_index(
+        mesh_arrays["loop_start"], mesh_arrays["loop_total"])
+    uvs = box_mapping_uvs(mesh_arrays["co"].reshape(-1, 3), mesh_arrays["normals"].reshape(-1, 3),
+                          mesh_arrays["loop_vert"], loop_face, size)
+
+    if "faces_selected" in mesh_arrays:
+        loops_selected = mesh_arrays["faces_selected"][loop_face]
+        uvs_current = mesh_arrays["uvs"].reshape(-1, 2)
+        uvs_current[loops_selected] = uvs[loops_selected]
+        uvs = uvs_current
 
-            l[uv_layer].uv = Vector((u, v))
+    return uvs.astype(np.float32).ravel()
 
-    bmesh.update_edit_mesh(mesh)
-    bm.free()
+
+def box_mapping_write(mesh, uvs):
+    """ Write box mapping UVs into UV channel 0,
+        Blender data access: main thread only
+    """
+    mesh.uv_layers[0].data.foreach_set("uv", uvs)
+    mesh.update_tag()
 
     return {'FINISHED'}
 
@@ -291,12 +379,17 @@ class RETICO_PT_uv_misc(RETICO_PT_uv_3dviewPanel):
             # rename channels
             row = layout.row(align=True)
             row.operator("retico.uv_rename_channel",
-                         text="Rename channels", icon='SORTALPHA')
+                         text="Rename channels", icon='SORTALPHA').dry_run = False
+            row.operator("retico.uv_rename_channel",
+                         text="", icon='HIDE_OFF').dry_run = True
             # box mapping
             row = layout.row(align=True)
             row.operator("retico.uv_box_mapping",
                          text="Box mapping", icon='UV_DATA')
             row.prop(context.scene, "retico_box_mapping_size", text="")
+            row = layout.row(align=True)
+            row.prop(context.scene, "retico_uvs_box_mapping_threads",
+                     text="Threads (0: all cores)")
 
         else:
             row = layout.row(align=True)
@@ -359,7 +452,10 @@ class RETICO_OT_uv_activate_channel(bpy.types.Operator):
             {'INFO'}, "---[ UV{} activated ]---".format(self.channel + 1))
         if not is_all_good:
             self.report({'WARNING'}, message)
-        activate_uv_channels(self.channel)
+        skipped = activate_uv_channels(self.channel)
+        if skipped > 0:
+            self.report(
+                {'INFO'}, "{} redundant passes skipped (shared meshes)".format(skipped))
 
         return {'FINISHED'}
 
@@ -378,7 +474,10 @@ class RETICO_OT_uv_box_mapping(bpy.types.Operator):
         self.report({'INFO'}, "---[ Box mapping ]---")
         if not is_all_good:
             self.report({'WARNING'}, message)
-        box_mapping(context.scene.retico_box_mapping_size)
+        skipped = box_mapping(context.scene.retico_box_mapping_size)
+        if skipped > 0:
+            self.report(
+                {'INFO'}, "{} redundant passes skipped (shared meshes)".format(skipped))
 
         return {'FINISHED'}
 
@@ -387,14 +486,31 @@ class RETICO_OT_uv_rename_channel(bpy.types.Operator):
     bl_idname = "retico.uv_rename_channel"
     bl_label = "Normalize UV channels naming"
     bl_description = "Normalize UV channels naming (UVMap, then UV2, UV3...)"
+    dry_run: BoolProperty(
+        name="Dry run",
+        description="Only report planned renames",
+        default=False
+    )
 
     @classmethod
     def poll(cls, context):
         return len(context.view_layer.objects) > 0
 
     def execute(self, context):
-        rename_uv_channels()
+        message, conflicts, skipped = rename_uv_channels(self.dry_run)
         self.report({'INFO'}, "---[ UV naming ]---")
+        if self.dry_run:
+            for report in message:
+                self.report({'INFO'}, report)
+            if len(message) + len(conflicts) == 0:
+                self.report({'INFO'}, "Nothing to rename.")
+            if context.scene.retico_uvs_reports_to_clipboard:
+                context.window_manager.clipboard = "\r\n".join(message + conflicts)
+        for report in conflicts:
+            self.report({'WARNING'}, report)
+        if skipped > 0:
+            self.report(
+                {'INFO'}, "{} redundant passes skipped (shared meshes)".format(skipped))
 
         return {'FINISHED'}
 
@@ -455,6 +571,13 @@ def register():
         default=1.0,
         min=0.0,
     )
+    Scene.retico_uvs_box_mapping_threads = IntProperty(
+        name="box mapping threads",
+        description="Number of threads computing box mapping, 0 uses all cores",
+        default=0,
+        min=0,
+        max=256,
+    )
     Scene.retico_uvs_report_update_selection = BoolProperty(
         name="Report update selection",
         description="Reports update selection, or not",
@@ -473,6 +596,7 @@ def unregister():
         unregister_class(cls)
 
     del Scene.retico_box_mapping_size
+    del Scene.retico_uvs_box_mapping_threads
     del Scene.retico_uvs_check_only_selected
     del Scene.retico_uvs_report_update_selection
     del Scene.retico_uvs_reports_to_clipboard